@@ -37,6 +37,7 @@
         });
       })
       flask-sqlalchemy
+      gunicorn
       isbnlib
       libdib
       psycopg2-binary
@@ -76,6 +76,14 @@ in {
         '';
         default = "*-*-* 10:15:00";
       };
+
+      resident = lib.mkEnableOption "" // {
+        description = ''
+          Whether to keep the deadline-daemon running, starting a new pass every
+          `settings.deadline_daemon.interval_seconds` seconds, instead of starting it
+          from a systemd timer. `onCalendar` is ignored when this is enabled.
+        '';
+      };
     };
   };
 
@@ -215,7 +223,12 @@ in {
     ]))
 
     (lib.mkIf cfg.deadline-daemon.enable {
-      systemd.timers.worblehat-deadline-daemon = {
+      # NOTE: This is a state directory rather than a runtime directory, since the runtime
+      #       directory of a oneshot service is removed as soon as it has finished,
+      #       while manual runs need the lock file as well.
+      services.worblehat.settings.deadline_daemon.lock_file = "/var/lib/worblehat-deadline-daemon/deadline-daemon.lock";
+
+      systemd.timers.worblehat-deadline-daemon = lib.mkIf (!cfg.deadline-daemon.resident) {
         description = "Worblehat Deadline Daemon";
         wantedBy = [ "timers.target" ];
         timerConfig = {
@@ -229,15 +242,18 @@ in {
         wantedBy = [ "multi-user.target" ];
         after = [ "network.target" ];
         serviceConfig = {
-          Type = "oneshot";
+          Type = if cfg.deadline-daemon.resident then "simple" else "oneshot";
+          Restart = lib.mkIf cfg.deadline-daemon.resident "on-failure";
           CPUSchedulingPolicy = "idle";
           IOSchedulingClass = "idle";
+          StateDirectory = "worblehat-deadline-daemon";
 
           ExecStart = let
             worblehatArgs = lib.cli.toCommandLineShellGNU { } {
               config = "/etc/worblehat/config.toml";
             };
-          in "${lib.getExe cfg.package} ${worblehatArgs} deadline-daemon";
+            daemonArgs = lib.optionalString cfg.deadline-daemon.resident " --resident";
+          in "${lib.getExe cfg.package} ${worblehatArgs} deadline-daemon${daemonArgs}";
 
           User = "worblehat";
           Group = "worblehat";
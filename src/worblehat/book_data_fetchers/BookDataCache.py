@@ -0,0 +1,218 @@
+"""
+A persistent cache for the results of the book data fetchers.
+
+Entries are stored per fetcher in a small SQLite database, so that looking up the same ISBN
+twice (e.g. when scanning a book and then pulling updated data for it) does not go out to
+the external sources again. Fetchers that did not find anything are cached as well,
+but with a shorter TTL, so that newly registered books eventually show up. Failed lookups,
+such as network errors or timeouts, are not cached at all.
+
+Expired entries are purged whenever the cache is opened.
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Self
+
+from .BookData import BookData
+
+
+@dataclass
+class BookDataCacheEntry:
+    """
+    A cached fetcher result. `data` is None if the fetcher did not find anything.
+    """
+
+    data: BookData | None
+    fetched_at: datetime
+
+
+class BookDataCache:
+    def __init__(
+        self,
+        path: Path,
+        ttl: timedelta,
+        negative_ttl: timedelta,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._lock = Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS book_data (
+                fetcher_id TEXT NOT NULL,
+                isbn TEXT NOT NULL,
+                data TEXT,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (fetcher_id, isbn)
+            )
+            """,
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS key_value (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """,
+        )
+        self._connection.commit()
+
+    @classmethod
+    def from_config(cls) -> Self | None:
+        """
+        Opens the cache from the `book_data_cache` section of the configuration,
+        and purges its expired entries. Returns None if the cache is disabled.
+        """
+        # NOTE: imported here to avoid a circular import through worblehat.services
+        from worblehat.services.config import Config
+
+        config = Config.snapshot().book_data_cache
+        if not config.enabled:
+            return None
+
+        cache = cls(
+            path=config.path,
+            ttl=config.ttl,
+            negative_ttl=config.negative_ttl,
+        )
+        cache.purge_expired()
+        return cache
+
+    @staticmethod
+    def _serialize(data: BookData | None) -> str | None:
+        if data is None:
+            return None
+        return json.dumps(
+            {
+                key: sorted(value) if isinstance(value, set) else value
+                for key, value in data.to_dict().items()
+            },
+        )
+
+    @staticmethod
+    def _deserialize(data: str | None) -> BookData | None:
+        if data is None:
+            return None
+        fields = json.loads(data)
+        fields["authors"] = set(fields["authors"])
+        fields["subjects"] = set(fields["subjects"])
+        return BookData(**fields)
+
+    def lookup(self, fetcher_id: str, isbn: str) -> BookDataCacheEntry | None:
+        """
+        Returns the cached result for the given fetcher and ISBN,
+        or None if there is no entry or the entry has expired.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, fetched_at FROM book_data WHERE fetcher_id = ? AND isbn = ?",
+                (fetcher_id, isbn),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        data, fetched_at = row
+        fetched_at = datetime.fromisoformat(fetched_at)
+        ttl = self.ttl if data is not None else self.negative_ttl
+        if fetched_at + ttl < datetime.now():
+            return None
+
+        return BookDataCacheEntry(
+            data=self._deserialize(data),
+            fetched_at=fetched_at,
+        )
+
+    def store(self, fetcher_id: str, isbn: str, data: BookData | None) -> None:
+        """
+        Stores the result of a fetcher. Pass None to record that nothing was found.
+        """
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO book_data (fetcher_id, isbn, data, fetched_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (fetcher_id, isbn, self._serialize(data), datetime.now().isoformat()),
+            )
+            self._connection.commit()
+
+    def lookup_key(self, namespace: str, key: str) -> str | None:
+        """
+        Returns a cached value from a lookup that is not tied to a specific ISBN,
+        such as resolving an author id to a name, or None if there is no fresh entry.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, fetched_at FROM key_value WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, fetched_at = row
+        if datetime.fromisoformat(fetched_at) + self.ttl < datetime.now():
+            return None
+        return value
+
+    def store_key(self, namespace: str, key: str, value: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO key_value (namespace, key, value, fetched_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (namespace, key, value, datetime.now().isoformat()),
+            )
+            self._connection.commit()
+
+    def purge_expired(self) -> int:
+        """Removes all expired entries, and returns the amount of entries removed."""
+        now = datetime.now()
+        with self._lock:
+            cursor = self._connection.execute(
+                """
+                DELETE FROM book_data
+                WHERE (data IS NOT NULL AND fetched_at < ?)
+                   OR (data IS NULL AND fetched_at < ?)
+                """,
+                ((now - self.ttl).isoformat(), (now - self.negative_ttl).isoformat()),
+            )
+            removed = cursor.rowcount
+            cursor = self._connection.execute(
+                "DELETE FROM key_value WHERE fetched_at < ?",
+                ((now - self.ttl).isoformat(),),
+            )
+            removed += cursor.rowcount
+            self._connection.commit()
+        return removed
+
+
+_book_data_cache: BookDataCache | None = None
+_book_data_cache_loaded = False
+_book_data_cache_lock = Lock()
+
+
+def get_book_data_cache() -> BookDataCache | None:
+    """
+    Returns the process wide book data cache, or None if caching is disabled.
+    """
+    global _book_data_cache, _book_data_cache_loaded
+    with _book_data_cache_lock:
+        if not _book_data_cache_loaded:
+            _book_data_cache = BookDataCache.from_config()
+            _book_data_cache_loaded = True
+        return _book_data_cache
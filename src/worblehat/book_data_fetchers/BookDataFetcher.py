@@ -4,11 +4,21 @@ from abc import ABC, abstractmethod
 from .BookData import BookData
 
 
+class BookDataFetchError(Exception):
+    """
+    Raised by a fetcher when the source could not be asked, e.g. because of a network error,
+    a server error or rate limiting. Unlike a lookup that found nothing, this is not cached.
+    """
+
+
 class BookDataFetcher(ABC):
     """
     A base class for adapters that fetch book data from external sources.
     """
 
+    # How many seconds to wait for this fetcher before giving up on it.
+    timeout_seconds: float = 10
+
     @classmethod
     @abstractmethod
     def fetcher_id(cls) -> str:
@@ -18,5 +28,10 @@ class BookDataFetcher(ABC):
     @classmethod
     @abstractmethod
     def try_fetch_data(cls, isbn: str) -> BookData | None:
-        """Tries to fetch data for the given ISBN."""
+        """
+        Tries to fetch data for the given ISBN.
+
+        Returns None if the source does not know the book,
+        and raises BookDataFetchError if the source could not be asked.
+        """
         pass
@@ -1,3 +1,12 @@
-from .book_data_fetcher import fetch_book_data_from_multiple_sources
+from .book_data_fetcher import (
+    fetch_book_data_from_multiple_sources,
+    fetch_book_data_from_multiple_sources_async,
+)
+from .BookDataCache import BookDataCache, get_book_data_cache
 
-__all__ = ["fetch_book_data_from_multiple_sources"]
+__all__ = [
+    "BookDataCache",
+    "fetch_book_data_from_multiple_sources",
+    "fetch_book_data_from_multiple_sources_async",
+    "get_book_data_cache",
+]
@@ -1,12 +1,18 @@
 """
 this module contains the fetch_book_data_from_multiple_sources() function which combines all fetchers and returns ranked results (if any)
 
+The fetchers are run concurrently by an asyncio based engine. Each fetcher has its own timeout,
+and the lookup as a whole has a deadline, so that a single hanging source can not block the caller.
+
 """
 
+import asyncio
+import logging
 from concurrent.futures import ThreadPoolExecutor
 
 from worblehat.book_data_fetchers.BookData import BookData
-from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher
+from worblehat.book_data_fetchers.BookDataCache import get_book_data_cache
+from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher, BookDataFetchError
 from worblehat.book_data_fetchers.fetchers.GoogleBooksFetcher import GoogleBooksFetcher
 from worblehat.book_data_fetchers.fetchers.OpenLibraryFetcher import OpenLibraryFetcher
 from worblehat.book_data_fetchers.fetchers.OutlandScraperFetcher import (
@@ -24,6 +30,13 @@ FETCHERS: list[BookDataFetcher] = [
 
 FETCHER_SOURCE_IDS: list[str] = [fetcher.fetcher_id() for fetcher in FETCHERS]
 
+# The maximum amount of seconds to wait for all of the fetchers combined.
+FETCH_DEADLINE_SECONDS: float = 20
+
+# The fetchers are blocking, so they are run in this executor.
+# It is shared between calls, and fetchers that time out are left to finish in the background.
+_executor = ThreadPoolExecutor(thread_name_prefix="book_data_fetcher")
+
 
 def sort_data_by_priority(data: list[BookData]) -> list[BookData]:
     """
@@ -36,37 +49,157 @@ def sort_data_by_priority(data: list[BookData]) -> list[BookData]:
     return sorted(data, key=lambda m: FETCHER_SOURCE_IDS.index(m.source))
 
 
-def fetch_book_data_from_multiple_sources(isbn: str, strict: bool = False) -> list[BookData]:
+def _has_highest_priority_result(results: dict[str, BookData], finished: set[str]) -> bool:
     """
-    Returns a list of data fetched from multiple fetchers.
-
-    Fetchers that are not able to retrieve any data for the given ISBN will be ignored.
+    Returns True if the highest priority fetcher that has not failed has valid data,
+    meaning that waiting for the rest of the fetchers would not change the top result.
+    """
+    for source_id in FETCHER_SOURCE_IDS:
+        if source_id in results:
+            return True
+        if source_id not in finished:
+            return False
+    return False
 
-    There is no guarantee that there will be any book data.
 
-    The results are always ordered in the same way as the fetchers are listed in the FETCHERS list.
+async def _try_fetch_data_with_timeout(fetcher: BookDataFetcher, isbn: str) -> BookData | None:
+    """
+    Runs the fetcher in the executor, and raises BookDataFetchError if it has not
+    answered within its timeout.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(_executor, fetcher.try_fetch_data, isbn),
+            timeout=fetcher.timeout_seconds,
+        )
+    except TimeoutError as e:
+        raise BookDataFetchError(f"Timed out after {fetcher.timeout_seconds} seconds") from e
+
+
+async def fetch_book_data_from_multiple_sources_async(
+    isbn: str,
+    strict: bool = False,
+    use_cache: bool = True,
+    first_good: bool = False,
+    deadline: float = FETCH_DEADLINE_SECONDS,
+) -> list[BookData]:
+    """
+    The asyncio version of fetch_book_data_from_multiple_sources(), see its documentation.
     """
     isbn = isbn.replace("-", "").replace("_", "").strip().lower()
     if len(isbn) != 10 and len(isbn) != 13 and not isbn.isnumeric():
         raise ValueError("Invalid ISBN")
 
-    results: list[BookData] = []
+    cache = get_book_data_cache() if use_cache else None
 
-    with ThreadPoolExecutor() as executor:
-        futures = [executor.submit(fetcher.try_fetch_data, isbn) for fetcher in FETCHERS]
+    # Valid results, and all fetchers that are done (whether they found anything or not),
+    # keyed by source id.
+    results: dict[str, BookData] = {}
+    finished: set[str] = set()
 
-    for future in futures:
-        result = future.result()
-        if result is not None:
-            results.append(result)
-
-    for result in results:
+    def add_result(source_id: str, result: BookData | None) -> None:
+        finished.add(source_id)
+        if result is None:
+            return
         try:
             result.validate()
         except ValueError as e:
             if strict:
                 raise e
             print(f"Invalid data: {e}")
-            results.remove(result)
+            return
+        results[source_id] = result
+
+    fetchers_to_query: list[BookDataFetcher] = []
+    for fetcher in FETCHERS:
+        if cache is not None and (entry := cache.lookup(fetcher.fetcher_id(), isbn)) is not None:
+            add_result(fetcher.fetcher_id(), entry.data)
+        else:
+            fetchers_to_query.append(fetcher)
+
+    if first_good and _has_highest_priority_result(results, finished):
+        return sort_data_by_priority(list(results.values()))
+
+    loop = asyncio.get_running_loop()
+    deadline_time = loop.time() + deadline
+    tasks = {
+        asyncio.create_task(_try_fetch_data_with_timeout(fetcher, isbn)): fetcher
+        for fetcher in fetchers_to_query
+    }
+    pending = set(tasks)
+
+    try:
+        while len(pending) > 0:
+            remaining_time = deadline_time - loop.time()
+            if remaining_time <= 0:
+                logging.warning(f"Deadline exceeded while looking up {isbn}")
+                break
+
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=remaining_time,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            for task in done:
+                fetcher = tasks[task]
+                if task.cancelled():
+                    add_result(fetcher.fetcher_id(), None)
+                    continue
+                try:
+                    result = task.result()
+                except BookDataFetchError as e:
+                    # NOTE: Neither failures nor timeouts are cached,
+                    #       so that the source is asked again on the next lookup
+                    logging.warning(f"Fetcher {fetcher.fetcher_id()} failed to look up {isbn}: {e}")
+                    add_result(fetcher.fetcher_id(), None)
+                    continue
+                if cache is not None:
+                    cache.store(fetcher.fetcher_id(), isbn, result)
+                add_result(fetcher.fetcher_id(), result)
+
+            if first_good and _has_highest_priority_result(results, finished):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+
+    return sort_data_by_priority(list(results.values()))
+
+
+def fetch_book_data_from_multiple_sources(
+    isbn: str,
+    strict: bool = False,
+    use_cache: bool = True,
+    first_good: bool = False,
+    deadline: float = FETCH_DEADLINE_SECONDS,
+) -> list[BookData]:
+    """
+    Returns a list of data fetched from multiple fetchers.
+
+    Fetchers that are not able to retrieve any data for the given ISBN will be ignored.
+
+    There is no guarantee that there will be any book data.
+
+    The results are always ordered in the same way as the fetchers are listed in the FETCHERS list.
 
-    return sort_data_by_priority(results)
+    Unless `use_cache` is False, results are looked up in and stored to the book data cache,
+    so that only the fetchers without a fresh cache entry will be queried.
+
+    Each fetcher is given `timeout_seconds` to answer, and fetchers which have not answered
+    within `deadline` seconds are ignored.
+
+    If `first_good` is True, the lookup returns as soon as the highest priority fetcher which
+    has not failed answers with valid data, without waiting for the lower priority fetchers.
+    The first result will then be the same as without `first_good`, but the list may be shorter.
+    """
+    return asyncio.run(
+        fetch_book_data_from_multiple_sources_async(
+            isbn,
+            strict=strict,
+            use_cache=use_cache,
+            first_good=first_good,
+            deadline=deadline,
+        ),
+    )
@@ -2,10 +2,9 @@
 A BookMetadataFetcher for the Google Books API.
 """
 
-import requests
-
 from worblehat.book_data_fetchers.BookData import BookData
 from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher
+from worblehat.book_data_fetchers.http_session import get_from_source
 
 
 class GoogleBooksFetcher(BookDataFetcher):
@@ -15,12 +14,16 @@ class GoogleBooksFetcher(BookDataFetcher):
 
     @classmethod
     def try_fetch_data(cls, isbn: str) -> BookData | None:
+        response = get_from_source(
+            "https://www.googleapis.com/books/v1/volumes",
+            params={"q": f"isbn:{isbn}"},
+            timeout=30,
+        )
+        if response is None:
+            return None
+
         try:
-            jsonInput = requests.get(
-                "https://www.googleapis.com/books/v1/volumes",
-                params={"q": f"isbn:{isbn}"},
-                timeout=30,
-            ).json()
+            jsonInput = response.json()
             data = jsonInput.get("items")[0].get("volumeInfo")
 
             authors = set(data.get("authors") or [])
@@ -1,33 +1,90 @@
 """
 A BookMetadataFetcher for the Open Library API.
+
+Editions only refer to their authors and languages by key, so these have to be resolved with
+separate requests. These requests are made concurrently, and the resolved keys are memoized,
+both in memory and in the book data cache, since the same authors and languages come up often.
 """
 
-import requests
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any
 
 from worblehat.book_data_fetchers.BookData import BookData
-from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher
+from worblehat.book_data_fetchers.BookDataCache import get_book_data_cache
+from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher, BookDataFetchError
+from worblehat.book_data_fetchers.http_session import get_from_source
 
 LANGUAGE_MAP = {
     "Norwegian": "no",
 }
 
+_key_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="open_library_keys")
+_resolved_keys: dict[str, str] = {}
+_resolved_keys_lock = Lock()
+
 
 class OpenLibraryFetcher(BookDataFetcher):
     @classmethod
     def fetcher_id(_cls) -> str:
         return "open_library"
 
+    @classmethod
+    def _resolve_key(
+        cls,
+        key: str,
+        extract: Callable[[dict[str, Any]], str | None],
+    ) -> str | None:
+        """
+        Fetches the object with the given key, and returns the value picked out by `extract`.
+        """
+        with _resolved_keys_lock:
+            if key in _resolved_keys:
+                return _resolved_keys[key]
+
+        cache = get_book_data_cache()
+        value = cache.lookup_key(cls.fetcher_id(), key) if cache is not None else None
+
+        if value is None:
+            response = get_from_source(f"https://openlibrary.org/{key}.json")
+            if response is None:
+                return None
+            value = extract(response.json())
+            if value is None:
+                return None
+            if cache is not None:
+                cache.store_key(cls.fetcher_id(), key, value)
+
+        with _resolved_keys_lock:
+            _resolved_keys[key] = value
+        return value
+
     @classmethod
     def try_fetch_data(cls, isbn: str) -> BookData | None:
+        response = get_from_source(f"https://openlibrary.org/isbn/{isbn}.json")
+        if response is None:
+            return None
+
         try:
-            jsonInput = requests.get(f"https://openlibrary.org/isbn/{isbn}.json").json()
+            jsonInput = response.json()
 
-            author_keys = jsonInput.get("authors") or []
-            author_names = set()
-            for author_key in author_keys:
-                key = author_key.get("key")
-                author_name = requests.get(f"https://openlibrary.org/{key}.json").json().get("name")
-                author_names.add(author_name)
+            author_futures = [
+                _key_executor.submit(
+                    cls._resolve_key,
+                    author_key.get("key"),
+                    lambda author: author.get("name"),
+                )
+                for author_key in jsonInput.get("authors") or []
+            ]
+            language_future = _key_executor.submit(
+                cls._resolve_key,
+                jsonInput.get("languages")[0].get("key"),
+                lambda language: language.get("identifiers").get("iso_639_1")[0],
+            )
+
+            author_names = {future.result() for future in author_futures}
+            language = language_future.result()
 
             title = jsonInput.get("title")
             publishDate = jsonInput.get("publish_date")
@@ -36,15 +93,10 @@ class OpenLibraryFetcher(BookDataFetcher):
             if numberOfPages:
                 numberOfPages = int(numberOfPages)
 
-            language_key = jsonInput.get("languages")[0].get("key")
-            language = (
-                requests.get(f"https://openlibrary.org/{language_key}.json")
-                .json()
-                .get("identifiers")
-                .get("iso_639_1")[0]
-            )
             subjects = set(jsonInput.get("subjects") or [])
 
+        except BookDataFetchError:
+            raise
         except Exception:
             return None
 
@@ -2,11 +2,11 @@
 A BookMetadataFetcher that webscrapes https://outland.no/
 """
 
-import requests
 from bs4 import BeautifulSoup
 
 from worblehat.book_data_fetchers.BookData import BookData
-from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher
+from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher, BookDataFetchError
+from worblehat.book_data_fetchers.http_session import get_from_source
 
 LANGUAGE_MAP = {
     "Norsk": "no",
@@ -26,6 +26,9 @@ LANGUAGE_MAP = {
 
 
 class OutlandScraperFetcher(BookDataFetcher):
+    # Scraping requires two page loads, which are slower than the API lookups.
+    timeout_seconds = 15
+
     @classmethod
     def fetcher_id(_cls) -> str:
         return "outland_scraper"
@@ -34,13 +37,17 @@ class OutlandScraperFetcher(BookDataFetcher):
     def try_fetch_data(cls, isbn: str) -> BookData | None:
         try:
             # Find the link to the product page
-            response = requests.get(f"https://outland.no/{isbn}")
+            response = get_from_source(f"https://outland.no/{isbn}")
+            if response is None:
+                return None
             soup = BeautifulSoup(response.content, "html.parser")
             soup = soup.find_all("a", class_="product-item-link")
             href = soup[0].get("href")
 
             # Find the metadata on the product page
-            response = requests.get(href)
+            response = get_from_source(href)
+            if response is None:
+                return None
             soup = BeautifulSoup(response.content, "html.parser")
             data = soup.find_all("td", class_="col data")
 
@@ -86,6 +93,8 @@ class OutlandScraperFetcher(BookDataFetcher):
             if bookData["NumberOfPages"] is not None:
                 bookData["NumberOfPages"] = int(bookData["NumberOfPages"])
 
+        except BookDataFetchError:
+            raise
         except Exception:
             return None
 
@@ -0,0 +1,163 @@
+"""
+A shared HTTP session for the book data fetchers.
+
+All fetchers go through the same pooled `requests.Session`, so that connections are kept alive
+and reused between lookups. Each host has a limit on the amount of concurrent requests, as well
+as a token bucket rate limiter, to keep bulk lookups from being throttled by the providers.
+"""
+
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .BookDataFetcher import BookDataFetchError
+
+
+@dataclass(frozen=True)
+class HostLimit:
+    max_concurrent_requests: int
+    requests_per_second: float
+    burst: int
+
+
+DEFAULT_HOST_LIMIT = HostLimit(
+    max_concurrent_requests=4,
+    requests_per_second=5,
+    burst=5,
+)
+
+# NOTE: Open Library asks clients to stay below a few requests per second,
+#       see https://openlibrary.org/developers/api
+HOST_LIMITS: dict[str, HostLimit] = {
+    "openlibrary.org": HostLimit(
+        max_concurrent_requests=4,
+        requests_per_second=3,
+        burst=6,
+    ),
+    "www.googleapis.com": HostLimit(
+        max_concurrent_requests=4,
+        requests_per_second=5,
+        burst=10,
+    ),
+    "outland.no": HostLimit(
+        max_concurrent_requests=2,
+        requests_per_second=2,
+        burst=4,
+    ),
+}
+
+# Used for requests that do not specify their own timeout
+DEFAULT_TIMEOUT_SECONDS: float = 10
+
+USER_AGENT = "worblehat (https://www.pvv.ntnu.no/pvv/Bokhyllen/Worblehat/; projects@pvv.ntnu.no)"
+
+
+class TokenBucket:
+    """
+    A thread safe token bucket, which refills at `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available, and consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._last_refill) * self.rate,
+                )
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+class _HostLimiter:
+    def __init__(self, limit: HostLimit) -> None:
+        self.semaphore = BoundedSemaphore(limit.max_concurrent_requests)
+        self.bucket = TokenBucket(limit.requests_per_second, limit.burst)
+
+
+class RateLimitedSession(requests.Session):
+    """
+    A `requests.Session` which applies the per host limits in `HOST_LIMITS` to every request.
+    """
+
+    def __init__(self, pool_maxsize: int = 10) -> None:
+        super().__init__()
+        self.headers["User-Agent"] = USER_AGENT
+
+        adapter = HTTPAdapter(pool_connections=len(HOST_LIMITS), pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        self._limiters: dict[str, _HostLimiter] = {}
+        self._limiters_lock = Lock()
+
+    def _limiter_for(self, host: str) -> _HostLimiter:
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = _HostLimiter(HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+            return self._limiters[host]
+
+    def request(self, method: str, url: str, *args: object, **kwargs: object) -> requests.Response:
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT_SECONDS)
+        limiter = self._limiter_for(urlsplit(url).hostname or "")
+        with limiter.semaphore:
+            limiter.bucket.acquire()
+            return super().request(method, url, *args, **kwargs)
+
+
+_http_session: RateLimitedSession | None = None
+_http_session_lock = Lock()
+
+
+def get_http_session() -> RateLimitedSession:
+    """
+    Returns the process wide HTTP session shared by all the fetchers.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = RateLimitedSession()
+        return _http_session
+
+
+def get_from_source(
+    url: str,
+    params: dict[str, str] | None = None,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+) -> requests.Response | None:
+    """
+    Makes a GET request to a book data source through the shared session.
+
+    Returns None if the source answers 404 Not Found, and raises BookDataFetchError
+    if the request fails or the source answers with any other error.
+    """
+    try:
+        response = get_http_session().get(url, params=params, timeout=timeout)
+    except requests.RequestException as e:
+        raise BookDataFetchError(f"Request to {url} failed: {e}") from e
+
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        return None
+    if not response.ok:
+        raise BookDataFetchError(f"Request to {url} failed with status {response.status_code}")
+    return response
@@ -2,7 +2,6 @@ from textwrap import dedent
 
 from libdib.repl import (
     InteractiveItemSelector,
-    NumberedCmd,
     prompt_yes_no,
 )
 from sqlalchemy import event
@@ -12,9 +11,10 @@ from worblehat.models import *
 from worblehat.queries import (
     find_bookcase_item_by_isbn,
     find_media_type_by_name,
-    list_active_borrowings,
-    list_all_queue_items,
-    list_overdue_borrowings,
+    list_active_borrowings_with_items,
+    list_all_queue_items_with_items,
+    list_bookcase_shelfs_with_items,
+    list_overdue_borrowings_with_items,
 )
 from worblehat.services import (
     Config,
@@ -22,6 +22,7 @@ from worblehat.services import (
     is_valid_isbn,
 )
 
+from .profiled_cmd import ProfiledCmd
 from .subclis import (
     AdvancedOptionsCli,
     BookcaseItemCli,
@@ -34,7 +35,7 @@ from .subclis import (
 #       the shelves?
 
 
-class WorblehatCli(NumberedCmd):
+class WorblehatCli(ProfiledCmd):
     def __init__(self, sql_session: Session) -> None:
         super().__init__()
         self.sql_session = sql_session
@@ -69,13 +70,13 @@ class WorblehatCli(NumberedCmd):
         if bookcase == None:
             return
 
-        for shelf in bookcase.shelfs:
+        for shelf in list_bookcase_shelfs_with_items(self.sql_session, bookcase):
             print(shelf.short_str())
             for item in shelf.items:
                 print(f"  {item.name} - {item.amount} copies")
 
     def do_show_borrowed_queued(self, _: str) -> None:
-        borrowed_items = list_active_borrowings(self.sql_session)
+        borrowed_items = list_active_borrowings_with_items(self.sql_session)
 
         if len(borrowed_items) == 0:
             print("No borrowed items found.")
@@ -88,7 +89,7 @@ class WorblehatCli(NumberedCmd):
 
         print()
 
-        queued_items = list_all_queue_items(self.sql_session)
+        queued_items = list_all_queue_items_with_items(self.sql_session)
 
         if len(queued_items) == 0:
             print("No queued items found.")
@@ -182,7 +183,7 @@ class WorblehatCli(NumberedCmd):
             ).cmdloop()
 
     def do_show_slabbedasker(self, _: str) -> None:
-        slubberter = list_overdue_borrowings(self.sql_session)
+        slubberter = list_overdue_borrowings_with_items(self.sql_session)
 
         if len(slubberter) == 0:
             print("No slubberts found. Life is good.")
@@ -215,7 +216,7 @@ class WorblehatCli(NumberedCmd):
                 self.sql_session.commit()
             else:
                 self.sql_session.rollback()
-        if Config["general.quit_allowed"]:
+        if Config.snapshot().general.quit_allowed:
             exit(0)
 
     funcs = {
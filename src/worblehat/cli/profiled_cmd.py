@@ -0,0 +1,23 @@
+from libdib.repl import NumberedCmd
+
+from worblehat.services.sql_profiler import sql_profiler
+
+
+class ProfiledCmd(NumberedCmd):
+    """
+    A `NumberedCmd` which records the SQL statements of each command in the SQL profiler,
+    under the name of the class and the command. Statements from a nested menu are recorded
+    under the command of the nested menu.
+    """
+
+    def _command_name(self, line: str) -> str:
+        command = line.strip().split(" ", 1)[0]
+        if command.isdigit() and int(command) in self.funcs:
+            return self.funcs[int(command)]["f"].__name__.removeprefix("do_")
+        if command != "" and hasattr(self, f"do_{command}"):
+            return command
+        return "default"
+
+    def onecmd(self, line: str) -> bool:
+        with sql_profiler.scope(f"cli {type(self).__name__}.{self._command_name(line)}"):
+            return super().onecmd(line)
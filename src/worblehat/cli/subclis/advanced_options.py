@@ -1,7 +1,4 @@
-from libdib.repl import (
-    InteractiveItemSelector,
-    NumberedCmd,
-)
+from libdib.repl import InteractiveItemSelector
 from sqlalchemy.orm import Session
 
 from worblehat.models import Bookcase, BookcaseShelf
@@ -11,8 +8,10 @@ from worblehat.queries import (
     list_bookcase_shelfs_ordered,
 )
 
+from ..profiled_cmd import ProfiledCmd
+
 
-class AdvancedOptionsCli(NumberedCmd):
+class AdvancedOptionsCli(ProfiledCmd):
     def __init__(self, sql_session: Session) -> None:
         super().__init__()
         self.sql_session = sql_session
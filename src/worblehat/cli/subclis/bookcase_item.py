@@ -3,7 +3,6 @@ from textwrap import dedent
 
 from libdib.repl import (
     InteractiveItemSelector,
-    NumberedCmd,
     NumberedItemSelector,
     format_date,
     prompt_yes_no,
@@ -33,22 +32,22 @@ from worblehat.services.bookcase_item import (
 )
 from worblehat.services.config import Config
 
+from ..profiled_cmd import ProfiledCmd
 from .bookcase_shelf_selector import select_bookcase_shelf
 
 
 def _selected_bookcase_item_prompt(bookcase_item: BookcaseItem) -> str:
-    amount_borrowed = len(bookcase_item.borrowings)
     return dedent(f"""
       Item: {bookcase_item.name}
         ISBN: {bookcase_item.isbn}
         Authors: {", ".join(a.name for a in bookcase_item.authors)}
         Bookcase: {bookcase_item.shelf.bookcase.short_str()}
         Shelf: {bookcase_item.shelf.short_str()}
-        Amount: {bookcase_item.amount - amount_borrowed}/{bookcase_item.amount}
+        Amount: {bookcase_item.available_amount}/{bookcase_item.amount}
     """)
 
 
-class BookcaseItemCli(NumberedCmd):
+class BookcaseItemCli(ProfiledCmd):
     def __init__(self, sql_session: Session, bookcase_item: BookcaseItem) -> None:
         super().__init__()
         self.sql_session = sql_session
@@ -91,22 +90,21 @@ class BookcaseItemCli(NumberedCmd):
         return is_in_borrowing_queue(self.sql_session, username, self.bookcase_item)
 
     def do_borrow(self, _: str) -> None:
-        active_borrowings = list_active_borrowings_for_item(
-            self.sql_session,
-            self.bookcase_item,
-        )
-
-        if len(active_borrowings) >= self.bookcase_item.amount:
+        if self.bookcase_item.available_amount == 0:
             print("This item is currently not available")
             print()
             print("Active borrowings:")
 
-            for b in active_borrowings:
+            for b in list_active_borrowings_for_item(self.sql_session, self.bookcase_item):
                 print(f"  {b.username} - Until {format_date(b.end_time)}")
 
-            if len(self.bookcase_item.borrowing_queue) > 0:
+            if self.bookcase_item.pending_queue_count > 0:
                 print("Borrowing queue:")
-                for i, b in enumerate(self.bookcase_item.borrowing_queue):
+                borrowing_queue = list_pending_queue_items_for_item(
+                    self.sql_session,
+                    self.bookcase_item,
+                )
+                for i, b in enumerate(borrowing_queue):
                     print(f"  {i + 1} - {b.username}")
 
             print()
@@ -179,16 +177,15 @@ class BookcaseItemCli(NumberedCmd):
             print("No one seems to have borrowed this item")
             return
 
-        borrowing_queue = list_pending_queue_items_for_item(
-            self.sql_session,
-            self.bookcase_item,
-        )
-
-        if len(borrowing_queue) != 0:
+        if self.bookcase_item.pending_queue_count != 0:
             print(
                 "Sorry, you cannot extend the borrowing because there are people waiting in the queue",
             )
             print("Borrowing queue:")
+            borrowing_queue = list_pending_queue_items_for_item(
+                self.sql_session,
+                self.bookcase_item,
+            )
             for i, b in enumerate(borrowing_queue):
                 print(f"  {i + 1}) {b.username}")
             return
@@ -204,7 +201,7 @@ class BookcaseItemCli(NumberedCmd):
         borrowing = selector.result
 
         borrowing.end_time = datetime.now() + timedelta(
-            days=int(Config["deadline_daemon.days_before_queue_position_expires"]),
+            days=Config.snapshot().deadline_daemon.days_before_queue_position_expires,
         )
         self.sql_session.flush()
 
@@ -243,7 +240,7 @@ class BookcaseItemCli(NumberedCmd):
     }
 
 
-class EditBookcaseCli(NumberedCmd):
+class EditBookcaseCli(ProfiledCmd):
     bookcase_item: BookcaseItem
     parent: BookcaseItemCli
 
@@ -1,25 +1,42 @@
-from libdib.repl import (
-    NumberedCmd,
-    NumberedItemSelector,
-)
+from libdib.repl import NumberedItemSelector
 from sqlalchemy.orm import Session
 
 from worblehat.queries import (
     list_bookcase_items_by_owner,
-    search_authors_by_name,
+    search_authors_by_name_with_items,
     search_bookcase_item_owners,
+    search_bookcase_items,
     search_bookcase_items_by_title,
 )
 
+from ..profiled_cmd import ProfiledCmd
+
 
-class SearchCli(NumberedCmd):
+class SearchCli(ProfiledCmd):
     def __init__(self, sql_session: Session) -> None:
         super().__init__()
         self.sql_session = sql_session
         self.result = None
 
-    def do_search_all(self, _: str) -> None:
-        print("TODO: Implement search all")
+    def do_search_all(self, _: str) -> bool | None:
+        while (input_text := input("Enter search text: ")) == "":
+            pass
+
+        items = search_bookcase_items(self.sql_session, input_text)
+
+        if len(items) == 0:
+            print("No items found.")
+            return None
+
+        selector = NumberedItemSelector(
+            items=items,
+            stringify=lambda item: f"{item.name} ({item.isbn}, owned by {item.owner})",
+        )
+        selector.cmdloop()
+        if selector.result is not None:
+            self.result = selector.result
+            return True
+        return None
 
     def do_search_title(self, _: str) -> bool | None:
         while (input_text := input("Enter title: ")) == "":
@@ -45,7 +62,7 @@ class SearchCli(NumberedCmd):
         while (input_text := input("Enter author name: ")) == "":
             pass
 
-        author = search_authors_by_name(self.sql_session, input_text)
+        author = search_authors_by_name_with_items(self.sql_session, input_text)
 
         if len(author) == 0:
             print("No authors found.")
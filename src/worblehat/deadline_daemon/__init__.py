@@ -1,3 +1,7 @@
 from .main import DeadlineDaemon
+from .scheduler import DeadlineDaemonScheduler
 
-__all__ = ["DeadlineDaemon"]
+__all__ = [
+    "DeadlineDaemon",
+    "DeadlineDaemonScheduler",
+]
@@ -1,6 +1,9 @@
 import logging
+from collections.abc import Callable, Sequence
 from datetime import datetime, timedelta
+from itertools import batched
 from textwrap import dedent
+from typing import TypeVar
 
 from sqlalchemy.orm import Session
 
@@ -10,54 +13,157 @@ from worblehat.models import (
     DeadlineDaemonLastRunDatetime,
 )
 from worblehat.queries import (
+    expire_overdue_queue_positions,
     find_last_run,
-    find_next_queue_position,
     list_close_deadline_borrowings,
     list_expiring_queue_positions,
     list_newly_available_queue_items,
-    list_overdue_queue_positions,
     list_undelivered_overdue_borrowings,
 )
 from worblehat.services.config import Config
-from worblehat.services.email import send_email
+from worblehat.services.email import enqueue_email
+from worblehat.services.sql_profiler import sql_profiler
+
+_Row = TypeVar("_Row", BookcaseItemBorrowing, BookcaseItemBorrowingQueue)
 
 
 class DeadlineDaemon:
-    def __init__(self, sql_session: Session) -> None:
-        if not Config["deadline_daemon.enabled"]:
+    """
+    Finds the borrowings and queue positions that users should be notified about,
+    and adds the corresponding mails to the outbox.
+
+    The mails are sent afterwards by `worblehat.services.email.send_outbox_emails`,
+    so a slow or failing SMTP server never leaves a run half done.
+
+    Each routine is split into named steps, whose rows are handled and committed in batches of
+    `deadline_daemon.commit_batch_size`. The progress is stored in the last run row, so that
+    a run which was interrupted is resumed by the next one, without handling any rows twice.
+    The last run time is only advanced once every step has been completed.
+
+    The steps are named after their routine and its parameter, such as the amount of days
+    before a deadline, so that the progress still applies if the configuration has changed.
+    """
+
+    def __init__(
+        self,
+        sql_session: Session,
+        current_run_datetime: datetime | None = None,
+    ) -> None:
+        """
+        The run is performed as of `current_run_datetime`, which defaults to the current time.
+        """
+        self.config = Config.snapshot().deadline_daemon
+        if not self.config.enabled:
             return
 
         self.sql_session = sql_session
 
+        # Recipients of the mails queued during this run
+        self.queued_mails: list[str] = []
+
+        if current_run_datetime is None:
+            current_run_datetime = datetime.now()
+
         self.last_run = find_last_run(self.sql_session)
 
         if self.last_run is None:
             logging.info("No previous run found, assuming this is the first run")
-            self.last_run = DeadlineDaemonLastRunDatetime(time=datetime.now())
+            self.last_run = DeadlineDaemonLastRunDatetime(time=current_run_datetime)
             self.sql_session.add(self.last_run)
             self.sql_session.commit()
 
         self.last_run_datetime = self.last_run.time
-        self.current_run_datetime = datetime.now()
+        if self.last_run.current_run_time is not None:
+            logging.info(
+                f"Resuming the interrupted run started at {self.last_run.current_run_time}",
+            )
+            self.current_run_datetime = self.last_run.current_run_time
+        else:
+            self.current_run_datetime = current_run_datetime
+
+        self.commit_batch_size = self.config.commit_batch_size
 
     def run(self) -> None:
         logging.info("Deadline daemon started")
-        if not Config["deadline_daemon.enabled"]:
+        if not self.config.enabled:
             logging.warn("Deadline daemon disabled, exiting")
             return
 
-        if Config["deadline_daemon.dryrun"]:
+        if self.config.dryrun:
             logging.warn("Running in dryrun mode")
 
-        self.send_close_deadline_reminder_mails()
-        self.send_overdue_mails()
-        self.send_newly_available_mails()
-        self.send_expiring_queue_position_mails()
-        self.auto_expire_queue_positions()
+        try:
+            self.last_run.current_run_time = self.current_run_datetime
+            self.sql_session.commit()
+
+            for routine in [
+                self.send_close_deadline_reminder_mails,
+                self.send_overdue_mails,
+                self.send_newly_available_mails,
+                self.send_expiring_queue_position_mails,
+                self.auto_expire_queue_positions,
+            ]:
+                with sql_profiler.scope(f"deadline-daemon {routine.__name__}"):
+                    routine()
+
+            self.last_run.time = self.current_run_datetime
+            self.last_run.current_run_time = None
+            self.last_run.completed_run_steps = None
+            self.last_run.current_run_cursors = None
+            self.sql_session.commit()
+        except Exception:
+            self.sql_session.rollback()
+            raise
 
-        self.last_run.time = self.current_run_datetime
+        logging.info(f"Queued {len(self.queued_mails)} mails")
+
+    def _run_step(
+        self,
+        step: str,
+        list_rows: Callable[[], Sequence[_Row]],
+        handle_row: Callable[[_Row], None],
+        batch_size: int | None = None,
+    ) -> None:
+        """
+        Handles the rows of the step named `step` in order of uid, committing the progress
+        after every batch. A batch size of 0 handles the whole step in a single transaction.
+
+        Steps and rows which were handled before the run was interrupted are skipped.
+        """
+        if step in (self.last_run.completed_run_steps or []):
+            return
+
+        rows = sorted(list_rows(), key=lambda row: row.uid)
+        cursor = (self.last_run.current_run_cursors or {}).get(step)
+        if cursor is not None:
+            rows = [row for row in rows if row.uid > cursor]
+
+        if batch_size is None:
+            batch_size = self.commit_batch_size
+        for batch in batched(rows, batch_size if batch_size > 0 else max(len(rows), 1)):
+            for row in batch:
+                handle_row(row)
+            # NOTE: The JSON columns are replaced rather than changed in place,
+            #       since changes within them are not tracked by the session.
+            self.last_run.current_run_cursors = {
+                **(self.last_run.current_run_cursors or {}),
+                step: batch[-1].uid,
+            }
+            self.sql_session.commit()
+
+        cursors = {
+            other_step: cursor
+            for other_step, cursor in (self.last_run.current_run_cursors or {}).items()
+            if other_step != step
+        }
+        self.last_run.completed_run_steps = [*(self.last_run.completed_run_steps or []), step]
+        self.last_run.current_run_cursors = cursors or None
         self.sql_session.commit()
 
+    def _send_email(self, to: str, subject: str, body: str) -> None:
+        enqueue_email(self.sql_session, to, subject, body)
+        self.queued_mails.append(to)
+
     ###################
     # EMAIL TEMPLATES #
     ###################
@@ -66,7 +172,7 @@ class DeadlineDaemon:
         logging.info(
             f"Sending close deadline mail to {borrowing.username}@pvv.ntnu.no.",
         )
-        send_email(
+        self._send_email(
             f"{borrowing.username}@pvv.ntnu.no",
             "Reminder - Your borrowing deadline is approaching",
             dedent(
@@ -84,7 +190,7 @@ class DeadlineDaemon:
         logging.info(
             f"Sending overdue mail to {borrowing.username}@pvv.ntnu.no for {borrowing.item.isbn} - {borrowing.end_time.strftime('%a %b %d, %Y')}",
         )
-        send_email(
+        self._send_email(
             f"{borrowing.username}@pvv.ntnu.no",
             "Your deadline has passed",
             dedent(
@@ -101,10 +207,10 @@ class DeadlineDaemon:
     def _send_newly_available_mail(self, queue_item: BookcaseItemBorrowingQueue) -> None:
         logging.info(f"Sending newly available mail to {queue_item.username}")
 
-        days_before_queue_expires = Config["deadline_daemon.days_before_queue_position_expires"]
+        days_before_queue_expires = self.config.days_before_queue_position_expires
 
         # TODO: calculate and format the date of when the queue position expires in the mail.
-        send_email(
+        self._send_email(
             f"{queue_item.username}@pvv.ntnu.no",
             "An item you have queued for is now available",
             dedent(
@@ -126,7 +232,7 @@ class DeadlineDaemon:
         logging.info(
             f"Sending queue position expiry reminder to {queue_position.username}@pvv.ntnu.no.",
         )
-        send_email(
+        self._send_email(
             f"{queue_position.username}@pvv.ntnu.no",
             "Reminder - Your queue position expiry deadline is approaching",
             dedent(
@@ -144,7 +250,7 @@ class DeadlineDaemon:
         self,
         queue_position: BookcaseItemBorrowingQueue,
     ) -> None:
-        send_email(
+        self._send_email(
             f"{queue_position.username}@pvv.ntnu.no",
             "Your queue position has expired",
             dedent(
@@ -155,7 +261,7 @@ class DeadlineDaemon:
 
                 You can queue for the item again at any time, but you will be placed at the back of the queue.
 
-                There are currently {len(queue_position.item.borrowing_queue)} users in the queue.
+                There are currently {queue_position.item.pending_queue_count} users in the queue.
                 """,
             ).strip(),
         )
@@ -167,99 +273,93 @@ class DeadlineDaemon:
     def send_close_deadline_reminder_mails(self) -> None:
         logging.info("Sending mails for items with a closing deadline")
 
-        # TODO: This should be int-parsed and validated before the daemon started
-        days = [int(d) for d in Config["deadline_daemon.warn_days_before_borrowing_deadline"]]
-
-        for day in days:
-            borrowings_to_remind = list_close_deadline_borrowings(
-                self.sql_session,
-                day,
-                self.last_run_datetime,
-                self.current_run_datetime,
+        for day in self.config.warn_days_before_borrowing_deadline:
+            self._run_step(
+                f"send_close_deadline_reminder_mails[{day}]",
+                lambda day=day: list_close_deadline_borrowings(
+                    self.sql_session,
+                    day,
+                    self.last_run_datetime,
+                    self.current_run_datetime,
+                ),
+                self._send_close_deadline_mail,
             )
-            for borrowing in borrowings_to_remind:
-                self._send_close_deadline_mail(borrowing)
 
     def send_overdue_mails(self) -> None:
         logging.info("Sending mails for overdue items")
 
-        to_remind = list_undelivered_overdue_borrowings(
-            self.sql_session,
-            self.current_run_datetime,
+        self._run_step(
+            "send_overdue_mails",
+            lambda: list_undelivered_overdue_borrowings(
+                self.sql_session,
+                self.current_run_datetime,
+            ),
+            self._send_overdue_mail,
         )
 
-        for borrowing in to_remind:
-            self._send_overdue_mail(borrowing)
-
     def send_newly_available_mails(self) -> None:
         logging.info("Sending mails about newly available items")
 
-        newly_available = list_newly_available_queue_items(
-            self.sql_session,
-            self.last_run_datetime,
-            self.current_run_datetime,
-        )
-
-        for queue_item in newly_available:
+        def make_available(queue_item: BookcaseItemBorrowingQueue) -> None:
             logging.info(
                 f"Adding user {queue_item.username} to queue for {queue_item.item.name}",
             )
             queue_item.item_became_available_time = self.current_run_datetime
-            self.sql_session.commit()
-
             self._send_newly_available_mail(queue_item)
 
+        self._run_step(
+            "send_newly_available_mails",
+            lambda: list_newly_available_queue_items(
+                self.sql_session,
+                self.last_run_datetime,
+                self.current_run_datetime,
+            ),
+            make_available,
+        )
+
     def send_expiring_queue_position_mails(self) -> None:
         logging.info("Sending mails about queue positions which are expiring soon")
         logging.warning("Not implemented")
 
-        days = [
-            int(d)
-            for d in Config["deadline_daemon.warn_days_before_expiring_queue_position_deadline"]
-        ]
-        for day in days:
-            queue_positions_to_remind = list_expiring_queue_positions(
-                self.sql_session,
-                self.last_run_datetime,
-                self.current_run_datetime,
+        for day in self.config.warn_days_before_expiring_queue_position_deadline:
+            self._run_step(
+                f"send_expiring_queue_position_mails[{day}]",
+                lambda: list_expiring_queue_positions(
+                    self.sql_session,
+                    self.last_run_datetime,
+                    self.current_run_datetime,
+                ),
+                lambda queue_position, day=day: self._send_expiring_queue_position_mail(
+                    queue_position,
+                    day,
+                ),
             )
 
-            for queue_position in queue_positions_to_remind:
-                self._send_expiring_queue_position_mail(queue_position, day)
-
     def auto_expire_queue_positions(self) -> None:
         logging.info("Expiring queue positions which are too old")
 
-        queue_position_expiry_days = int(
-            Config["deadline_daemon.days_before_queue_position_expires"],
-        )
-
-        overdue_queue_positions = list_overdue_queue_positions(
-            self.sql_session,
-            queue_position_expiry_days,
-            self.current_run_datetime,
-        )
-
-        for queue_position in overdue_queue_positions:
-            logging.info(
-                f"Expiring queue position for {queue_position.username} for item {queue_position.item.name}",
-            )
-
-            queue_position.expired = True
+        queue_position_expiry_days = self.config.days_before_queue_position_expires
 
-            next_queue_position = find_next_queue_position(
+        def expire_queue_positions() -> list[BookcaseItemBorrowingQueue]:
+            expired_queue_positions, next_queue_positions = expire_overdue_queue_positions(
                 self.sql_session,
-                queue_position.fk_bookcase_item_uid,
+                queue_position_expiry_days,
+                self.current_run_datetime,
             )
+            return [*expired_queue_positions, *next_queue_positions]
 
-            self._send_queue_position_expired_mail(queue_position)
-
-            if next_queue_position is not None:
-                next_queue_position.item_became_available_time = self.current_run_datetime
-
+        def notify(queue_position: BookcaseItemBorrowingQueue) -> None:
+            if queue_position.expired:
                 logging.info(
-                    f"Next user in queue for item {next_queue_position.item.name} is {next_queue_position.username}",
+                    f"Expired queue position for {queue_position.username} for item {queue_position.item.name}",
                 )
-                self._send_newly_available_mail(next_queue_position)
+                self._send_queue_position_expired_mail(queue_position)
+            else:
+                logging.info(
+                    f"Next user in queue for item {queue_position.item.name} is {queue_position.username}",
+                )
+                self._send_newly_available_mail(queue_position)
 
-            self.sql_session.commit()
+        # NOTE: The positions are updated in bulk before any mail is queued,
+        #       so this step has to be committed as a whole.
+        self._run_step("auto_expire_queue_positions", expire_queue_positions, notify, batch_size=0)
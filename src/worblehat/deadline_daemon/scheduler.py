@@ -0,0 +1,127 @@
+import fcntl
+import logging
+import random
+import signal
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event
+from typing import Self
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from worblehat.services.archive import archive_history_from_config
+from worblehat.services.config import Config
+from worblehat.services.email import SmtpTransport, send_outbox_emails
+from worblehat.services.sql_profiler import sql_profiler
+
+from .main import DeadlineDaemon
+
+
+@contextmanager
+def _try_lock(path: Path) -> Iterator[bool]:
+    """
+    Takes an exclusive lock on the given file without blocking,
+    and yields whether the lock was acquired.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class DeadlineDaemonScheduler:
+    """
+    Runs the deadline daemon followed by the outbox sender and the archiving of old borrowings,
+    either once or at a fixed interval.
+
+    When running at an interval, the same database engine and SMTP connection is reused for
+    every run. Each run holds a lock file, so that runs from several processes, like a resident
+    scheduler and a manually started run, never overlap.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        interval_seconds: float,
+        jitter_seconds: float,
+        lock_path: Path,
+    ) -> None:
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.lock_path = lock_path
+
+        self.smtp_transport: SmtpTransport | None = None
+        config = Config.snapshot()
+        if config.smtp.enabled and not config.deadline_daemon.dryrun:
+            self.smtp_transport = SmtpTransport.from_config()
+
+        self._stopped = Event()
+
+    @classmethod
+    def from_config(cls, engine: Engine) -> Self:
+        config = Config.snapshot().deadline_daemon
+        return cls(
+            engine,
+            interval_seconds=config.interval_seconds,
+            jitter_seconds=config.jitter_seconds,
+            lock_path=config.lock_file,
+        )
+
+    def run_once(self) -> None:
+        with _try_lock(self.lock_path) as locked:
+            if not locked:
+                logging.warning(
+                    f"Another deadline daemon run holds {self.lock_path}, skipping this run",
+                )
+                return
+
+            with Session(self.engine) as sql_session:
+                DeadlineDaemon(sql_session).run()
+                with sql_profiler.scope("deadline-daemon send_outbox_emails"):
+                    report = send_outbox_emails(sql_session, transport=self.smtp_transport)
+                logging.info(report.summary())
+
+                if Config.snapshot().archive.enabled:
+                    with sql_profiler.scope("deadline-daemon archive_history"):
+                        archive_report = archive_history_from_config(sql_session)
+                    logging.info(archive_report.summary())
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run_forever(self) -> None:
+        """
+        Runs until stopped by `stop()`, SIGINT or SIGTERM. A run which is in progress
+        when the signal arrives is allowed to finish.
+        """
+        signal.signal(signal.SIGTERM, lambda _signum, _frame: self.stop())
+        signal.signal(signal.SIGINT, lambda _signum, _frame: self.stop())
+
+        logging.info(
+            f"Running the deadline daemon every {self.interval_seconds} seconds, "
+            f"with up to {self.jitter_seconds} seconds of jitter",
+        )
+        try:
+            while not self._stopped.is_set():
+                try:
+                    self.run_once()
+                except Exception:
+                    logging.exception("Deadline daemon run failed, retrying at the next interval")
+
+                # NOTE: The jitter only spreads out the runs, so it does not need a secure random
+                delay = self.interval_seconds + random.uniform(0, self.jitter_seconds)  # noqa: S311
+                self._stopped.wait(delay)
+        finally:
+            if self.smtp_transport is not None:
+                self.smtp_transport.close()
+        logging.info("Deadline daemon stopped")
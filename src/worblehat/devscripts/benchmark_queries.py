@@ -0,0 +1,383 @@
+"""
+Times every public function in `worblehat.queries` against a large, synthetic library,
+and compares the timings against a baseline from an earlier run.
+
+Each database url is benchmarked separately, so the same run can cover both SQLite and
+PostgreSQL. The databases should either be empty, in which case they are filled by
+`seed_large_library`, or contain a library generated by an earlier benchmark run.
+"""
+
+import inspect
+import json
+import platform
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Self
+
+import sqlalchemy
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+import worblehat.queries
+from worblehat.models import (
+    Author,
+    Base,
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+)
+
+from .seed_large_library import (
+    DEFAULT_BORROWINGS,
+    DEFAULT_ITEMS,
+    DEFAULT_QUEUE_ENTRIES,
+    seed_large_library,
+)
+
+# Differences below this are considered noise, no matter how large they are relative to the baseline
+MIN_REGRESSION_MS = 1.0
+
+_QUEUE_POSITION_EXPIRY_DAYS = 14
+
+
+@dataclass
+class BenchmarkContext:
+    """
+    Realistic arguments for the queries, picked from the generated library.
+    The item is the one with the longest queue, so it has plenty of related rows.
+    """
+
+    now: datetime
+    last_run: datetime
+    bookcase: Bookcase
+    item: BookcaseItem
+    isbn: str
+    isbns: list[str]
+    item_uids: list[int]
+    item_name: str
+    author_names: list[str]
+    owner: str
+    username: str
+
+    @classmethod
+    def from_database(cls, sql_session: Session) -> Self:
+        item_uid = sql_session.scalars(
+            select(BookcaseItemBorrowingQueue.fk_bookcase_item_uid)
+            .group_by(BookcaseItemBorrowingQueue.fk_bookcase_item_uid)
+            .order_by(func.count().desc())
+            .limit(1),
+        ).one()
+        item = sql_session.get_one(BookcaseItem, item_uid)
+        username = sql_session.scalars(
+            select(BookcaseItemBorrowingQueue.username)
+            .where(BookcaseItemBorrowingQueue.fk_bookcase_item_uid == item_uid)
+            .limit(1),
+        ).one()
+        owner = sql_session.scalars(
+            select(BookcaseItem.owner).where(BookcaseItem.owner != "PVV").limit(1),
+        ).one_or_none()
+
+        now = datetime.now()
+        return cls(
+            now=now,
+            last_run=now - timedelta(days=1),
+            bookcase=item.shelf.bookcase,
+            item=item,
+            isbn=item.isbn,
+            isbns=list(
+                sql_session.scalars(
+                    select(BookcaseItem.isbn).order_by(BookcaseItem.uid).limit(100),
+                ).all(),
+            ),
+            item_uids=list(
+                sql_session.scalars(
+                    select(BookcaseItem.uid).order_by(BookcaseItem.uid).limit(100),
+                ).all(),
+            ),
+            item_name=item.name,
+            author_names=list(
+                sql_session.scalars(select(Author.name).order_by(Author.uid).limit(10)).all(),
+            ),
+            owner=owner or "PVV",
+            username=username,
+        )
+
+    def refresh(self, sql_session: Session) -> None:
+        """
+        Reloads the ORM objects after a rollback, so that the reload is not timed as part of
+        the next query.
+        """
+        sql_session.refresh(self.bookcase)
+        sql_session.refresh(self.item)
+
+
+# Function name -> arguments after the session
+QUERY_ARGUMENTS: dict[str, Callable[[BenchmarkContext], tuple]] = {
+    "expire_overdue_queue_positions": lambda c: (_QUEUE_POSITION_EXPIRY_DAYS, c.now),
+    "find_bookcase_by_name": lambda c: (c.bookcase.name,),
+    "find_bookcase_item_by_isbn": lambda c: (c.isbn,),
+    "find_bookcase_item_by_name": lambda c: (c.item_name,),
+    "find_bookcase_item_with_details_by_isbn": lambda c: (c.isbn,),
+    "find_bookcase_shelf": lambda c: (c.bookcase, 1, 1),
+    "find_last_run": lambda c: (),
+    "find_media_type_by_name": lambda c: ("Book",),
+    "find_next_queue_position": lambda c: (c.item.uid,),
+    "has_active_borrowing": lambda c: (c.username, c.item),
+    "is_in_borrowing_queue": lambda c: (c.username, c.item),
+    "list_active_borrowings": lambda c: (),
+    "list_active_borrowings_for_item": lambda c: (c.item,),
+    "list_active_borrowings_with_items": lambda c: (),
+    "list_all_queue_items": lambda c: (),
+    "list_all_queue_items_with_items": lambda c: (),
+    "list_authors_by_names": lambda c: (c.author_names,),
+    "list_bookcase_item_availability": lambda c: (c.item_uids,),
+    "list_bookcase_items_by_isbns": lambda c: (c.isbns,),
+    "list_bookcase_items_by_owner": lambda c: (c.owner,),
+    "list_bookcase_items_with_details": lambda c: (c.item.uid, 100),
+    "list_bookcase_shelf_positions": lambda c: (c.bookcase,),
+    "list_bookcase_shelfs_ordered": lambda c: (),
+    "list_bookcase_shelfs_with_items": lambda c: (c.bookcase,),
+    "list_bookcases": lambda c: (),
+    "list_borrowing_history": lambda c: (c.item.uid,),
+    "list_borrowings_for_isbn": lambda c: (c.isbn,),
+    "list_close_deadline_borrowings": lambda c: (5, c.last_run, c.now),
+    "list_expiring_queue_positions": lambda c: (c.last_run, c.now),
+    "list_newly_available_queue_items": lambda c: (c.last_run, c.now),
+    "list_overdue_borrowings": lambda c: (),
+    "list_overdue_borrowings_with_items": lambda c: (),
+    "list_overdue_queue_positions": lambda c: (_QUEUE_POSITION_EXPIRY_DAYS, c.now),
+    "list_pending_outbox_emails": lambda c: (c.now, 6),
+    "list_pending_queue_items_for_item": lambda c: (c.item,),
+    "list_queue_position_history": lambda c: (c.item.uid,),
+    "list_undelivered_overdue_borrowings": lambda c: (c.now,),
+    "search_authors_by_name": lambda c: ("grace",),
+    "search_authors_by_name_with_items": lambda c: ("grace",),
+    "search_bookcase_item_owners": lambda c: ("user1",),
+    "search_bookcase_items": lambda c: ("programming",),
+    "search_bookcase_items_by_title": lambda c: ("programming",),
+    "search_bookcase_items_with_details": lambda c: ("programming",),
+}
+
+
+@dataclass
+class QueryTiming:
+    median_ms: float
+    min_ms: float
+    rows: int
+
+
+def _count_rows(result: object) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, tuple):
+        return sum(_count_rows(part) for part in result)
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def query_function_names() -> list[str]:
+    return sorted(
+        name
+        for name in worblehat.queries.__all__
+        if inspect.isfunction(getattr(worblehat.queries, name))
+    )
+
+
+def benchmark_queries(sql_session: Session, repeat: int = 5) -> dict[str, QueryTiming]:
+    """
+    Times each function in `worblehat.queries` `repeat` times, after a single warm-up call.
+
+    Every call is followed by a rollback, so that queries which modify rows
+    see the same data each time.
+    """
+    missing = sorted(set(query_function_names()) - QUERY_ARGUMENTS.keys())
+    if len(missing) > 0:
+        raise ValueError(f"No benchmark arguments for: {', '.join(missing)}")
+
+    context = BenchmarkContext.from_database(sql_session)
+    sql_session.rollback()
+
+    timings: dict[str, QueryTiming] = {}
+    for name in query_function_names():
+        function = getattr(worblehat.queries, name)
+        durations: list[float] = []
+        rows = 0
+        for _ in range(repeat + 1):
+            context.refresh(sql_session)
+            arguments = QUERY_ARGUMENTS[name](context)
+
+            start = time.perf_counter()
+            result = function(sql_session, *arguments)
+            durations.append((time.perf_counter() - start) * 1000)
+
+            rows = _count_rows(result)
+            del result
+            sql_session.rollback()
+
+        durations = durations[1:]
+        timings[name] = QueryTiming(
+            median_ms=statistics.median(durations),
+            min_ms=min(durations),
+            rows=rows,
+        )
+    return timings
+
+
+def _count_library(sql_session: Session) -> dict[str, int]:
+    return {
+        model.__tablename__: sql_session.scalars(
+            select(func.count()).select_from(model),
+        ).one()
+        for model in [BookcaseItem, BookcaseItemBorrowing, BookcaseItemBorrowingQueue]
+    }
+
+
+def benchmark_database(
+    database_url: str,
+    items: int,
+    borrowings: int,
+    queue_entries: int,
+    repeat: int,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Benchmarks a single database, generating the library first if the database is empty.
+    Returns the dialect name together with the library size and the timings.
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    database_name = engine.url.render_as_string(hide_password=True)
+
+    with Session(engine) as sql_session:
+        if sql_session.scalars(select(func.count()).select_from(BookcaseItem)).one() == 0:
+            print(
+                f"Generating {items} items, {borrowings} borrowings and {queue_entries} "
+                f"queue entries in '{database_name}'",
+            )
+            seed_large_library(sql_session, items, borrowings, queue_entries)
+        else:
+            print(f"Reusing the existing library in '{database_name}'")
+
+        sql_session.execute(text("ANALYZE"))
+        sql_session.commit()
+
+        print(f"Benchmarking queries in '{database_name}'")
+        library = _count_library(sql_session)
+        timings = benchmark_queries(sql_session, repeat)
+
+    engine.dispose()
+    return engine.dialect.name, {
+        "library": library,
+        "queries": {name: asdict(timing) for name, timing in timings.items()},
+    }
+
+
+def compare_with_baseline(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """
+    Returns a description of every query whose median time is more than `tolerance` times
+    the median time in the baseline, for the same kind of database.
+    """
+    regressions: list[str] = []
+    for dialect_name, database_results in results["databases"].items():
+        baseline_results = baseline["databases"].get(dialect_name)
+        if baseline_results is None:
+            continue
+
+        if database_results["library"] != baseline_results["library"]:
+            print(
+                f"Warning: the {dialect_name} library differs in size from the baseline, "
+                "so the timings might not be comparable",
+            )
+
+        for name, timing in database_results["queries"].items():
+            baseline_timing = baseline_results["queries"].get(name)
+            if baseline_timing is None:
+                continue
+
+            median_ms = timing["median_ms"]
+            baseline_ms = baseline_timing["median_ms"]
+            if median_ms > baseline_ms * tolerance and median_ms - baseline_ms > MIN_REGRESSION_MS:
+                regressions.append(
+                    f"{dialect_name}: {name} took {median_ms:.1f} ms, "
+                    f"against {baseline_ms:.1f} ms in the baseline",
+                )
+    return regressions
+
+
+def _print_results(results: dict[str, Any]) -> None:
+    for dialect_name, database_results in results["databases"].items():
+        print(f"\n{dialect_name}:")
+        for name, timing in database_results["queries"].items():
+            print(f"  {name:<40} {timing['median_ms']:>10.2f} ms {timing['rows']:>10} rows")
+
+
+def main(
+    database_urls: list[str] | None,
+    scale: float,
+    repeat: int,
+    output: Path,
+    baseline: Path | None,
+    tolerance: float,
+) -> int:
+    """
+    Runs the benchmarks, writes the results to `output`, and returns 1 if any query has
+    regressed compared to `baseline`, or else 0. Without any database urls, the benchmarks
+    are run against a temporary SQLite database.
+    """
+    items = max(1, int(DEFAULT_ITEMS * scale))
+    borrowings = max(1, int(DEFAULT_BORROWINGS * scale))
+    queue_entries = max(1, int(DEFAULT_QUEUE_ENTRIES * scale))
+
+    results: dict[str, Any] = {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "repeat": repeat,
+        "databases": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not database_urls:
+            database_urls = [f"sqlite:///{Path(temp_dir) / 'benchmark.sqlite'}"]
+
+        for database_url in database_urls:
+            dialect_name, database_results = benchmark_database(
+                database_url,
+                items,
+                borrowings,
+                queue_entries,
+                repeat,
+            )
+            results["databases"][dialect_name] = database_results
+
+    _print_results(results)
+
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to '{output}'")
+
+    if baseline is None:
+        return 0
+
+    regressions = compare_with_baseline(
+        results,
+        json.loads(baseline.read_text()),
+        tolerance,
+    )
+    if len(regressions) == 0:
+        print(f"No regressions compared to '{baseline}'")
+        return 0
+
+    print(f"Found {len(regressions)} regressions compared to '{baseline}':")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
@@ -0,0 +1,171 @@
+"""
+Measures how long each subcommand of `worblehat` takes to import what it needs before it
+starts working, and fails if any of them is over its budget, or imports modules it should not.
+
+Every measurement is done in a fresh interpreter, since the imports are cached within a process.
+The modules of each subcommand are listed here by hand, and should follow the imports
+in `worblehat.main`.
+"""
+
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import worblehat
+
+# Web server and Flask
+_WEB_MODULES = (
+    "flask",
+    "flask_admin",
+    "flask_sqlalchemy",
+    "gunicorn",
+    "werkzeug",
+    "worblehat.flaskapp",
+)
+# Book data fetchers and their HTTP and HTML parsing libraries
+_FETCHER_MODULES = ("bs4", "requests", "worblehat.book_data_fetchers")
+# The interactive CLI
+_CLI_MODULES = ("libdib", "worblehat.cli")
+
+
+@dataclass(frozen=True)
+class StartupCommand:
+    name: str
+    modules: tuple[str, ...]
+    budget_ms: float
+    forbidden_modules: tuple[str, ...] = ()
+    # Third party packages the subcommand cannot be started without
+    requires: tuple[str, ...] = ()
+
+    def is_available(self) -> bool:
+        return all(importlib.util.find_spec(package) is not None for package in self.requires)
+
+
+STARTUP_COMMANDS = [
+    StartupCommand(
+        name="--help",
+        modules=("worblehat.main",),
+        budget_ms=75,
+        forbidden_modules=("sqlalchemy", *_WEB_MODULES, *_FETCHER_MODULES, *_CLI_MODULES),
+    ),
+    StartupCommand(
+        name="cli",
+        modules=("worblehat.main", "worblehat.cli"),
+        budget_ms=800,
+        forbidden_modules=(*_WEB_MODULES, *_FETCHER_MODULES),
+        requires=("libdib",),
+    ),
+    StartupCommand(
+        name="deadline-daemon",
+        modules=("worblehat.main", "worblehat.deadline_daemon.scheduler"),
+        budget_ms=600,
+        forbidden_modules=(*_WEB_MODULES, *_FETCHER_MODULES, *_CLI_MODULES),
+    ),
+    StartupCommand(
+        name="send-mail",
+        modules=("worblehat.main", "worblehat.services.email", "worblehat.services.sql_profiler"),
+        budget_ms=600,
+        forbidden_modules=(*_WEB_MODULES, *_FETCHER_MODULES, *_CLI_MODULES),
+    ),
+    StartupCommand(
+        name="flask-prod",
+        modules=("worblehat.main", "worblehat.flaskapp.wsgi_prod"),
+        budget_ms=1500,
+        forbidden_modules=_CLI_MODULES,
+        requires=("gunicorn",),
+    ),
+]
+
+_MEASURE_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+@dataclass(frozen=True)
+class StartupMeasurement:
+    import_ms: float
+    modules: frozenset[str]
+
+
+def measure_startup(command: StartupCommand) -> StartupMeasurement:
+    """
+    Imports the modules of `command` in a fresh interpreter, and returns how long it took,
+    along with every module which ended up being imported.
+    """
+    # Lets the interpreter find this copy of worblehat, also when it is not installed
+    source_root = str(Path(worblehat.__path__[0]).parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in [source_root, env.get("PYTHONPATH")] if path
+    )
+
+    # NOTE: The modules are listed in this file, so they are safe to pass on
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", _MEASURE_SCRIPT, *command.modules],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not import the modules of '{command.name}':\n{result.stderr}")
+
+    measurement = json.loads(result.stdout)
+    return StartupMeasurement(
+        import_ms=measurement["seconds"] * 1000,
+        modules=frozenset(measurement["modules"]),
+    )
+
+
+def forbidden_imports(command: StartupCommand, measurement: StartupMeasurement) -> list[str]:
+    """Returns the forbidden modules, or submodules thereof, which `command` imported."""
+    return sorted(
+        forbidden
+        for forbidden in command.forbidden_modules
+        if any(
+            module == forbidden or module.startswith(f"{forbidden}.")
+            for module in measurement.modules
+        )
+    )
+
+
+def main(repeat: int, output: Path | None, budget_scale: float) -> int:
+    results = {}
+    problems = []
+
+    print(f"  {'command':<20} {'median ms':>10} {'budget ms':>10}")
+    for command in STARTUP_COMMANDS:
+        if not command.is_available():
+            print(f"  {command.name:<20} {'skipped, requires ' + ', '.join(command.requires)}")
+            continue
+
+        measurements = [measure_startup(command) for _ in range(repeat)]
+        median_ms = statistics.median(m.import_ms for m in measurements)
+        budget_ms = command.budget_ms * budget_scale
+        print(f"  {command.name:<20} {median_ms:>10.1f} {budget_ms:>10.1f}")
+
+        results[command.name] = {"median_ms": median_ms, "budget_ms": budget_ms}
+        if median_ms > budget_ms:
+            problems.append(
+                f"'{command.name}' took {median_ms:.1f} ms to import, "
+                f"over its budget of {budget_ms:.1f} ms",
+            )
+        if len(forbidden := forbidden_imports(command, measurements[0])) > 0:
+            problems.append(f"'{command.name}' imported {', '.join(forbidden)}")
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to '{output}'")
+
+    for problem in problems:
+        print(f"Error: {problem}")
+    return 1 if len(problems) > 0 else 0
@@ -24,17 +24,14 @@ def clear_db(sql_session: Session) -> None:
 #       it's just a quick and dirty way to get some data into the database
 #       for testing the deadline daemon - oysteikt 2024
 def main(sql_session: Session) -> None:
+    config = Config.snapshot().deadline_daemon
     borrow_warning_days = [
-        timedelta(days=int(d))
-        for d in Config["deadline_daemon.warn_days_before_borrowing_deadline"]
+        timedelta(days=d) for d in config.warn_days_before_borrowing_deadline
     ]
     queue_warning_days = [
-        timedelta(days=int(d))
-        for d in Config["deadline_daemon.warn_days_before_expiring_queue_position_deadline"]
+        timedelta(days=d) for d in config.warn_days_before_expiring_queue_position_deadline
     ]
-    queue_expire_days = int(
-        Config["deadline_daemon.days_before_queue_position_expires"],
-    )
+    queue_expire_days = config.days_before_queue_position_expires
 
     clear_db(sql_session)
     seed_test_data_main(sql_session)
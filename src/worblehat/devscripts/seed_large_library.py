@@ -0,0 +1,304 @@
+"""
+Generates a large, synthetic library, for benchmarking queries against realistic amounts of data.
+
+The rows are inserted with bulk insert statements and explicit primary keys, so the generator
+should only be used on an empty database.
+"""
+
+import random
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from itertools import batched
+
+from sqlalchemy import Table, insert, text
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Author,
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+    BookcaseShelf,
+    DeadlineDaemonLastRunDatetime,
+    Language,
+    MediaType,
+    OutboxEmail,
+    refresh_availability_counters,
+)
+from worblehat.models.xref_tables import Item_Author
+
+DEFAULT_ITEMS = 100_000
+DEFAULT_BORROWINGS = 1_000_000
+DEFAULT_QUEUE_ENTRIES = 50_000
+
+_INSERT_BATCH_SIZE = 10_000
+_HISTORY_DAYS = 5 * 365
+_BORROWING_DAYS = 30
+
+_TITLE_WORDS = [
+    "algorithms",
+    "analysis",
+    "applied",
+    "compilers",
+    "computer",
+    "concrete",
+    "data",
+    "design",
+    "discrete",
+    "distributed",
+    "engineering",
+    "functional",
+    "introduction",
+    "language",
+    "linear",
+    "logic",
+    "mathematics",
+    "networks",
+    "operating",
+    "principles",
+    "programming",
+    "structures",
+    "systems",
+    "theory",
+]
+_NAME_PARTS = [
+    "ada",
+    "alan",
+    "barbara",
+    "dennis",
+    "donald",
+    "edsger",
+    "grace",
+    "john",
+    "ken",
+    "leslie",
+    "margaret",
+    "niklaus",
+    "robin",
+    "tony",
+]
+
+
+def _insert_rows(sql_session: Session, table: Table, rows: Iterable[dict]) -> None:
+    for batch in batched(rows, _INSERT_BATCH_SIZE):
+        sql_session.execute(insert(table), list(batch))
+
+
+def _reset_postgresql_sequences(sql_session: Session, tables: list[Table]) -> None:
+    """
+    Moves the uid sequences past the explicitly inserted primary keys,
+    so that rows added later on get fresh uids.
+    """
+    # NOTE: The table names come from the models, so they are safe to format into the query
+    for table in tables:
+        sql_session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'uid'), "  # noqa: S608
+                f'COALESCE((SELECT MAX(uid) FROM "{table.name}"), 0) + 1, false)',
+            ),
+        )
+
+
+def _title(rng: random.Random, n: int) -> str:
+    words = rng.sample(_TITLE_WORDS, rng.randint(2, 5))
+    return " ".join(words).capitalize() + f", volume {n}"
+
+
+def _person_name(rng: random.Random, n: int) -> str:
+    return f"{rng.choice(_NAME_PARTS).capitalize()} {rng.choice(_NAME_PARTS).capitalize()} {n}"
+
+
+def _borrowing_rows(
+    rng: random.Random,
+    now: datetime,
+    items: int,
+    borrowings: int,
+) -> Iterator[dict]:
+    # About one in twenty items is currently borrowed, and about a third of those are overdue
+    active_borrowings = min(borrowings, max(1, items // 20))
+    for uid in range(1, borrowings + 1):
+        item_uid = rng.randint(1, items)
+        if uid <= active_borrowings:
+            start_time = now - timedelta(days=rng.uniform(0, _BORROWING_DAYS * 1.5))
+            delivered = None
+        else:
+            start_time = now - timedelta(days=rng.uniform(_BORROWING_DAYS, _HISTORY_DAYS))
+            delivered = start_time + timedelta(days=rng.uniform(1, _BORROWING_DAYS * 1.5))
+        yield {
+            "uid": uid,
+            "username": f"user{rng.randint(1, 2_000)}",
+            "start_time": start_time,
+            "end_time": start_time + timedelta(days=_BORROWING_DAYS),
+            "delivered": delivered,
+            "fk_bookcase_item_uid": item_uid,
+        }
+
+
+def _queue_rows(
+    rng: random.Random,
+    now: datetime,
+    items: int,
+    queue_entries: int,
+) -> Iterator[dict]:
+    # Most entries belong to finished queues, and queues cluster on a few popular items
+    popular_items = max(1, items // 50)
+    for uid in range(1, queue_entries + 1):
+        entered_queue_time = now - timedelta(days=rng.uniform(0, _HISTORY_DAYS))
+        state = rng.random()
+        if state < 0.2:
+            item_became_available_time = None
+            expired = False
+        elif state < 0.3:
+            item_became_available_time = entered_queue_time + timedelta(days=rng.uniform(0, 14))
+            expired = False
+        else:
+            item_became_available_time = entered_queue_time + timedelta(days=rng.uniform(0, 60))
+            expired = True
+        yield {
+            "uid": uid,
+            "username": f"user{rng.randint(1, 2_000)}",
+            "entered_queue_time": entered_queue_time,
+            "item_became_available_time": item_became_available_time,
+            "expired": expired,
+            "fk_bookcase_item_uid": rng.randint(1, popular_items),
+        }
+
+
+def seed_large_library(
+    sql_session: Session,
+    items: int = DEFAULT_ITEMS,
+    borrowings: int = DEFAULT_BORROWINGS,
+    queue_entries: int = DEFAULT_QUEUE_ENTRIES,
+    seed: int = 0,
+) -> None:
+    """
+    Fills an empty database with `items` items, `borrowings` borrowings and `queue_entries`
+    queue positions, spread over five years of history. The same seed gives the same library,
+    apart from the timestamps, which are relative to the current time.
+    """
+    # NOTE: Seeded, so that the same library can be generated again. Not used for anything secret.
+    rng = random.Random(seed)  # noqa: S311
+    now = datetime.now()
+
+    bookcases = max(1, items // 2_000)
+    shelf_columns = 4
+    shelf_rows = 6
+    shelves = bookcases * shelf_columns * shelf_rows
+    authors = max(1, items // 2)
+
+    _insert_rows(sql_session, MediaType.__table__, [{"uid": 1, "name": "Book"}])
+    _insert_rows(
+        sql_session,
+        Language.__table__,
+        [
+            {"uid": 1, "name": "English", "iso639_1_code": "en"},
+            {"uid": 2, "name": "Norwegian", "iso639_1_code": "no"},
+        ],
+    )
+    _insert_rows(
+        sql_session,
+        Bookcase.__table__,
+        ({"uid": uid, "name": f"bookcase_{uid}"} for uid in range(1, bookcases + 1)),
+    )
+    _insert_rows(
+        sql_session,
+        BookcaseShelf.__table__,
+        (
+            {
+                "uid": uid,
+                "fk_bookcase_uid": (uid - 1) // (shelf_columns * shelf_rows) + 1,
+                "column": (uid - 1) // shelf_rows % shelf_columns + 1,
+                "row": (uid - 1) % shelf_rows + 1,
+                "description": f"{rng.choice(_TITLE_WORDS)} shelf",
+            }
+            for uid in range(1, shelves + 1)
+        ),
+    )
+    _insert_rows(
+        sql_session,
+        Author.__table__,
+        ({"uid": uid, "name": _person_name(rng, uid)} for uid in range(1, authors + 1)),
+    )
+    _insert_rows(
+        sql_session,
+        BookcaseItem.__table__,
+        (
+            {
+                "uid": uid,
+                "isbn": f"978{uid:010d}",
+                "name": _title(rng, uid),
+                "owner": "PVV" if rng.random() < 0.8 else f"user{rng.randint(1, 2_000)}",
+                "amount": rng.choice([1, 1, 1, 2]),
+                "fk_media_type_uid": 1,
+                "fk_bookcase_shelf_uid": rng.randint(1, shelves),
+                "fk_language_uid": rng.choice([1, 1, 2]),
+            }
+            for uid in range(1, items + 1)
+        ),
+    )
+    _insert_rows(
+        sql_session,
+        Item_Author.__table__,
+        (
+            {"fk_item_uid": item_uid, "fk_author_uid": author_uid}
+            for item_uid in range(1, items + 1)
+            for author_uid in {rng.randint(1, authors) for _ in range(rng.randint(1, 2))}
+        ),
+    )
+    _insert_rows(
+        sql_session,
+        BookcaseItemBorrowing.__table__,
+        _borrowing_rows(rng, now, items, borrowings),
+    )
+    _insert_rows(
+        sql_session,
+        BookcaseItemBorrowingQueue.__table__,
+        _queue_rows(rng, now, items, queue_entries),
+    )
+    _insert_rows(
+        sql_session,
+        OutboxEmail.__table__,
+        (
+            {
+                "uid": uid,
+                "recipient": f"user{uid}@example.com",
+                "subject": "Queue position expired",
+                "body": "",
+                "created_time": now - timedelta(hours=uid),
+                "next_attempt_time": now - timedelta(hours=uid),
+                "attempts": uid % 3,
+                "sent_time": now if uid % 2 == 0 else None,
+            }
+            for uid in range(1, queue_entries // 100 + 1)
+        ),
+    )
+    _insert_rows(
+        sql_session,
+        DeadlineDaemonLastRunDatetime.__table__,
+        [{"uid": True, "time": now - timedelta(days=1)}],
+    )
+    # NOTE: The bulk inserts bypass the flush, which would otherwise keep these up to date
+    refresh_availability_counters(sql_session)
+
+    if sql_session.get_bind().dialect.name == "postgresql":
+        _reset_postgresql_sequences(
+            sql_session,
+            [
+                MediaType.__table__,
+                Language.__table__,
+                Bookcase.__table__,
+                BookcaseShelf.__table__,
+                Author.__table__,
+                BookcaseItem.__table__,
+                BookcaseItemBorrowing.__table__,
+                BookcaseItemBorrowingQueue.__table__,
+                OutboxEmail.__table__,
+            ],
+        )
+
+    sql_session.commit()
+
+
+def main(sql_session: Session) -> None:
+    seed_large_library(sql_session)
@@ -0,0 +1,348 @@
+"""
+Simulates months of borrowing and queue activity, and runs the deadline daemon at a fixed
+interval of simulated time, in order to measure how the daemon performs with realistic backlogs.
+
+The clock only exists within the simulation, and the mails are sent to an SMTP sink which
+accepts everything without connecting anywhere.
+"""
+
+import json
+import logging
+import random
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from functools import wraps
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from worblehat.deadline_daemon import DeadlineDaemon
+from worblehat.models import (
+    Base,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+)
+from worblehat.queries import list_active_borrowings_for_item
+from worblehat.services.config import Config
+from worblehat.services.email import SmtpTransport, send_outbox_emails
+
+from .seed_large_library import seed_large_library
+
+DAEMON_ROUTINES = [
+    "send_close_deadline_reminder_mails",
+    "send_overdue_mails",
+    "send_newly_available_mails",
+    "send_expiring_queue_position_mails",
+    "auto_expire_queue_positions",
+]
+
+_BORROWING_DAYS = 30
+
+
+class SmtpSink(SmtpTransport):
+    """
+    Accepts every mail without connecting to a server, and counts them by subject.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(host="", port=0, username="", password="", sender="")
+        self.sent: Counter[str] = Counter()
+
+    def send(self, msg: MIMEMultipart) -> bool:
+        self.sent[msg["Subject"]] += 1
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class RoutineStats:
+    runs: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    statements: int = 0
+    queued_mails: int = 0
+
+    def add(self, seconds: float, statements: int, queued_mails: int) -> None:
+        self.runs += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.statements += statements
+        self.queued_mails += queued_mails
+
+
+@dataclass
+class SimulationReport:
+    days: float
+    daemon_runs: int = 0
+    borrowings: int = 0
+    deliveries: int = 0
+    queue_entries: int = 0
+    routines: dict[str, RoutineStats] = field(
+        default_factory=lambda: {name: RoutineStats() for name in [*DAEMON_ROUTINES, "outbox"]},
+    )
+    sent_mails: Counter[str] = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        lines = [
+            (
+                f"Simulated {self.days:g} days with {self.daemon_runs} deadline daemon runs, "
+                f"{self.borrowings} borrowings, {self.deliveries} deliveries "
+                f"and {self.queue_entries} queue entries."
+            ),
+            "",
+            f"  {'routine':<40} {'total s':>9} {'max ms':>9} {'statements':>11} {'mails':>7}",
+        ]
+        for name, stats in self.routines.items():
+            lines.append(
+                f"  {name:<40} {stats.seconds:>9.2f} {stats.max_seconds * 1000:>9.1f} "
+                f"{stats.statements:>11} {stats.queued_mails:>7}",
+            )
+        lines.append("")
+        lines.append(f"Sent {self.sent_mails.total()} mails:")
+        for subject, count in self.sent_mails.most_common():
+            lines.append(f"  {count:>7} {subject}")
+        return "\n".join(lines)
+
+
+class _StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, _conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+        self.count += 1
+
+
+class DeadlineDaemonSimulation:
+    """
+    Generates activity in a library between the deadline daemon runs.
+
+    Every interval, users borrow random items at a given rate, or enter the queue if the item
+    is not available. Each borrowing is delivered at a random time, some of them after the
+    deadline. Users who are notified that a queued item is available pick it up most of the time,
+    and otherwise let their queue position expire.
+    """
+
+    def __init__(
+        self,
+        sql_session: Session,
+        start: datetime,
+        borrowings_per_day: float,
+        users: int,
+        seed: int = 0,
+    ) -> None:
+        self.sql_session = sql_session
+        self.now = start
+        self.borrowings_per_day = borrowings_per_day
+        self.users = users
+        # NOTE: Seeded, so that simulations can be repeated. Not used for anything secret.
+        self.rng = random.Random(seed)  # noqa: S311
+
+        self.item_uids = list(sql_session.scalars(select(BookcaseItem.uid)).all())
+        # Borrowing uid -> simulated time of delivery
+        self.planned_deliveries: dict[int, datetime] = {}
+        # (Simulated time of pickup, username, item uid)
+        self.planned_pickups: list[tuple[datetime, str, int]] = []
+
+    def _borrow(self, username: str, item: BookcaseItem, start_time: datetime) -> None:
+        borrowing = BookcaseItemBorrowing(username, item)
+        borrowing.start_time = start_time
+        borrowing.end_time = start_time + timedelta(days=_BORROWING_DAYS)
+        self.sql_session.add(borrowing)
+        self.sql_session.flush()
+
+        # About one in six borrowings is delivered after the deadline
+        self.planned_deliveries[borrowing.uid] = start_time + timedelta(
+            days=self.rng.uniform(2, _BORROWING_DAYS * 1.2),
+        )
+
+    def advance(self, interval: timedelta, report: SimulationReport) -> None:
+        """
+        Moves the clock forward by `interval`, and adds the activity within it.
+        """
+        previous = self.now
+        self.now += interval
+
+        def random_time() -> datetime:
+            return previous + interval * self.rng.random()
+
+        for borrowing_uid, delivered in list(self.planned_deliveries.items()):
+            if delivered <= self.now:
+                self.sql_session.get_one(BookcaseItemBorrowing, borrowing_uid).delivered = delivered
+                del self.planned_deliveries[borrowing_uid]
+                report.deliveries += 1
+
+        newly_available = self.sql_session.scalars(
+            select(BookcaseItemBorrowingQueue).where(
+                BookcaseItemBorrowingQueue.item_became_available_time >= previous,
+                BookcaseItemBorrowingQueue.expired.is_(False),
+            ),
+        ).all()
+        for queue_position in newly_available:
+            if self.rng.random() < 0.7:
+                self.planned_pickups.append(
+                    (
+                        queue_position.item_became_available_time
+                        + timedelta(days=self.rng.uniform(0, 10)),
+                        queue_position.username,
+                        queue_position.fk_bookcase_item_uid,
+                    ),
+                )
+
+        pickups = [pickup for pickup in self.planned_pickups if pickup[0] <= self.now]
+        self.planned_pickups = [pickup for pickup in self.planned_pickups if pickup[0] > self.now]
+        for pickup_time, username, item_uid in pickups:
+            item = self.sql_session.get_one(BookcaseItem, item_uid)
+            self._borrow(username, item, pickup_time)
+            report.borrowings += 1
+
+        expected = self.borrowings_per_day * interval / timedelta(days=1)
+        for _ in range(int(expected + self.rng.random())):
+            item = self.sql_session.get_one(BookcaseItem, self.rng.choice(self.item_uids))
+            username = f"user{self.rng.randint(1, self.users)}"
+            if len(list_active_borrowings_for_item(self.sql_session, item)) < item.amount:
+                self._borrow(username, item, random_time())
+                report.borrowings += 1
+            elif self.rng.random() < 0.5:
+                queue_position = BookcaseItemBorrowingQueue(username, item)
+                queue_position.entered_queue_time = random_time()
+                self.sql_session.add(queue_position)
+                report.queue_entries += 1
+
+        self.sql_session.commit()
+
+
+def _instrument_daemon(
+    daemon: DeadlineDaemon,
+    report: SimulationReport,
+    statements: _StatementCounter,
+) -> None:
+    """
+    Wraps the routines of `daemon`, so that every call is measured in `report`.
+    """
+
+    def measure(name: str, routine: Callable[[], None]) -> Callable[[], None]:
+        @wraps(routine)
+        def measured_routine() -> None:
+            statements_before = statements.count
+            mails_before = len(daemon.queued_mails)
+            start = time.perf_counter()
+            routine()
+            report.routines[name].add(
+                time.perf_counter() - start,
+                statements.count - statements_before,
+                len(daemon.queued_mails) - mails_before,
+            )
+
+        return measured_routine
+
+    for name in DAEMON_ROUTINES:
+        setattr(daemon, name, measure(name, getattr(daemon, name)))
+
+
+def simulate(
+    sql_session: Session,
+    days: float,
+    interval: timedelta,
+    borrowings_per_day: float,
+    users: int,
+    seed: int = 0,
+) -> SimulationReport:
+    """
+    Runs the simulation in a database containing a library without any borrowings.
+    """
+    engine = sql_session.get_bind()
+    statements = _StatementCounter()
+    event.listen(engine, "before_cursor_execute", statements)
+
+    report = SimulationReport(days=days)
+    sink = SmtpSink()
+    simulation = DeadlineDaemonSimulation(
+        sql_session,
+        start=datetime.now(),
+        borrowings_per_day=borrowings_per_day,
+        users=users,
+        seed=seed,
+    )
+    end = simulation.now + timedelta(days=days)
+
+    try:
+        while simulation.now + interval <= end:
+            simulation.advance(interval, report)
+
+            daemon = DeadlineDaemon(sql_session, current_run_datetime=simulation.now)
+            _instrument_daemon(daemon, report, statements)
+            daemon.run()
+            report.daemon_runs += 1
+
+            statements_before = statements.count
+            start = time.perf_counter()
+            outbox_report = send_outbox_emails(sql_session, transport=sink)
+            report.routines["outbox"].add(
+                time.perf_counter() - start,
+                statements.count - statements_before,
+                len(outbox_report.sent),
+            )
+    finally:
+        event.remove(engine, "before_cursor_execute", statements)
+
+    report.sent_mails = sink.sent
+    return report
+
+
+def main(
+    database_url: str | None,
+    days: float,
+    interval_hours: float,
+    items: int,
+    users: int,
+    borrowings_per_day: float,
+    output: Path | None,
+) -> int:
+    if not Config.snapshot().deadline_daemon.enabled:
+        print("Error: the deadline daemon is disabled in the configuration")
+        return 1
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if database_url is None:
+            database_url = f"sqlite:///{Path(temp_dir) / 'simulation.sqlite'}"
+
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        with Session(engine) as sql_session:
+            print(f"Generating a library of {items} items")
+            seed_large_library(sql_session, items=items, borrowings=0, queue_entries=0)
+
+            print(f"Simulating {days} days, running the deadline daemon every {interval_hours} hours")
+            # The daemon logs every mail it queues, which would drown out the report
+            logging.disable(logging.WARNING)
+            try:
+                report = simulate(
+                    sql_session,
+                    days=days,
+                    interval=timedelta(hours=interval_hours),
+                    borrowings_per_day=borrowings_per_day,
+                    users=users,
+                )
+            finally:
+                logging.disable(logging.NOTSET)
+        engine.dispose()
+
+    print(report.summary())
+
+    if output is not None:
+        results: dict[str, Any] = asdict(report)
+        results["sent_mails"] = dict(report.sent_mails)
+        output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to '{output}'")
+
+    return 0
@@ -0,0 +1,6 @@
+from . import bookcase, bookcase_item
+from .common import api
+
+__all__ = [
+    "api",
+]
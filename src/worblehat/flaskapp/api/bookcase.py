@@ -0,0 +1,48 @@
+from flask import Response, abort
+
+from worblehat.models import Bookcase, BookcaseItem, BookcaseShelf
+from worblehat.queries import (
+    find_bookcase_by_name,
+    list_bookcase_shelfs_with_items,
+    list_bookcases,
+)
+
+from ..database import db
+from .common import api, cached_response, json_response
+
+
+@api.route("/bookcases")
+@cached_response(Bookcase)
+def get_bookcases() -> Response:
+    return json_response(
+        [
+            {
+                "name": bookcase.name,
+                "description": bookcase.description,
+            }
+            for bookcase in list_bookcases(db.session)
+        ],
+    )
+
+
+@api.route("/bookcases/<name>/shelves")
+@cached_response(Bookcase, BookcaseItem, BookcaseShelf)
+def get_bookcase_shelves(name: str) -> Response:
+    bookcase = find_bookcase_by_name(db.session, name)
+    if bookcase is None:
+        abort(404, description=f"No bookcase named '{name}'")
+
+    return json_response(
+        [
+            {
+                "column": shelf.column,
+                "row": shelf.row,
+                "description": shelf.description,
+                "items": [
+                    {"isbn": item.isbn, "name": item.name}
+                    for item in sorted(shelf.items, key=lambda item: item.name)
+                ],
+            }
+            for shelf in list_bookcase_shelfs_with_items(db.session, bookcase)
+        ],
+    )
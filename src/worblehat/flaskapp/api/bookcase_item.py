@@ -0,0 +1,122 @@
+from typing import Any
+
+from flask import Response, abort, request
+
+from worblehat.models import (
+    Author,
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+    BookcaseShelf,
+    Language,
+    MediaType,
+)
+from worblehat.queries import (
+    BookcaseItemAvailability,
+    find_bookcase_item_with_details_by_isbn,
+    list_bookcase_item_availability,
+    list_bookcase_items_with_details,
+    search_bookcase_items_with_details,
+)
+
+from ..database import db
+from .common import (
+    api,
+    cached_response,
+    int_argument,
+    json_response,
+    next_cursor,
+    page_size_argument,
+)
+
+# The models read by `_serialize_item` and `_serialize_availability`
+ITEM_MODELS = (Author, Bookcase, BookcaseItem, BookcaseShelf, Language, MediaType)
+AVAILABILITY_MODELS = (BookcaseItem, BookcaseItemBorrowing, BookcaseItemBorrowingQueue)
+
+
+def _serialize_item(item: BookcaseItem) -> dict[str, Any]:
+    """
+    Serializes an item loaded with `bookcase_item_details`, without any further queries.
+    """
+    return {
+        "uid": item.uid,
+        "isbn": item.isbn,
+        "name": item.name,
+        "owner": item.owner,
+        "amount": item.amount,
+        "authors": sorted(author.name for author in item.authors),
+        "media_type": item.media_type.name,
+        "language": item.language.iso639_1_code if item.language is not None else None,
+        "bookcase": item.shelf.bookcase.name,
+        "column": item.shelf.column,
+        "row": item.shelf.row,
+    }
+
+
+def _serialize_availability(availability: BookcaseItemAvailability) -> dict[str, Any]:
+    return {
+        "uid": availability.item_uid,
+        "amount": availability.amount,
+        "available": availability.available,
+        "borrowed": availability.borrowed,
+        "queued": availability.queued,
+        "next_due": availability.next_due,
+    }
+
+
+@api.route("/items")
+@cached_response(*ITEM_MODELS)
+def get_items() -> Response:
+    limit = page_size_argument()
+    items = list_bookcase_items_with_details(db.session, int_argument("after"), limit)
+    return json_response(
+        {
+            "items": [_serialize_item(item) for item in items],
+            "next": next_cursor([item.uid for item in items], limit),
+        },
+    )
+
+
+@api.route("/items/<isbn>")
+@cached_response(*ITEM_MODELS, *AVAILABILITY_MODELS)
+def get_item(isbn: str) -> Response:
+    item = find_bookcase_item_with_details_by_isbn(db.session, isbn)
+    if item is None:
+        abort(404, description=f"No item with ISBN '{isbn}'")
+
+    [availability] = list_bookcase_item_availability(db.session, item_uids=[item.uid])
+    return json_response(
+        {
+            **_serialize_item(item),
+            "availability": _serialize_availability(availability),
+        },
+    )
+
+
+@api.route("/availability")
+@cached_response(*AVAILABILITY_MODELS)
+def get_availability() -> Response:
+    limit = page_size_argument()
+    availabilities = list_bookcase_item_availability(
+        db.session,
+        after_uid=int_argument("after"),
+        limit=limit,
+    )
+    return json_response(
+        {
+            "items": [_serialize_availability(a) for a in availabilities],
+            "next": next_cursor([a.item_uid for a in availabilities], limit),
+        },
+    )
+
+
+@api.route("/search")
+@cached_response(*ITEM_MODELS)
+def get_search() -> Response:
+    text = request.args.get("q", "").strip()
+    if text == "":
+        abort(400, description="'q' must not be empty")
+
+    items = search_bookcase_items_with_details(db.session, text, page_size_argument())
+    return json_response({"items": [_serialize_item(item) for item in items]})
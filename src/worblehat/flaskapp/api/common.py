@@ -0,0 +1,124 @@
+import functools
+import json
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING
+from urllib.parse import urlencode
+
+from flask import Blueprint, Response, abort, current_app, request
+from werkzeug.exceptions import HTTPException
+
+from worblehat.models import Base
+
+if TYPE_CHECKING:
+    from worblehat.services.response_cache import ResponseCache
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _serialize_default(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dump_json(data: object) -> str:
+    return json.dumps(
+        data,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_serialize_default,
+    )
+
+
+def _conditional_response(body: str | bytes, mimetype: str) -> Response:
+    response = Response(body, mimetype=mimetype)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def json_response(data: object) -> Response:
+    """
+    Serializes `data` as compact JSON, together with an ETag of the body.
+
+    If the request has an If-None-Match header matching the ETag,
+    the response is turned into an empty 304 Not Modified instead.
+    """
+    return _conditional_response(_dump_json(data), "application/json")
+
+
+def _response_cache_key() -> str:
+    return f"{request.path}?{urlencode(sorted(request.args.items(multi=True)))}"
+
+
+def cached_response(*models: type[Base]) -> Callable:
+    """
+    Serves the view from the response cache of the app, if there is one,
+    until any of the tables of `models` are changed.
+
+    The cache is keyed by the path and the query arguments of the request.
+    Only successful responses are cached.
+    """
+    tables = tuple(sorted({model.__table__.name for model in models}))
+
+    def decorator(view: Callable[..., Response]) -> Callable[..., Response]:
+        @functools.wraps(view)
+        def wrapper(*args: object, **kwargs: object) -> Response:
+            cache: ResponseCache | None = current_app.extensions.get("response_cache")
+            if cache is None:
+                return view(*args, **kwargs)
+
+            key = _response_cache_key()
+            entry = cache.lookup(key, tables)
+            if entry is not None:
+                return _conditional_response(entry.body, entry.mimetype)
+
+            generations = cache.generations(tables)
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                cache.store(key, tables, generations, response.get_data(), response.mimetype)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def int_argument(name: str) -> int | None:
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, description=f"'{name}' must be an integer")
+
+
+def page_size_argument() -> int:
+    limit = int_argument("limit")
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        abort(400, description=f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def next_cursor(uids: list[int], limit: int) -> int | None:
+    """
+    Returns the value to pass as `after` to get the next page, or None if this is the last page.
+    """
+    if len(uids) < limit:
+        return None
+    return uids[-1]
+
+
+@api.errorhandler(HTTPException)
+def handle_http_exception(err: HTTPException) -> Response:
+    return Response(
+        _dump_json({"error": err.description}),
+        status=err.code,
+        mimetype="application/json",
+    )
@@ -1,3 +1,15 @@
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
+from worblehat.models import set_default_session
+
 db = SQLAlchemy()
+
+
+def init_database(app: Flask) -> None:
+    """
+    Binds `db` to the app, and lets the models default to its session,
+    which is scoped to the current app context.
+    """
+    db.init_app(app)
+    set_default_session(db.session)
@@ -1,34 +1,47 @@
-from flask import Flask
+from flask import Flask, g, request
 from flask_admin import Admin
 from flask_admin.contrib.sqla import ModelView
 from sqlalchemy import inspect
 
 from worblehat.models import *
 from worblehat.services.config import Config
+from worblehat.services.response_cache import ResponseCache, get_response_cache
 from worblehat.services.seed_test_data import seed_data
+from worblehat.services.sql_profiler import sql_profiler
 
+from .api import api
 from .blueprints.main import main
-from .database import db
+from .database import db, init_database
 
 
 def create_app(args: dict[str, any] | None = None):
     app = Flask(__name__)
 
-    app.config.update(Config["flask"])
+    config = Config.snapshot()
+    app.config.update(config.flask)
     app.config.update(Config._config)
-    app.config["SQLALCHEMY_DATABASE_URI"] = Config.db_string()
-    app.config["SQLALCHEMY_ECHO"] = Config["logging.debug_sql"]
+    app.config["SQLALCHEMY_DATABASE_URI"] = config.database.url
+    app.config["SQLALCHEMY_ECHO"] = config.logging.debug_sql
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = config.database.pool.engine_options()
 
-    db.init_app(app)
+    init_database(app)
 
     with app.app_context():
         if not inspect(db.engine).has_table("Bookcase"):
             Base.metadata.create_all(db.engine)
-            seed_data()
+            seed_data(db.session)
+
+    if config.logging.profile_sql:
+        configure_sql_profiling(app)
+
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        configure_response_cache(app, response_cache)
 
     configure_admin(app)
 
     app.register_blueprint(main)
+    app.register_blueprint(api)
 
     return app
 
@@ -42,3 +55,32 @@ def configure_admin(app) -> None:
     admin.add_view(ModelView(Category, db.session))
     admin.add_view(ModelView(Language, db.session))
     admin.add_view(ModelView(MediaType, db.session))
+
+
+def configure_response_cache(app: Flask, response_cache: ResponseCache) -> None:
+    """
+    Serves the views marked with `cached_response` from `response_cache`,
+    and invalidates it whenever `db.session` commits changes to the database.
+    """
+    app.extensions["response_cache"] = response_cache
+    response_cache.attach(db.session)
+
+
+def configure_sql_profiling(app: Flask) -> None:
+    """
+    Records the SQL statements of each request in the SQL profiler,
+    grouped by the method and the url rule of the request.
+    """
+    with app.app_context():
+        sql_profiler.attach(db.engine)
+
+    @app.before_request
+    def enter_sql_profiler_scope() -> None:
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        g.sql_profiler_token = sql_profiler.enter_scope(f"flask {request.method} {rule}")
+
+    @app.teardown_request
+    def exit_sql_profiler_scope(_exception: BaseException | None) -> None:
+        token = g.pop("sql_profiler_token", None)
+        if token is not None:
+            sql_profiler.exit_scope(token)
@@ -1,10 +1,63 @@
+import logging
+import multiprocessing
+from typing import Any
+
+from flask import Flask
+from gunicorn.app.base import BaseApplication
+
+from worblehat.services.config import Config, ConfigError
+
 from .flaskapp import create_app
 
 
-def main() -> None:
-    app = create_app()
-    app.run()
+class WorblehatApplication(BaseApplication):
+    """
+    Serves the web interface with gunicorn, using a pool of worker processes
+    which each handle requests on several threads.
+
+    Every worker creates its own app, and thereby its own database engine, after being forked.
+    Sending SIGHUP to the main process reloads the configuration file, and gracefully replaces
+    the workers, letting them finish their current requests first.
+    """
+
+    def __init__(self, args: dict[str, Any]) -> None:
+        self.args = args
+        super().__init__()
+
+    def _options(self) -> dict[str, Any]:
+        config = Config.snapshot().web_server
+        workers = config.workers
+        if workers == 0:
+            workers = multiprocessing.cpu_count() * 2 + 1
+
+        return {
+            "bind": config.bind,
+            "workers": workers,
+            "worker_class": "gthread",
+            "threads": config.threads,
+            "timeout": config.timeout_seconds,
+            "graceful_timeout": config.graceful_timeout_seconds,
+            "max_requests": config.max_requests,
+            "max_requests_jitter": config.max_requests // 10,
+            "preload_app": False,
+        }
+
+    def load_config(self) -> None:
+        # NOTE: this is also called when reloading, to pick up changes to the configuration file
+        try:
+            Config.load_configuration(self.args)
+        except ConfigError as err:
+            logging.error(f"{err}\nKeeping the previous configuration")
+        for key, value in self._options().items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Flask:
+        return create_app()
+
+
+def main(args: dict[str, Any]) -> None:
+    WorblehatApplication(args).run()
 
 
 if __name__ == "__main__":
-    main()
+    main({})
@@ -1,20 +1,22 @@
+import atexit
+import json
 import logging
 from pprint import pformat
+from typing import TYPE_CHECKING
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-
-from worblehat.models import Base
-
-from .cli import WorblehatCli
-from .deadline_daemon import DeadlineDaemon
-from .flaskapp.wsgi_dev import main as flask_dev_main
-from .flaskapp.wsgi_prod import main as flask_prod_main
-from .services import (
-    Config,
+from .services.argument_parser import (
     arg_parser,
     devscripts_arg_parser,
 )
+from .services.config import Config, ConfigError
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+    from sqlalchemy.orm import Session
+
+# NOTE: every subcommand imports what it needs by itself, so that starting the CLI does not
+#       import Flask, and a deadline daemon run does not import the CLI or the book data fetchers.
+#       See `worblehat devscripts benchmark-startup` for the import time of each subcommand.
 
 
 def _print_version() -> None:
@@ -24,9 +26,53 @@ def _print_version() -> None:
     return
 
 
-def _connect_to_database(**engine_args) -> Session:
+def _report_sql_profile() -> None:
+    from .services.sql_profiler import sql_profiler
+
+    logging.info(sql_profiler.summary())
+    path = Config.snapshot().logging.profile_sql_file
+    if path is not None:
+        path.write_text(json.dumps(sql_profiler.to_dict(), indent=2))
+        logging.info(f"SQL profile written to '{path}'")
+
+
+def _invalidate_shared_response_cache() -> None:
+    """
+    Lets the commits of this process invalidate the response cache of the web interface,
+    which is only possible when the cache is shared through a file.
+    """
+    config = Config.snapshot().response_cache
+    if not config.enabled or config.path is None:
+        return
+
+    from sqlalchemy.orm import Session
+
+    from .services.response_cache import get_response_cache
+
+    get_response_cache().attach(Session)
+
+
+def _create_engine(**engine_args: object) -> "Engine":
+    from sqlalchemy import create_engine
+
+    config = Config.snapshot()
+    engine = create_engine(
+        config.database.url,
+        **config.database.pool.engine_options(),
+        **engine_args,
+    )
+    if config.logging.profile_sql:
+        from .services.sql_profiler import sql_profiler
+
+        sql_profiler.attach(engine)
+    return engine
+
+
+def _connect_to_database(**engine_args: object) -> "Session":
+    from sqlalchemy.orm import Session
+
     try:
-        engine = create_engine(Config.db_string(), **engine_args)
+        engine = _create_engine(**engine_args)
         sql_session = Session(engine)
     except Exception as err:
         print("Error: could not connect to database.")
@@ -44,37 +90,143 @@ def main() -> None:
         _print_version()
         exit(0)
 
-    Config.load_configuration(vars(args))
+    try:
+        config = Config.load_configuration(vars(args))
+    except ConfigError as err:
+        print(f"Error: {err}")
+        exit(1)
 
-    if Config["logging.debug"]:
+    if config.logging.debug:
         logging.basicConfig(encoding="utf-8", level=logging.DEBUG)
     else:
         logging.basicConfig(encoding="utf-8", level=logging.INFO)
 
+    if config.logging.profile_sql:
+        atexit.register(_report_sql_profile)
+
     if args.print_config:
         print(f"Configuration:\n{pformat(vars(args))}")
         exit(0)
 
+    if args.command not in ("flask-dev", "flask-prod"):
+        _invalidate_shared_response_cache()
+
     if args.command == "deadline-daemon":
-        sql_session = _connect_to_database(echo=Config["logging.debug_sql"])
-        DeadlineDaemon(sql_session).run()
+        from .deadline_daemon.scheduler import DeadlineDaemonScheduler
+
+        engine = _create_engine(echo=config.logging.debug_sql)
+        scheduler = DeadlineDaemonScheduler.from_config(engine)
+        if args.resident:
+            scheduler.run_forever()
+        else:
+            scheduler.run_once()
+        exit(0)
+
+    if args.command == "send-mail":
+        from .services.email import send_outbox_emails
+        from .services.sql_profiler import sql_profiler
+
+        sql_session = _connect_to_database(echo=config.logging.debug_sql)
+        with sql_profiler.scope("send-mail"):
+            report = send_outbox_emails(sql_session)
+        print(report.summary())
         exit(0)
 
     if args.command == "cli":
-        sql_session = _connect_to_database(echo=Config["logging.debug_sql"])
+        from .cli import WorblehatCli
+
+        sql_session = _connect_to_database(echo=config.logging.debug_sql)
         worblehat = WorblehatCli(sql_session)
         worblehat.run_with_safe_exit_wrapper()
         exit(0)
 
     if args.command == "create-db":
-        database_url = Config.db_string()
-        engine = create_engine(database_url)
+        from sqlalchemy import create_engine
+
+        from .models import Base
+
+        engine = create_engine(Config.db_string())
         Base.metadata.create_all(engine)
         print(f"Database schema created at '{Config.db_string_no_password()}'")
         exit(0)
 
+    if args.command == "rebuild-availability":
+        from .models import refresh_availability_counters
+
+        sql_session = _connect_to_database(echo=config.logging.debug_sql)
+        refresh_availability_counters(sql_session)
+        sql_session.commit()
+        print("Availability counters rebuilt from the borrowings and queue positions")
+        exit(0)
+
+    if args.command == "archive":
+        from .services.archive import archive_history_from_config
+        from .services.sql_profiler import sql_profiler
+
+        sql_session = _connect_to_database(echo=config.logging.debug_sql)
+        with sql_profiler.scope("archive"):
+            report = archive_history_from_config(sql_session)
+        print(report.summary())
+        exit(0)
+
+    if args.command == "import":
+        from .services.bulk_import import import_bookcase_items
+
+        sql_session = _connect_to_database(echo=config.logging.debug_sql)
+        report = import_bookcase_items(
+            sql_session,
+            args.files,
+            media_type_name=args.media_type,
+            owner=args.owner,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            fetch_metadata=args.fetch_metadata,
+        )
+        print(report.summary())
+        exit(0)
+
     if args.command == "devscripts":
-        sql_session = _connect_to_database(echo=Config["logging.debug_sql"])
+        if args.script == "benchmark-queries":
+            from .devscripts.benchmark_queries import main
+
+            exit(
+                main(
+                    database_urls=args.database_urls,
+                    scale=args.scale,
+                    repeat=args.repeat,
+                    output=args.output,
+                    baseline=args.baseline,
+                    tolerance=args.tolerance,
+                ),
+            )
+
+        if args.script == "benchmark-startup":
+            from .devscripts.benchmark_startup import main
+
+            exit(
+                main(
+                    repeat=args.repeat,
+                    output=args.output,
+                    budget_scale=args.budget_scale,
+                ),
+            )
+
+        if args.script == "simulate-deadline-daemon":
+            from .devscripts.simulate_deadline_daemon import main
+
+            exit(
+                main(
+                    database_url=args.database_url,
+                    days=args.days,
+                    interval_hours=args.interval_hours,
+                    items=args.items,
+                    users=args.users,
+                    borrowings_per_day=args.borrowings_per_day,
+                    output=args.output,
+                ),
+            )
+
+        sql_session = _connect_to_database(echo=config.logging.debug_sql)
         if args.script == "seed-content-for-deadline-daemon":
             from .devscripts.seed_content_for_deadline_daemon import main
 
@@ -82,6 +234,10 @@ def main() -> None:
         elif args.script == "seed-test-data":
             from .devscripts.seed_test_data import main
 
+            main(sql_session)
+        elif args.script == "seed-large-library":
+            from .devscripts.seed_large_library import main
+
             main(sql_session)
         else:
             print(devscripts_arg_parser.format_help())
@@ -89,15 +245,19 @@ def main() -> None:
         exit(0)
 
     if args.command == "flask-dev":
+        from .flaskapp.wsgi_dev import main as flask_dev_main
+
         flask_dev_main()
         exit(0)
 
     if args.command == "flask-prod":
-        if Config["logging.debug"] or Config["logging.debug_sql"]:
+        if config.logging.debug or config.logging.debug_sql:
             logging.warning(
                 "Debug mode is enabled for the production server. This is not recommended.",
             )
-        flask_prod_main()
+        from .flaskapp.wsgi_prod import main as flask_prod_main
+
+        flask_prod_main(vars(args))
         exit(0)
 
     print(arg_parser.format_help())
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+# NOTE: datetime is needed at runtime, since SQLAlchemy resolves the Mapped annotations
+from datetime import datetime  # noqa: TC003
 from typing import TYPE_CHECKING
 
 from sqlalchemy import (
+    DateTime,
     ForeignKey,
+    Integer,
     SmallInteger,
     String,
     Text,
@@ -16,6 +20,7 @@ from sqlalchemy.orm import (
 )
 
 from .Base import Base
+from .default_session import default_session
 from .mixins import (
     UidMixin,
 )
@@ -33,8 +38,6 @@ if TYPE_CHECKING:
     from .Language import Language
     from .MediaType import MediaType
 
-from worblehat.flaskapp.database import db
-
 
 class BookcaseItem(Base, UidMixin):
     isbn: Mapped[str] = mapped_column(String, unique=True, index=True)
@@ -42,6 +45,12 @@ class BookcaseItem(Base, UidMixin):
     owner: Mapped[str] = mapped_column(String, default="PVV")
     amount: Mapped[int] = mapped_column(SmallInteger, default=1)
 
+    # NOTE: These are derived from the borrowings and the queue of the item, and are kept up to
+    #       date by `worblehat.models.availability_counters`. They should never be set by hand.
+    active_borrowing_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    pending_queue_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_due_time: Mapped[datetime | None] = mapped_column(DateTime)
+
     fk_media_type_uid: Mapped[int] = mapped_column(ForeignKey("MediaType.uid"))
     fk_bookcase_shelf_uid: Mapped[int] = mapped_column(ForeignKey("BookcaseShelf.uid"))
     fk_language_uid: Mapped[int | None] = mapped_column(ForeignKey("Language.uid"))
@@ -72,12 +81,19 @@ class BookcaseItem(Base, UidMixin):
         self.name = name
         self.isbn = isbn
         self.owner = owner
+        self.active_borrowing_count = 0
+        self.pending_queue_count = 0
+
+    @property
+    def available_amount(self) -> int:
+        """The amount of copies which are not currently borrowed."""
+        return max(self.amount - self.active_borrowing_count, 0)
 
     @classmethod
-    def get_by_isbn(cls, isbn: str, sql_session: Session = db.session) -> Self | None:
+    def get_by_isbn(cls, isbn: str, sql_session: Session | None = None) -> Self | None:
         """
         NOTE:
-        This method defaults to using the flask_sqlalchemy session.
-        It will not work outside of a request context, unless another session is provided.
+        This method defaults to the session registered with `set_default_session`,
+        which is the flask_sqlalchemy session within the web interface.
         """
-        return sql_session.query(cls).where(cls.isbn == isbn).one_or_none()
+        return default_session(sql_session).query(cls).where(cls.isbn == isbn).one_or_none()
@@ -6,7 +6,9 @@ from typing import TYPE_CHECKING
 from sqlalchemy import (
     DateTime,
     ForeignKey,
+    Index,
     String,
+    column,
 )
 from sqlalchemy.orm import (
     Mapped,
@@ -22,6 +24,31 @@ if TYPE_CHECKING:
 
 
 class BookcaseItemBorrowing(Base, UidMixin):
+    # NOTE: Most queries only care about the borrowings which have not been delivered yet,
+    #       so these partial indices only cover those. The conditions must be written exactly
+    #       like in the queries, or the databases will not realize that the indices apply.
+    __table_args__ = (
+        Index(
+            "ix_BookcaseItemBorrowing_undelivered_end_time",
+            "end_time",
+            sqlite_where=column("delivered").is_(None),
+            postgresql_where=column("delivered").is_(None),
+        ),
+        Index(
+            "ix_BookcaseItemBorrowing_undelivered_item_end_time",
+            "fk_bookcase_item_uid",
+            "end_time",
+            sqlite_where=column("delivered").is_(None),
+            postgresql_where=column("delivered").is_(None),
+        ),
+        Index(
+            "ix_BookcaseItemBorrowing_delivered",
+            "delivered",
+            sqlite_where=column("delivered").is_not(None),
+            postgresql_where=column("delivered").is_not(None),
+        ),
+    )
+
     username: Mapped[str] = mapped_column(String)
     start_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
     end_time: Mapped[datetime] = mapped_column(
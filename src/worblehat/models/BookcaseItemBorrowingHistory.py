@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+)
+
+from .Base import Base
+
+
+class BookcaseItemBorrowingHistory(Base):
+    """
+    A delivered borrowing, which has been moved out of `BookcaseItemBorrowing`
+    by `worblehat.services.archive`, keeping its original uid.
+
+    On PostgreSQL, the table is partitioned by the year of delivery,
+    see `worblehat.models.history_partitions`.
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_BookcaseItemBorrowingHistory_item_delivered",
+            "fk_bookcase_item_uid",
+            "delivered",
+        ),
+        {"postgresql_partition_by": "RANGE (delivered)"},
+    )
+
+    # NOTE: The partitioning column must be part of the primary key on PostgreSQL
+    uid: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    delivered: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    username: Mapped[str] = mapped_column(String, index=True)
+    start_time: Mapped[datetime] = mapped_column(DateTime)
+    end_time: Mapped[datetime] = mapped_column(DateTime)
+    archived_time: Mapped[datetime] = mapped_column(DateTime)
+
+    fk_bookcase_item_uid: Mapped[int] = mapped_column(ForeignKey("BookcaseItem.uid"))
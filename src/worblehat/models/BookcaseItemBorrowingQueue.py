@@ -7,7 +7,9 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     String,
+    column,
 )
 from sqlalchemy.orm import (
     Mapped,
@@ -23,6 +25,26 @@ if TYPE_CHECKING:
 
 
 class BookcaseItemBorrowingQueue(Base, UidMixin):
+    # NOTE: The conditions of these partial indices must be written exactly
+    #       like in the queries, or the databases will not realize that the indices apply.
+    __table_args__ = (
+        # Users still waiting for an item, in queue order
+        Index(
+            "ix_BookcaseItemBorrowingQueue_waiting_item_entered_queue_time",
+            "fk_bookcase_item_uid",
+            "entered_queue_time",
+            sqlite_where=column("item_became_available_time").is_(None),
+            postgresql_where=column("item_became_available_time").is_(None),
+        ),
+        # Queue positions which have been offered an item, and have not expired yet
+        Index(
+            "ix_BookcaseItemBorrowingQueue_unexpired_available_time",
+            "item_became_available_time",
+            sqlite_where=column("expired").is_(False),
+            postgresql_where=column("expired").is_(False),
+        ),
+    )
+
     username: Mapped[str] = mapped_column(String)
     entered_queue_time: Mapped[datetime] = mapped_column(
         DateTime,
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+)
+
+from .Base import Base
+
+
+class BookcaseItemBorrowingQueueHistory(Base):
+    """
+    An expired queue position, which has been moved out of `BookcaseItemBorrowingQueue`
+    by `worblehat.services.archive`, keeping its original uid.
+
+    On PostgreSQL, the table is partitioned by the year the item became available,
+    see `worblehat.models.history_partitions`.
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_BookcaseItemBorrowingQueueHistory_item_available_time",
+            "fk_bookcase_item_uid",
+            "item_became_available_time",
+        ),
+        {"postgresql_partition_by": "RANGE (item_became_available_time)"},
+    )
+
+    # NOTE: The partitioning column must be part of the primary key on PostgreSQL
+    uid: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    item_became_available_time: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    username: Mapped[str] = mapped_column(String, index=True)
+    entered_queue_time: Mapped[datetime] = mapped_column(DateTime)
+    expired: Mapped[bool] = mapped_column(Boolean)
+    archived_time: Mapped[datetime] = mapped_column(DateTime)
+
+    fk_bookcase_item_uid: Mapped[int] = mapped_column(ForeignKey("BookcaseItem.uid"))
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import (
+    JSON,
     Boolean,
     CheckConstraint,
     DateTime,
@@ -23,6 +24,13 @@ class DeadlineDaemonLastRunDatetime(Base):
     uid: Mapped[bool] = mapped_column(Boolean, primary_key=True, default=True)
     time: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
 
+    # Progress of a run which has not been completed yet, see `worblehat.deadline_daemon`.
+    # Steps are identified by their names, and the cursors are the last uid handled
+    # in each of the steps which have been started but not completed.
+    current_run_time: Mapped[datetime | None] = mapped_column(DateTime)
+    completed_run_steps: Mapped[list[str] | None] = mapped_column(JSON)
+    current_run_cursors: Mapped[dict[str, int] | None] = mapped_column(JSON)
+
     def __init__(self, time: datetime | None = None) -> None:
         if time is not None:
             self.time = time
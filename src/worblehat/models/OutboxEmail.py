@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+)
+
+from .Base import Base
+from .mixins import UidMixin
+
+
+class OutboxEmail(Base, UidMixin):
+    """
+    A mail waiting to be sent, or which has been sent.
+
+    Mails are added to the outbox in the same transaction as the changes that caused them,
+    and sent afterwards by `worblehat.services.email.send_outbox_emails`.
+    """
+
+    recipient: Mapped[str] = mapped_column(String)
+    subject: Mapped[str] = mapped_column(Text)
+    body: Mapped[str] = mapped_column(Text)
+    created_time: Mapped[datetime] = mapped_column(DateTime)
+    next_attempt_time: Mapped[datetime] = mapped_column(DateTime, index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    sent_time: Mapped[datetime | None] = mapped_column(DateTime)
+
+    def __init__(
+        self,
+        recipient: str,
+        subject: str,
+        body: str,
+    ) -> None:
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.created_time = datetime.now()
+        self.next_attempt_time = self.created_time
+        self.attempts = 0
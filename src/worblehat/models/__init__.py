@@ -3,12 +3,24 @@ from .Base import Base
 from .Bookcase import Bookcase
 from .BookcaseItem import BookcaseItem
 from .BookcaseItemBorrowing import BookcaseItemBorrowing
+from .BookcaseItemBorrowingHistory import BookcaseItemBorrowingHistory
 from .BookcaseItemBorrowingQueue import BookcaseItemBorrowingQueue
+from .BookcaseItemBorrowingQueueHistory import BookcaseItemBorrowingQueueHistory
 from .BookcaseShelf import BookcaseShelf
 from .Category import Category
 from .DeadlineDaemonLastRunDatetime import DeadlineDaemonLastRunDatetime
+from .default_session import (
+    default_session,
+    set_default_session,
+)
 from .Language import Language
 from .MediaType import MediaType
+from .OutboxEmail import OutboxEmail
+
+# NOTE: These must be imported after the models, as they attach the search indices to their
+#       tables, and the listeners maintaining the availability counters to the sessions.
+from . import search_index  # isort: skip
+from .availability_counters import refresh_availability_counters  # isort: skip
 
 __all__ = [
     "Author",
@@ -16,10 +28,16 @@ __all__ = [
     "Bookcase",
     "BookcaseItem",
     "BookcaseItemBorrowing",
+    "BookcaseItemBorrowingHistory",
     "BookcaseItemBorrowingQueue",
+    "BookcaseItemBorrowingQueueHistory",
     "BookcaseShelf",
     "Category",
     "DeadlineDaemonLastRunDatetime",
+    "default_session",
     "Language",
     "MediaType",
+    "OutboxEmail",
+    "refresh_availability_counters",
+    "set_default_session",
 ]
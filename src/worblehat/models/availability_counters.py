@@ -0,0 +1,112 @@
+"""
+Keeps the availability counters of `BookcaseItem` in sync with its borrowings and queue.
+
+Each item stores its amount of active borrowings, its amount of users still waiting in the queue,
+and the earliest deadline of its active borrowings, so that checking whether an item is available
+does not have to look at its borrowing history at all.
+
+Whenever a flush adds, changes or deletes borrowings or queue positions, the counters of the
+affected items are recomputed from their active rows in a single statement, which is covered by
+the partial indices on the borrowing and queue tables. Bulk statements bypass the flush, and must
+call `refresh_availability_counters` for the items they touch themselves.
+"""
+
+from collections.abc import Collection
+from itertools import chain
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from .BookcaseItem import BookcaseItem
+from .BookcaseItemBorrowing import BookcaseItemBorrowing
+from .BookcaseItemBorrowingQueue import BookcaseItemBorrowingQueue
+
+AVAILABILITY_COUNTER_ATTRIBUTES = [
+    "active_borrowing_count",
+    "pending_queue_count",
+    "next_due_time",
+]
+
+_PENDING_ITEM_UIDS_KEY = "availability_counters_item_uids"
+
+
+def refresh_availability_counters(
+    sql_session: Session,
+    item_uids: Collection[int] | None = None,
+) -> None:
+    """
+    Recomputes the availability counters of the items in `item_uids`, or of every item
+    if not given, from their borrowings and queue positions. This is not committed.
+
+    The counters of the affected items already loaded into `sql_session` are expired,
+    so that they are read again on their next access.
+    """
+    if item_uids is not None and len(item_uids) == 0:
+        return
+
+    item_table = BookcaseItem.__table__
+    active_borrowing = (
+        BookcaseItemBorrowing.fk_bookcase_item_uid == item_table.c.uid,
+        BookcaseItemBorrowing.delivered.is_(None),
+    )
+    statement = update(item_table).values(
+        active_borrowing_count=select(func.count()).where(*active_borrowing).scalar_subquery(),
+        pending_queue_count=select(func.count())
+        .where(
+            BookcaseItemBorrowingQueue.fk_bookcase_item_uid == item_table.c.uid,
+            BookcaseItemBorrowingQueue.item_became_available_time.is_(None),
+        )
+        .scalar_subquery(),
+        next_due_time=select(func.min(BookcaseItemBorrowing.end_time))
+        .where(*active_borrowing)
+        .scalar_subquery(),
+    )
+    if item_uids is not None:
+        statement = statement.where(item_table.c.uid.in_(item_uids))
+
+    sql_session.connection().execute(statement)
+
+    if item_uids is None:
+        items = [
+            item for item in sql_session.identity_map.values() if isinstance(item, BookcaseItem)
+        ]
+    else:
+        items = [
+            item
+            for uid in item_uids
+            if (item := sql_session.identity_map.get(identity_key(BookcaseItem, uid))) is not None
+        ]
+    for item in items:
+        sql_session.expire(item, AVAILABILITY_COUNTER_ATTRIBUTES)
+
+
+def _affected_item_uids(obj: BookcaseItemBorrowing | BookcaseItemBorrowingQueue) -> set[int]:
+    """
+    Returns the item of a flushed borrowing or queue position,
+    along with its previous item if it was moved to another one.
+    """
+    history = inspect(obj).attrs.fk_bookcase_item_uid.history
+    return {
+        uid
+        for uid in chain(history.added, history.unchanged, history.deleted)
+        if uid is not None
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_affected_items(sql_session: Session, _flush_context) -> None:
+    item_uids = sql_session.info.setdefault(_PENDING_ITEM_UIDS_KEY, set())
+    modified = (obj for obj in sql_session.dirty if sql_session.is_modified(obj))
+    for obj in chain(sql_session.new, modified, sql_session.deleted):
+        if isinstance(obj, BookcaseItemBorrowing | BookcaseItemBorrowingQueue):
+            item_uids |= _affected_item_uids(obj)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _refresh_affected_items(sql_session: Session, _flush_context) -> None:
+    # NOTE: This runs after the flush has finished, so that the refreshed items
+    #       can be expired without interfering with the bookkeeping of the flush.
+    item_uids = sql_session.info.pop(_PENDING_ITEM_UIDS_KEY, set())
+    refresh_availability_counters(sql_session, item_uids)
+
@@ -0,0 +1,35 @@
+"""
+The session used by the model helpers, like `BookcaseItem.get_by_isbn`, when none is given.
+
+The models do not depend on any web framework. The web interface registers the session of
+flask_sqlalchemy here, which is scoped to the current app context, while the CLI, the deadline
+daemon and scripts either register a session of their own, or pass their session explicitly.
+"""
+
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+_default_session_factory: Callable[[], Session] | None = None
+
+
+def set_default_session(factory: Callable[[], Session] | None) -> None:
+    """
+    Registers a callable returning the session to use when none is given,
+    such as a `scoped_session`. Pass None to unregister it.
+    """
+    global _default_session_factory
+    _default_session_factory = factory
+
+
+def default_session(sql_session: Session | None = None) -> Session:
+    """
+    Returns `sql_session` if given, or else the session of the registered factory.
+    """
+    if sql_session is not None:
+        return sql_session
+    if _default_session_factory is None:
+        raise RuntimeError(
+            "No session given, and no default session registered with set_default_session()",
+        )
+    return _default_session_factory()
@@ -0,0 +1,44 @@
+"""
+Yearly partitions for the history tables on PostgreSQL.
+
+The history tables are partitioned by range of a timestamp column, with one partition per year,
+which `worblehat.services.archive` creates before moving the rows of that year into it.
+Queries limited to recent years only read the partitions of those years, and old years can be
+detached or dropped as whole tables. On SQLite, the history tables are ordinary tables.
+
+The partitions are not part of the ORM metadata, and are created on demand rather than
+through `Base.metadata.create_all()` or the alembic migrations.
+"""
+
+import re
+
+# Table name -> column the table is partitioned by
+HISTORY_PARTITION_COLUMNS: dict[str, str] = {
+    "BookcaseItemBorrowingHistory": "delivered",
+    "BookcaseItemBorrowingQueueHistory": "item_became_available_time",
+}
+
+
+def yearly_partition_name(table_name: str, year: int) -> str:
+    return f"{table_name}_{year}"
+
+
+def is_history_partition(name: str | None) -> bool:
+    """
+    Returns True if the given table name belongs to a yearly partition of a history table.
+    These are not part of the ORM metadata, and should be ignored by alembic autogenerate.
+    """
+    if name is None:
+        return False
+    return any(
+        re.fullmatch(rf"{re.escape(table_name)}_\d{{4}}", name) is not None
+        for table_name in HISTORY_PARTITION_COLUMNS
+    )
+
+
+def postgresql_yearly_partition_ddl(table_name: str, year: int) -> str:
+    return f"""
+        CREATE TABLE IF NOT EXISTS "{yearly_partition_name(table_name, year)}"
+        PARTITION OF "{table_name}"
+        FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+    """
@@ -1,9 +1,12 @@
 from logging.config import fileConfig
+from pathlib import Path
 
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
 from worblehat.models import Base
+from worblehat.models.history_partitions import is_history_partition
+from worblehat.models.search_index import is_search_index_object
 from worblehat.services.config import Config
 
 config = context.config
@@ -13,7 +16,7 @@ if config.config_file_name is not None:
 
 config_attrs = {}
 if config_path := context.get_x_argument(as_dictionary=True).get("config", None):
-    config_attrs["config_file"] = config_path
+    config_attrs["config_file"] = Path(config_path)
 
 Config.load_configuration(config_attrs)
 
@@ -30,6 +33,13 @@ def _process_revision_directives(context, revision, directives) -> None:
             print("No changes in schema detected. Not generating migration.")
 
 
+# The search indices are managed by hand in their own migration, since alembic does not
+# understand FTS5 tables and operator class indices. The yearly partitions of the history
+# tables are created on demand when archiving.
+def _include_name(name: str | None, type_: str, parent_names: dict[str, str | None]) -> bool:
+    return not is_search_index_object(name) and not is_history_partition(name)
+
+
 def run_migrations_online() -> None:
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
@@ -49,6 +59,7 @@ def run_migrations_online() -> None:
             # https://alembic.sqlalchemy.org/en/latest/batch.html
             render_as_batch=True,
             process_revision_directives=_process_revision_directives,
+            include_name=_include_name,
         )
 
         with context.begin_transaction():
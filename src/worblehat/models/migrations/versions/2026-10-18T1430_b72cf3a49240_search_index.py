@@ -0,0 +1,53 @@
+"""search_index
+
+Adds FTS5 tables on SQLite, and pg_trgm indices on PostgreSQL,
+for the columns listed in worblehat.models.search_index.
+
+Revision ID: b72cf3a49240
+Revises: 7dfbf8a8dec8
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+
+from alembic import op
+
+from worblehat.models.search_index import (
+    SEARCH_INDEXED_COLUMNS,
+    fts_table_name,
+    postgresql_search_index_ddl,
+    sqlite_search_index_ddl,
+    trigram_index_name,
+)
+
+# revision identifiers, used by Alembic.
+revision = "b72cf3a49240"
+down_revision = "7dfbf8a8dec8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+    for table_name, columns in SEARCH_INDEXED_COLUMNS.items():
+        if dialect_name == "sqlite":
+            statements = sqlite_search_index_ddl(table_name, columns)
+        elif dialect_name == "postgresql":
+            statements = postgresql_search_index_ddl(table_name, columns)
+        else:
+            continue
+
+        for statement in statements:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+    for table_name, columns in SEARCH_INDEXED_COLUMNS.items():
+        if dialect_name == "sqlite":
+            fts_table = fts_table_name(table_name)
+            for trigger in ["insert", "delete", "update"]:
+                op.execute(f'DROP TRIGGER IF EXISTS "{fts_table}_{trigger}"')
+            op.execute(f'DROP TABLE IF EXISTS "{fts_table}"')
+        elif dialect_name == "postgresql":
+            for column in columns:
+                op.execute(f'DROP INDEX IF EXISTS "{trigram_index_name(table_name, column)}"')
@@ -0,0 +1,70 @@
+"""borrowing_and_queue_indices
+
+Adds partial indices for the conditions used by the borrowing, queue and deadline daemon queries.
+
+Revision ID: e4f004fd7e8f
+Revises: ee6e43483017
+Create Date: 2026-10-18 16:00:09.677477
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4f004fd7e8f"
+down_revision = "ee6e43483017"
+branch_labels = None
+depends_on = None
+
+
+# NOTE: These are rendered separately for each dialect, and must match the models exactly.
+def _where(condition: sa.ColumnElement[bool]) -> dict[str, sa.ColumnElement[bool]]:
+    return {"sqlite_where": condition, "postgresql_where": condition}
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("BookcaseItemBorrowing", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowing_delivered",
+            ["delivered"],
+            unique=False,
+            **_where(sa.column("delivered").is_not(None)),
+        )
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowing_undelivered_end_time",
+            ["end_time"],
+            unique=False,
+            **_where(sa.column("delivered").is_(None)),
+        )
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowing_undelivered_item_end_time",
+            ["fk_bookcase_item_uid", "end_time"],
+            unique=False,
+            **_where(sa.column("delivered").is_(None)),
+        )
+
+    with op.batch_alter_table("BookcaseItemBorrowingQueue", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowingQueue_unexpired_available_time",
+            ["item_became_available_time"],
+            unique=False,
+            **_where(sa.column("expired").is_(False)),
+        )
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowingQueue_waiting_item_entered_queue_time",
+            ["fk_bookcase_item_uid", "entered_queue_time"],
+            unique=False,
+            **_where(sa.column("item_became_available_time").is_(None)),
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("BookcaseItemBorrowingQueue", schema=None) as batch_op:
+        batch_op.drop_index("ix_BookcaseItemBorrowingQueue_waiting_item_entered_queue_time")
+        batch_op.drop_index("ix_BookcaseItemBorrowingQueue_unexpired_available_time")
+
+    with op.batch_alter_table("BookcaseItemBorrowing", schema=None) as batch_op:
+        batch_op.drop_index("ix_BookcaseItemBorrowing_undelivered_item_end_time")
+        batch_op.drop_index("ix_BookcaseItemBorrowing_undelivered_end_time")
+        batch_op.drop_index("ix_BookcaseItemBorrowing_delivered")
@@ -0,0 +1,78 @@
+"""availability_counters
+
+Adds the availability counters of the items, and computes them from the existing
+borrowings and queue positions.
+
+Revision ID: 25e7442f98d2
+Revises: e4f004fd7e8f
+Create Date: 2026-10-18 16:30:12.402718
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "25e7442f98d2"
+down_revision = "e4f004fd7e8f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("BookcaseItem", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("active_borrowing_count", sa.Integer(), server_default="0", nullable=False),
+        )
+        batch_op.add_column(
+            sa.Column("pending_queue_count", sa.Integer(), server_default="0", nullable=False),
+        )
+        batch_op.add_column(sa.Column("next_due_time", sa.DateTime(), nullable=True))
+
+    # NOTE: This uses its own table definitions rather than the models,
+    #       so that it keeps working when the models change later on.
+    item = sa.table(
+        "BookcaseItem",
+        sa.column("uid"),
+        sa.column("active_borrowing_count"),
+        sa.column("pending_queue_count"),
+        sa.column("next_due_time"),
+    )
+    borrowing = sa.table(
+        "BookcaseItemBorrowing",
+        sa.column("fk_bookcase_item_uid"),
+        sa.column("end_time"),
+        sa.column("delivered"),
+    )
+    queue = sa.table(
+        "BookcaseItemBorrowingQueue",
+        sa.column("fk_bookcase_item_uid"),
+        sa.column("item_became_available_time"),
+    )
+    active_borrowing = (
+        borrowing.c.fk_bookcase_item_uid == item.c.uid,
+        borrowing.c.delivered.is_(None),
+    )
+    op.execute(
+        sa.update(item).values(
+            active_borrowing_count=sa.select(sa.func.count())
+            .where(*active_borrowing)
+            .scalar_subquery(),
+            pending_queue_count=sa.select(sa.func.count())
+            .where(
+                queue.c.fk_bookcase_item_uid == item.c.uid,
+                queue.c.item_became_available_time.is_(None),
+            )
+            .scalar_subquery(),
+            next_due_time=sa.select(sa.func.min(borrowing.c.end_time))
+            .where(*active_borrowing)
+            .scalar_subquery(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("BookcaseItem", schema=None) as batch_op:
+        batch_op.drop_column("next_due_time")
+        batch_op.drop_column("pending_queue_count")
+        batch_op.drop_column("active_borrowing_count")
@@ -0,0 +1,100 @@
+"""borrowing_history
+
+Adds the history tables for archived borrowings and queue positions. On PostgreSQL, these are
+partitioned by year, and the partitions are created when archiving.
+
+Revision ID: aee6fd9d2ef3
+Revises: 25e7442f98d2
+Create Date: 2026-10-18 17:00:41.863290
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "aee6fd9d2ef3"
+down_revision = "25e7442f98d2"
+branch_labels = None
+depends_on = None
+
+
+# NOTE: The foreign key names are shortened by the naming convention of the models,
+#       since they would be longer than the 63 characters PostgreSQL allows.
+def upgrade() -> None:
+    op.create_table(
+        "BookcaseItemBorrowingHistory",
+        sa.Column("uid", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("delivered", sa.DateTime(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("archived_time", sa.DateTime(), nullable=False),
+        sa.Column("fk_bookcase_item_uid", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["fk_bookcase_item_uid"],
+            ["BookcaseItem.uid"],
+            name=op.f("fk_BookcaseItemBorrowingHistory_fk_bookcase_item_uid_Bo_a6e9"),
+        ),
+        sa.PrimaryKeyConstraint("uid", "delivered", name=op.f("pk_BookcaseItemBorrowingHistory")),
+        postgresql_partition_by="RANGE (delivered)",
+    )
+    with op.batch_alter_table("BookcaseItemBorrowingHistory", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowingHistory_item_delivered",
+            ["fk_bookcase_item_uid", "delivered"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_BookcaseItemBorrowingHistory_username"),
+            ["username"],
+            unique=False,
+        )
+
+    op.create_table(
+        "BookcaseItemBorrowingQueueHistory",
+        sa.Column("uid", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("item_became_available_time", sa.DateTime(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("entered_queue_time", sa.DateTime(), nullable=False),
+        sa.Column("expired", sa.Boolean(), nullable=False),
+        sa.Column("archived_time", sa.DateTime(), nullable=False),
+        sa.Column("fk_bookcase_item_uid", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["fk_bookcase_item_uid"],
+            ["BookcaseItem.uid"],
+            name=op.f("fk_BookcaseItemBorrowingQueueHistory_fk_bookcase_item_u_8f87"),
+        ),
+        sa.PrimaryKeyConstraint(
+            "uid",
+            "item_became_available_time",
+            name=op.f("pk_BookcaseItemBorrowingQueueHistory"),
+        ),
+        postgresql_partition_by="RANGE (item_became_available_time)",
+    )
+    with op.batch_alter_table("BookcaseItemBorrowingQueueHistory", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_BookcaseItemBorrowingQueueHistory_item_available_time",
+            ["fk_bookcase_item_uid", "item_became_available_time"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_BookcaseItemBorrowingQueueHistory_username"),
+            ["username"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    # NOTE: On PostgreSQL, this also drops the yearly partitions
+    with op.batch_alter_table("BookcaseItemBorrowingQueueHistory", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_BookcaseItemBorrowingQueueHistory_username"))
+        batch_op.drop_index("ix_BookcaseItemBorrowingQueueHistory_item_available_time")
+
+    op.drop_table("BookcaseItemBorrowingQueueHistory")
+
+    with op.batch_alter_table("BookcaseItemBorrowingHistory", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_BookcaseItemBorrowingHistory_username"))
+        batch_op.drop_index("ix_BookcaseItemBorrowingHistory_item_delivered")
+
+    op.drop_table("BookcaseItemBorrowingHistory")
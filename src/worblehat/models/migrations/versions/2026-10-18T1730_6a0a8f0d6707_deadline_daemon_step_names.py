@@ -0,0 +1,36 @@
+"""deadline_daemon_step_names
+
+Identifies the steps of an interrupted deadline daemon run by name, rather than by their
+position, which depends on the configuration. The position of an interrupted run can not be
+translated, so such a run is started over from its first step.
+
+Revision ID: 6a0a8f0d6707
+Revises: aee6fd9d2ef3
+Create Date: 2026-10-18 17:30:26.517093
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6a0a8f0d6707"
+down_revision = "aee6fd9d2ef3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("DeadlineDaemonLastRunDatetime", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("completed_run_steps", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("current_run_cursors", sa.JSON(), nullable=True))
+        batch_op.drop_column("current_run_cursor")
+        batch_op.drop_column("current_run_step")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("DeadlineDaemonLastRunDatetime", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("current_run_step", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("current_run_cursor", sa.Integer(), nullable=True))
+        batch_op.drop_column("current_run_cursors")
+        batch_op.drop_column("completed_run_steps")
@@ -0,0 +1,54 @@
+"""search_index_update_of_columns
+
+Limits the SQLite triggers which reindex updated rows to updates of the indexed columns,
+so that e.g. updating the availability counters of an item does not reindex it.
+
+Revision ID: e42ee256beac
+Revises: 6a0a8f0d6707
+Create Date: 2026-10-18 18:00:37.204518
+
+"""
+
+from alembic import op
+
+from worblehat.models.search_index import (
+    SEARCH_INDEXED_COLUMNS,
+    fts_table_name,
+    sqlite_search_index_update_trigger_ddl,
+)
+
+# revision identifiers, used by Alembic.
+revision = "e42ee256beac"
+down_revision = "6a0a8f0d6707"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table_name, columns in SEARCH_INDEXED_COLUMNS.items():
+        op.execute(f'DROP TRIGGER IF EXISTS "{fts_table_name(table_name)}_update"')
+        op.execute(sqlite_search_index_update_trigger_ddl(table_name, columns))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table_name, columns in SEARCH_INDEXED_COLUMNS.items():
+        fts_table = fts_table_name(table_name)
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{c}" for c in columns)
+        old_values = ", ".join(f"old.{c}" for c in columns)
+        op.execute(f'DROP TRIGGER IF EXISTS "{fts_table}_update"')
+        op.execute(
+            f"""
+            CREATE TRIGGER "{fts_table}_update" AFTER UPDATE ON "{table_name}" BEGIN
+                INSERT INTO "{fts_table}" ("{fts_table}", rowid, {column_list})
+                VALUES ('delete', old.uid, {old_values});
+                INSERT INTO "{fts_table}" (rowid, {column_list}) VALUES (new.uid, {new_values});
+            END
+            """,  # noqa: S608 - the names come from SEARCH_INDEXED_COLUMNS
+        )
@@ -7,26 +7,17 @@ from sqlalchemy.orm import (
     mapped_column,
 )
 
-from worblehat.flaskapp.database import db
+from ..default_session import default_session
 
 
 class UniqueNameMixin:
     name: Mapped[str] = mapped_column(Text, unique=True, index=True)
 
     @classmethod
-    def get_by_name(cls, name: str, sql_session: Session = db.session) -> Self | None:
+    def get_by_name(cls, name: str, sql_session: Session | None = None) -> Self | None:
         """
         NOTE:
-        This method defaults to using the flask_sqlalchemy session.
-        It will not work outside of a request context, unless another session is provided.
+        This method defaults to the session registered with `set_default_session`,
+        which is the flask_sqlalchemy session within the web interface.
         """
-        return sql_session.query(cls).where(cls.name == name).one_or_none()
-
-    @classmethod
-    def get_by_uid_or_404(cls, name: str, sql_session: Session = db.session) -> Self:
-        """
-        NOTE:
-        This method defaults to using the flask_sqlalchemy session.
-        It will not work outside of a request context, unless another session is provided.
-        """
-        return sql_session.query(cls).where(cls.name == name).one_or_404()
+        return default_session(sql_session).query(cls).where(cls.name == name).one_or_none()
@@ -0,0 +1,122 @@
+"""
+Search indices for the columns used by the free text searches in `worblehat.queries`.
+
+On SQLite, each indexed table gets an external content FTS5 table using the trigram tokenizer,
+kept in sync with the original table by triggers. On PostgreSQL, the columns get GIN trigram
+indices from the pg_trgm extension, which lets `ILIKE '%text%'` use an index.
+
+These objects are created together with their tables through `Base.metadata.create_all()`.
+Existing databases get them through the corresponding alembic migration.
+"""
+
+from sqlalchemy import DDL, event
+
+from .Base import Base
+
+# Table name -> columns to index
+#
+# NOTE: The DDL below is built from these names, and never from user input,
+#       which is why the SQL injection warnings (S608) are silenced for it.
+SEARCH_INDEXED_COLUMNS: dict[str, list[str]] = {
+    "BookcaseItem": ["name", "owner"],
+    "Author": ["name"],
+}
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def trigram_index_name(table_name: str, column_name: str) -> str:
+    return f"trgm_{table_name}_{column_name}"
+
+
+def is_search_index_object(name: str | None) -> bool:
+    """
+    Returns True if the given table, trigger or index name belongs to a search index.
+    These are not part of the ORM metadata, and should be ignored by alembic autogenerate.
+    """
+    if name is None:
+        return False
+    return any(
+        name.startswith(fts_table_name(table_name))
+        or any(
+            name == trigram_index_name(table_name, column_name)
+            for column_name in columns
+        )
+        for table_name, columns in SEARCH_INDEXED_COLUMNS.items()
+    )
+
+
+def sqlite_search_index_update_trigger_ddl(table_name: str, columns: list[str]) -> str:
+    """
+    The trigger which reindexes a row when one of its indexed columns is updated.
+    Updates to the other columns, such as the availability counters, leave the index alone.
+    """
+    fts_table = fts_table_name(table_name)
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    return f"""
+        CREATE TRIGGER "{fts_table}_update" AFTER UPDATE OF {column_list} ON "{table_name}" BEGIN
+            INSERT INTO "{fts_table}" ("{fts_table}", rowid, {column_list})
+            VALUES ('delete', old.uid, {old_values});
+            INSERT INTO "{fts_table}" (rowid, {column_list}) VALUES (new.uid, {new_values});
+        END
+        """  # noqa: S608
+
+
+def sqlite_search_index_ddl(table_name: str, columns: list[str]) -> list[str]:
+    fts_table = fts_table_name(table_name)
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"""
+        CREATE VIRTUAL TABLE "{fts_table}" USING fts5(
+            {column_list},
+            content='{table_name}',
+            content_rowid='uid',
+            tokenize='trigram'
+        )
+        """,
+        f"""
+        CREATE TRIGGER "{fts_table}_insert" AFTER INSERT ON "{table_name}" BEGIN
+            INSERT INTO "{fts_table}" (rowid, {column_list}) VALUES (new.uid, {new_values});
+        END
+        """,  # noqa: S608
+        f"""
+        CREATE TRIGGER "{fts_table}_delete" AFTER DELETE ON "{table_name}" BEGIN
+            INSERT INTO "{fts_table}" ("{fts_table}", rowid, {column_list})
+            VALUES ('delete', old.uid, {old_values});
+        END
+        """,  # noqa: S608
+        sqlite_search_index_update_trigger_ddl(table_name, columns),
+        f"""INSERT INTO "{fts_table}" ("{fts_table}") VALUES ('rebuild')""",  # noqa: S608
+    ]
+
+
+def postgresql_search_index_ddl(table_name: str, columns: list[str]) -> list[str]:
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        *(
+            f"""
+            CREATE INDEX "{trigram_index_name(table_name, column)}"
+            ON "{table_name}" USING gin ("{column}" gin_trgm_ops)
+            """
+            for column in columns
+        ),
+    ]
+
+
+for _table_name, _columns in SEARCH_INDEXED_COLUMNS.items():
+    _table = Base.metadata.tables[_table_name]
+    for _statement in sqlite_search_index_ddl(_table_name, _columns):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    for _statement in postgresql_search_index_ddl(_table_name, _columns):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+    event.listen(
+        _table,
+        "before_drop",
+        DDL(f'DROP TABLE IF EXISTS "{fts_table_name(_table_name)}"').execute_if(dialect="sqlite"),
+    )
@@ -1,9 +1,23 @@
-from .author import search_authors_by_name
-from .bookcase import find_bookcase_by_name
+from .author import (
+    list_authors_by_names,
+    search_authors_by_name,
+    search_authors_by_name_with_items,
+)
+from .availability import (
+    BookcaseItemAvailability,
+    list_bookcase_item_availability,
+)
+from .bookcase import (
+    find_bookcase_by_name,
+    list_bookcases,
+)
 from .bookcase_item import (
     find_bookcase_item_by_isbn,
     find_bookcase_item_by_name,
+    find_bookcase_item_with_details_by_isbn,
+    list_bookcase_items_by_isbns,
     list_bookcase_items_by_owner,
+    list_bookcase_items_with_details,
     search_bookcase_item_owners,
     search_bookcase_items_by_title,
 )
@@ -11,20 +25,25 @@ from .bookcase_shelf import (
     find_bookcase_shelf,
     list_bookcase_shelf_positions,
     list_bookcase_shelfs_ordered,
+    list_bookcase_shelfs_with_items,
 )
 from .borrowing import (
     has_active_borrowing,
     list_active_borrowings,
     list_active_borrowings_for_item,
+    list_active_borrowings_with_items,
     list_borrowings_for_isbn,
     list_overdue_borrowings,
+    list_overdue_borrowings_with_items,
 )
 from .borrowing_queue import (
     is_in_borrowing_queue,
     list_all_queue_items,
+    list_all_queue_items_with_items,
     list_pending_queue_items_for_item,
 )
 from .deadline_daemon import (
+    expire_overdue_queue_positions,
     find_last_run,
     find_next_queue_position,
     list_close_deadline_borrowings,
@@ -33,12 +52,27 @@ from .deadline_daemon import (
     list_overdue_queue_positions,
     list_undelivered_overdue_borrowings,
 )
+from .history import (
+    BorrowingRecord,
+    QueuePositionRecord,
+    list_borrowing_history,
+    list_queue_position_history,
+)
 from .media_type import find_media_type_by_name
+from .outbox import list_pending_outbox_emails
+from .search import (
+    search_bookcase_items,
+    search_bookcase_items_with_details,
+)
 
 __all__ = [
+    "BookcaseItemAvailability",
+    "BorrowingRecord",
+    "expire_overdue_queue_positions",
     "find_bookcase_by_name",
     "find_bookcase_item_by_isbn",
     "find_bookcase_item_by_name",
+    "find_bookcase_item_with_details_by_isbn",
     "find_bookcase_shelf",
     "find_last_run",
     "find_media_type_by_name",
@@ -47,19 +81,35 @@ __all__ = [
     "is_in_borrowing_queue",
     "list_active_borrowings",
     "list_active_borrowings_for_item",
+    "list_active_borrowings_with_items",
     "list_all_queue_items",
+    "list_all_queue_items_with_items",
+    "list_authors_by_names",
+    "list_bookcase_item_availability",
+    "list_bookcase_items_by_isbns",
     "list_bookcase_items_by_owner",
+    "list_bookcase_items_with_details",
     "list_bookcase_shelf_positions",
     "list_bookcase_shelfs_ordered",
+    "list_bookcase_shelfs_with_items",
+    "list_bookcases",
+    "list_borrowing_history",
     "list_borrowings_for_isbn",
     "list_close_deadline_borrowings",
     "list_expiring_queue_positions",
     "list_newly_available_queue_items",
     "list_overdue_borrowings",
+    "list_overdue_borrowings_with_items",
     "list_overdue_queue_positions",
+    "list_pending_outbox_emails",
     "list_pending_queue_items_for_item",
+    "list_queue_position_history",
     "list_undelivered_overdue_borrowings",
+    "QueuePositionRecord",
     "search_authors_by_name",
+    "search_authors_by_name_with_items",
     "search_bookcase_item_owners",
+    "search_bookcase_items",
     "search_bookcase_items_by_title",
+    "search_bookcase_items_with_details",
 ]
@@ -1,12 +1,28 @@
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from worblehat.models import Author
 
+from .search import filter_by_search_text
+
 
 def search_authors_by_name(sql_session: Session, text: str) -> list[Author]:
+    query, rank = filter_by_search_text(sql_session, select(Author), Author, "name", text)
+    return list(sql_session.scalars(query.order_by(rank)).all())
+
+
+def search_authors_by_name_with_items(sql_session: Session, text: str) -> list[Author]:
+    """
+    Like `search_authors_by_name`, but loads the items of all the authors in one extra statement.
+    """
+    query, rank = filter_by_search_text(sql_session, select(Author), Author, "name", text)
+    query = query.options(selectinload(Author.items))
+    return list(sql_session.scalars(query.order_by(rank)).all())
+
+
+def list_authors_by_names(sql_session: Session, names: list[str]) -> list[Author]:
     return list(
         sql_session.scalars(
-            select(Author).where(Author.name.ilike(f"%{text}%")),
+            select(Author).where(Author.name.in_(names)),
         ).all(),
     )
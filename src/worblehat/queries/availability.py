@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from worblehat.models import BookcaseItem
+
+
+class BookcaseItemAvailability(NamedTuple):
+    item_uid: int
+    amount: int
+    borrowed: int
+    queued: int
+    next_due: datetime | None
+
+    @property
+    def available(self) -> int:
+        return max(self.amount - self.borrowed, 0)
+
+
+def list_bookcase_item_availability(
+    sql_session: Session,
+    item_uids: list[int] | None = None,
+    after_uid: int | None = None,
+    limit: int | None = None,
+) -> list[BookcaseItemAvailability]:
+    """
+    Reads the availability counters of items, which are kept up to date with their active
+    borrowings and pending queue positions, so that this never has to scan the borrowing history.
+
+    The items are either the ones in `item_uids`, or else all items in order of uid, starting
+    after `after_uid` for keyset pagination.
+    """
+    query = select(
+        BookcaseItem.uid,
+        BookcaseItem.amount,
+        BookcaseItem.active_borrowing_count,
+        BookcaseItem.pending_queue_count,
+        BookcaseItem.next_due_time,
+    ).order_by(BookcaseItem.uid)
+
+    if item_uids is not None:
+        query = query.where(BookcaseItem.uid.in_(item_uids))
+    if after_uid is not None:
+        query = query.where(BookcaseItem.uid > after_uid)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [BookcaseItemAvailability(*row) for row in sql_session.execute(query).all()]
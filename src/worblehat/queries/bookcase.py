@@ -8,3 +8,11 @@ def find_bookcase_by_name(sql_session: Session, name: str) -> Bookcase | None:
     return sql_session.scalars(
         select(Bookcase).where(Bookcase.name == name),
     ).one_or_none()
+
+
+def list_bookcases(sql_session: Session) -> list[Bookcase]:
+    return list(
+        sql_session.scalars(
+            select(Bookcase).order_by(Bookcase.name),
+        ).all(),
+    )
@@ -1,8 +1,11 @@
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from worblehat.models import BookcaseItem
 
+from .loader_options import bookcase_item_details
+from .search import filter_by_search_text
+
 
 def find_bookcase_item_by_isbn(sql_session: Session, isbn: str) -> BookcaseItem | None:
     return sql_session.scalars(
@@ -16,18 +19,36 @@ def find_bookcase_item_by_name(sql_session: Session, name: str) -> BookcaseItem
     ).one_or_none()
 
 
-def search_bookcase_items_by_title(sql_session: Session, text: str) -> list[BookcaseItem]:
+def list_bookcase_items_by_isbns(sql_session: Session, isbns: list[str]) -> list[BookcaseItem]:
     return list(
         sql_session.scalars(
-            select(BookcaseItem).where(BookcaseItem.name.ilike(f"%{text}%")),
+            select(BookcaseItem).where(BookcaseItem.isbn.in_(isbns)),
         ).all(),
     )
 
 
+def search_bookcase_items_by_title(sql_session: Session, text: str) -> list[BookcaseItem]:
+    query, rank = filter_by_search_text(
+        sql_session,
+        select(BookcaseItem),
+        BookcaseItem,
+        "name",
+        text,
+    )
+    return list(sql_session.scalars(query.order_by(rank)).all())
+
+
 def search_bookcase_item_owners(sql_session: Session, text: str) -> list[str]:
+    query, rank = filter_by_search_text(
+        sql_session,
+        select(BookcaseItem.owner),
+        BookcaseItem,
+        "owner",
+        text,
+    )
     return list(
         sql_session.scalars(
-            select(BookcaseItem.owner).where(BookcaseItem.owner.ilike(f"%{text}%")).distinct(),
+            query.group_by(BookcaseItem.owner).order_by(func.min(rank)),
         ).all(),
     )
 
@@ -38,3 +59,37 @@ def list_bookcase_items_by_owner(sql_session: Session, owner: str) -> list[Bookc
             select(BookcaseItem).where(BookcaseItem.owner == owner),
         ).all(),
     )
+
+
+def find_bookcase_item_with_details_by_isbn(
+    sql_session: Session,
+    isbn: str,
+) -> BookcaseItem | None:
+    """
+    Like `find_bookcase_item_by_isbn`, but loads the relationships in `bookcase_item_details`.
+    """
+    return sql_session.scalars(
+        select(BookcaseItem)
+        .options(*bookcase_item_details())
+        .where(BookcaseItem.isbn == isbn),
+    ).one_or_none()
+
+
+def list_bookcase_items_with_details(
+    sql_session: Session,
+    after_uid: int | None = None,
+    limit: int | None = None,
+) -> list[BookcaseItem]:
+    """
+    Lists items in order of uid, together with the relationships in `bookcase_item_details`.
+
+    Only items after `after_uid` are listed, so that the next page can be fetched by passing
+    the uid of the last item of the previous page, without having to skip any rows.
+    """
+    query = select(BookcaseItem).options(*bookcase_item_details()).order_by(BookcaseItem.uid)
+    if after_uid is not None:
+        query = query.where(BookcaseItem.uid > after_uid)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return list(sql_session.scalars(query).all())
@@ -1,5 +1,5 @@
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from worblehat.models import Bookcase, BookcaseShelf
 
@@ -33,6 +33,26 @@ def list_bookcase_shelfs_ordered(sql_session: Session) -> list[BookcaseShelf]:
     )
 
 
+def list_bookcase_shelfs_with_items(
+    sql_session: Session,
+    bookcase: Bookcase,
+) -> list[BookcaseShelf]:
+    """
+    Lists the shelfs of a bookcase together with their items, using two statements in total.
+    """
+    return list(
+        sql_session.scalars(
+            select(BookcaseShelf)
+            .options(selectinload(BookcaseShelf.items))
+            .where(BookcaseShelf.bookcase == bookcase)
+            .order_by(
+                BookcaseShelf.column,
+                BookcaseShelf.row,
+            ),
+        ).all(),
+    )
+
+
 def list_bookcase_shelf_positions(
     sql_session: Session,
     bookcase: Bookcase,
@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, joinedload
 
 from worblehat.models import BookcaseItem, BookcaseItemBorrowing
 
@@ -16,6 +16,20 @@ def list_active_borrowings(sql_session: Session) -> list[BookcaseItemBorrowing]:
     )
 
 
+def list_active_borrowings_with_items(sql_session: Session) -> list[BookcaseItemBorrowing]:
+    """
+    Like `list_active_borrowings`, but loads the borrowed items in the same statement.
+    """
+    return list(
+        sql_session.scalars(
+            select(BookcaseItemBorrowing)
+            .options(joinedload(BookcaseItemBorrowing.item))
+            .where(BookcaseItemBorrowing.delivered.is_(None))
+            .order_by(BookcaseItemBorrowing.end_time),
+        ).all(),
+    )
+
+
 def list_active_borrowings_for_item(
     sql_session: Session,
     item: BookcaseItem,
@@ -71,3 +85,21 @@ def list_overdue_borrowings(sql_session: Session) -> list[BookcaseItemBorrowing]
             .order_by(BookcaseItemBorrowing.end_time),
         ).all(),
     )
+
+
+def list_overdue_borrowings_with_items(sql_session: Session) -> list[BookcaseItemBorrowing]:
+    """
+    Like `list_overdue_borrowings`, but loads the borrowed items in the same statement.
+    """
+    return list(
+        sql_session.scalars(
+            select(BookcaseItemBorrowing)
+            .join(BookcaseItemBorrowing.item)
+            .options(contains_eager(BookcaseItemBorrowing.item))
+            .where(
+                BookcaseItemBorrowing.end_time < datetime.now(),
+                BookcaseItemBorrowing.delivered.is_(None),
+            )
+            .order_by(BookcaseItemBorrowing.end_time),
+        ).all(),
+    )
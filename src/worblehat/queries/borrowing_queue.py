@@ -1,5 +1,5 @@
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from worblehat.models import BookcaseItem, BookcaseItemBorrowingQueue
 
@@ -14,6 +14,19 @@ def list_all_queue_items(sql_session: Session) -> list[BookcaseItemBorrowingQueu
     )
 
 
+def list_all_queue_items_with_items(sql_session: Session) -> list[BookcaseItemBorrowingQueue]:
+    """
+    Like `list_all_queue_items`, but loads the queued items in the same statement.
+    """
+    return list(
+        sql_session.scalars(
+            select(BookcaseItemBorrowingQueue)
+            .options(joinedload(BookcaseItemBorrowingQueue.item))
+            .order_by(BookcaseItemBorrowingQueue.entered_queue_time),
+        ).all(),
+    )
+
+
 def is_in_borrowing_queue(sql_session: Session, username: str, item: BookcaseItem) -> bool:
     return (
         sql_session.scalars(
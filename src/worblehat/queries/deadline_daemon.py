@@ -1,32 +1,16 @@
 from datetime import datetime, timedelta
 
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
-from sqlalchemy.sql.elements import SQLColumnExpression
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, selectinload
 
 from worblehat.models import (
     BookcaseItemBorrowing,
     BookcaseItemBorrowingQueue,
     DeadlineDaemonLastRunDatetime,
+    refresh_availability_counters,
 )
 
 
-def _sql_subtract_date(
-    sql_session: Session,
-    x: SQLColumnExpression[datetime],
-    y: timedelta,
-) -> SQLColumnExpression[datetime]:
-    dialect_name = sql_session.get_bind().dialect.name
-    if dialect_name == "sqlite":
-        # SQLite does not support timedelta in queries
-        return func.datetime(x, f"-{y.days} days")
-    if dialect_name == "postgresql":
-        return x - y
-    raise NotImplementedError(
-        f"Unsupported dialect: {dialect_name}",
-    )
-
-
 def find_last_run(sql_session: Session) -> DeadlineDaemonLastRunDatetime | None:
     return sql_session.scalars(
         select(DeadlineDaemonLastRunDatetime),
@@ -42,13 +26,11 @@ def list_close_deadline_borrowings(
     return list(
         sql_session.scalars(
             select(BookcaseItemBorrowing).where(
-                _sql_subtract_date(
-                    sql_session,
-                    BookcaseItemBorrowing.end_time,
-                    timedelta(days=day),
-                ).between(
-                    last_run_datetime,
-                    current_run_datetime,
+                # NOTE: The offset is applied to the bounds rather than to end_time,
+                #       so that the query can use the index on end_time.
+                BookcaseItemBorrowing.end_time.between(
+                    last_run_datetime + timedelta(days=day),
+                    current_run_datetime + timedelta(days=day),
                 ),
                 BookcaseItemBorrowing.delivered.is_(None),
             ),
@@ -115,6 +97,7 @@ def list_expiring_queue_positions(
                     last_run_datetime,
                     current_run_datetime,
                 ),
+                BookcaseItemBorrowingQueue.expired.is_(False),
             ),
         ).all(),
     )
@@ -149,3 +132,92 @@ def find_next_queue_position(
         .order_by(BookcaseItemBorrowingQueue.entered_queue_time)
         .limit(1),
     ).one_or_none()
+
+
+def expire_overdue_queue_positions(
+    sql_session: Session,
+    queue_position_expiry_days: int,
+    current_run_datetime: datetime,
+) -> tuple[list[BookcaseItemBorrowingQueue], list[BookcaseItemBorrowingQueue]]:
+    """
+    Expires all queue positions older than `queue_position_expiry_days`, and gives each
+    item one new available queue position per expired one, to the users who have waited longest.
+
+    This is done with a fixed amount of statements regardless of the amount of positions,
+    and is not committed. Returns the expired and the promoted queue positions, with their
+    items loaded, for notifying the users.
+    """
+    expiry_cutoff = current_run_datetime - timedelta(days=queue_position_expiry_days)
+
+    expired = list(
+        sql_session.scalars(
+            update(BookcaseItemBorrowingQueue)
+            .where(
+                BookcaseItemBorrowingQueue.item_became_available_time < expiry_cutoff,
+                BookcaseItemBorrowingQueue.expired.is_(False),
+            )
+            .values(expired=True)
+            .returning(BookcaseItemBorrowingQueue),
+        ).all(),
+    )
+    if len(expired) == 0:
+        return [], []
+
+    expired_uids = [queue_position.uid for queue_position in expired]
+
+    expired_per_item = (
+        select(
+            BookcaseItemBorrowingQueue.fk_bookcase_item_uid,
+            func.count().label("amount"),
+        )
+        .where(BookcaseItemBorrowingQueue.uid.in_(expired_uids))
+        .group_by(BookcaseItemBorrowingQueue.fk_bookcase_item_uid)
+        .subquery()
+    )
+    waiting = (
+        select(
+            BookcaseItemBorrowingQueue.uid,
+            BookcaseItemBorrowingQueue.fk_bookcase_item_uid,
+            func.row_number()
+            .over(
+                partition_by=BookcaseItemBorrowingQueue.fk_bookcase_item_uid,
+                order_by=BookcaseItemBorrowingQueue.entered_queue_time,
+            )
+            .label("position"),
+        )
+        .where(BookcaseItemBorrowingQueue.item_became_available_time.is_(None))
+        .subquery()
+    )
+    next_in_line = select(waiting.c.uid).join(
+        expired_per_item,
+        expired_per_item.c.fk_bookcase_item_uid == waiting.c.fk_bookcase_item_uid,
+    ).where(waiting.c.position <= expired_per_item.c.amount)
+
+    promoted = list(
+        sql_session.scalars(
+            update(BookcaseItemBorrowingQueue)
+            .where(BookcaseItemBorrowingQueue.uid.in_(next_in_line))
+            .values(item_became_available_time=current_run_datetime)
+            .returning(BookcaseItemBorrowingQueue),
+        ).all(),
+    )
+
+    # NOTE: The bulk updates above bypass the flush, which would otherwise keep these up to date
+    refresh_availability_counters(
+        sql_session,
+        {queue_position.fk_bookcase_item_uid for queue_position in expired},
+    )
+
+    # NOTE: The returned positions are the same objects as the ones loaded here,
+    #       so this loads their items, with their refreshed counters, in one more statement.
+    sql_session.scalars(
+        select(BookcaseItemBorrowingQueue)
+        .options(selectinload(BookcaseItemBorrowingQueue.item))
+        .where(
+            BookcaseItemBorrowingQueue.uid.in_(
+                [queue_position.uid for queue_position in [*expired, *promoted]],
+            ),
+        ),
+    ).all()
+
+    return expired, promoted
@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingHistory,
+    BookcaseItemBorrowingQueue,
+    BookcaseItemBorrowingQueueHistory,
+)
+
+
+class BorrowingRecord(NamedTuple):
+    uid: int
+    username: str
+    item_uid: int
+    start_time: datetime
+    end_time: datetime
+    delivered: datetime | None
+    # Whether the borrowing has been moved to the history table
+    archived: bool
+
+
+class QueuePositionRecord(NamedTuple):
+    uid: int
+    username: str
+    item_uid: int
+    entered_queue_time: datetime
+    item_became_available_time: datetime | None
+    expired: bool
+    # Whether the queue position has been moved to the history table
+    archived: bool
+
+
+def list_borrowing_history(
+    sql_session: Session,
+    item_uid: int | None = None,
+    username: str | None = None,
+    since: datetime | None = None,
+) -> list[BorrowingRecord]:
+    """
+    Lists the borrowings of an item or a user, both the current ones and the archived ones,
+    newest first. Only the borrowings which are still active, or were delivered after `since`,
+    are included, which limits the archived borrowings read to the years after `since`.
+    """
+    current_query = select(
+        BookcaseItemBorrowing.uid,
+        BookcaseItemBorrowing.username,
+        BookcaseItemBorrowing.fk_bookcase_item_uid,
+        BookcaseItemBorrowing.start_time,
+        BookcaseItemBorrowing.end_time,
+        BookcaseItemBorrowing.delivered,
+        literal(False).label("archived"),
+    )
+    archived_query = select(
+        BookcaseItemBorrowingHistory.uid,
+        BookcaseItemBorrowingHistory.username,
+        BookcaseItemBorrowingHistory.fk_bookcase_item_uid,
+        BookcaseItemBorrowingHistory.start_time,
+        BookcaseItemBorrowingHistory.end_time,
+        BookcaseItemBorrowingHistory.delivered,
+        literal(True).label("archived"),
+    )
+
+    if item_uid is not None:
+        current_query = current_query.where(
+            BookcaseItemBorrowing.fk_bookcase_item_uid == item_uid,
+        )
+        archived_query = archived_query.where(
+            BookcaseItemBorrowingHistory.fk_bookcase_item_uid == item_uid,
+        )
+    if username is not None:
+        current_query = current_query.where(BookcaseItemBorrowing.username == username)
+        archived_query = archived_query.where(BookcaseItemBorrowingHistory.username == username)
+    if since is not None:
+        current_query = current_query.where(
+            or_(
+                BookcaseItemBorrowing.delivered.is_(None),
+                BookcaseItemBorrowing.delivered >= since,
+            ),
+        )
+        archived_query = archived_query.where(BookcaseItemBorrowingHistory.delivered >= since)
+
+    history = union_all(current_query, archived_query).subquery()
+    rows = sql_session.execute(
+        select(history).order_by(history.c.start_time.desc(), history.c.uid.desc()),
+    ).all()
+    return [BorrowingRecord(*row) for row in rows]
+
+
+def list_queue_position_history(
+    sql_session: Session,
+    item_uid: int | None = None,
+    username: str | None = None,
+    since: datetime | None = None,
+) -> list[QueuePositionRecord]:
+    """
+    Lists the queue positions of an item or a user, both the current ones and the archived ones,
+    newest first. Only the positions which are still waiting, or where the item became available
+    after `since`, are included, which limits the archived positions read to the years
+    after `since`.
+    """
+    current_query = select(
+        BookcaseItemBorrowingQueue.uid,
+        BookcaseItemBorrowingQueue.username,
+        BookcaseItemBorrowingQueue.fk_bookcase_item_uid,
+        BookcaseItemBorrowingQueue.entered_queue_time,
+        BookcaseItemBorrowingQueue.item_became_available_time,
+        BookcaseItemBorrowingQueue.expired,
+        literal(False).label("archived"),
+    )
+    archived_query = select(
+        BookcaseItemBorrowingQueueHistory.uid,
+        BookcaseItemBorrowingQueueHistory.username,
+        BookcaseItemBorrowingQueueHistory.fk_bookcase_item_uid,
+        BookcaseItemBorrowingQueueHistory.entered_queue_time,
+        BookcaseItemBorrowingQueueHistory.item_became_available_time,
+        BookcaseItemBorrowingQueueHistory.expired,
+        literal(True).label("archived"),
+    )
+
+    if item_uid is not None:
+        current_query = current_query.where(
+            BookcaseItemBorrowingQueue.fk_bookcase_item_uid == item_uid,
+        )
+        archived_query = archived_query.where(
+            BookcaseItemBorrowingQueueHistory.fk_bookcase_item_uid == item_uid,
+        )
+    if username is not None:
+        current_query = current_query.where(BookcaseItemBorrowingQueue.username == username)
+        archived_query = archived_query.where(
+            BookcaseItemBorrowingQueueHistory.username == username,
+        )
+    if since is not None:
+        current_query = current_query.where(
+            or_(
+                BookcaseItemBorrowingQueue.item_became_available_time.is_(None),
+                BookcaseItemBorrowingQueue.item_became_available_time >= since,
+            ),
+        )
+        archived_query = archived_query.where(
+            BookcaseItemBorrowingQueueHistory.item_became_available_time >= since,
+        )
+
+    history = union_all(current_query, archived_query).subquery()
+    rows = sql_session.execute(
+        select(history).order_by(history.c.entered_queue_time.desc(), history.c.uid.desc()),
+    ).all()
+    return [QueuePositionRecord(*row) for row in rows]
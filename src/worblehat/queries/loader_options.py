@@ -0,0 +1,18 @@
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from worblehat.models import BookcaseItem, BookcaseShelf
+
+
+def bookcase_item_details() -> list[LoaderOption]:
+    """
+    Loader options for the relationships shown together with an item, being its
+    authors, media type, language, shelf and bookcase. Loading these takes two statements,
+    no matter the amount of items.
+    """
+    return [
+        selectinload(BookcaseItem.authors),
+        joinedload(BookcaseItem.media_type),
+        joinedload(BookcaseItem.language),
+        joinedload(BookcaseItem.shelf).joinedload(BookcaseShelf.bookcase),
+    ]
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from worblehat.models import OutboxEmail
+
+
+def list_pending_outbox_emails(
+    sql_session: Session,
+    current_datetime: datetime,
+    max_attempts: int,
+    limit: int | None = None,
+) -> list[OutboxEmail]:
+    query = (
+        select(OutboxEmail)
+        .where(
+            OutboxEmail.sent_time.is_(None),
+            OutboxEmail.attempts < max_attempts,
+            OutboxEmail.next_attempt_time <= current_datetime,
+        )
+        .order_by(OutboxEmail.next_attempt_time, OutboxEmail.uid)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return list(sql_session.scalars(query).all())
@@ -0,0 +1,193 @@
+from sqlalchemy import ColumnElement, Select, column, func, literal, select, table, union_all
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Author,
+    Base,
+    BookcaseItem,
+    BookcaseShelf,
+)
+from worblehat.models.search_index import fts_table_name
+from worblehat.models.xref_tables import Item_Author
+
+from .loader_options import bookcase_item_details
+
+# The trigram tokenizer can not match anything shorter than a single trigram
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def _fts_phrase(text: str) -> str:
+    escaped_text = text.replace('"', '""')
+    return f'"{escaped_text}"'
+
+
+def filter_by_search_text(
+    sql_session: Session,
+    query: Select,
+    model: type[Base],
+    column_name: str,
+    text: str,
+) -> tuple[Select, ColumnElement[float]]:
+    """
+    Restricts a query over `model` to rows where the given column contains `text`,
+    case insensitively, using the search index for the current database.
+
+    Returns the filtered query together with a rank expression,
+    where lower values are more relevant matches.
+    """
+    model_column = getattr(model, column_name)
+    dialect_name = sql_session.get_bind().dialect.name
+
+    if dialect_name == "sqlite" and len(text) >= FTS_MIN_QUERY_LENGTH:
+        fts = table(
+            fts_table_name(model.__tablename__),
+            column("rowid"),
+            column("rank"),
+            column(column_name),
+        )
+        query = query.join(fts, fts.c.rowid == model.uid).where(
+            fts.c[column_name].op("MATCH")(_fts_phrase(text)),
+        )
+        return query, fts.c.rank
+
+    query = query.where(model_column.ilike(f"%{text}%"))
+
+    if dialect_name == "postgresql":
+        return query, -func.word_similarity(text, model_column)
+
+    # Without a proper index, shorter matches are considered more relevant
+    return query, func.length(model_column)
+
+
+def _search_bookcase_items_query(
+    sql_session: Session,
+    text: str,
+    limit: int | None,
+) -> Select:
+    candidates: list[Select] = []
+
+    isbn_prefix = text.replace("-", "").strip()
+    if isbn_prefix.isnumeric():
+        candidates.append(
+            select(
+                BookcaseItem.uid.label("item_uid"),
+                literal(0).label("source"),
+                func.length(BookcaseItem.isbn).label("rank"),
+            ).where(BookcaseItem.isbn.like(f"{isbn_prefix}%")),
+        )
+
+    title_query, title_rank = filter_by_search_text(
+        sql_session,
+        select(BookcaseItem.uid.label("item_uid")),
+        BookcaseItem,
+        "name",
+        text,
+    )
+    candidates.append(
+        title_query.add_columns(
+            literal(1).label("source"),
+            title_rank.label("rank"),
+        ),
+    )
+
+    author_query, author_rank = filter_by_search_text(
+        sql_session,
+        select(Item_Author.fk_item_uid.label("item_uid")).join(
+            Author,
+            Author.uid == Item_Author.fk_author_uid,
+        ),
+        Author,
+        "name",
+        text,
+    )
+    candidates.append(
+        author_query.add_columns(
+            literal(2).label("source"),
+            author_rank.label("rank"),
+        ),
+    )
+
+    owner_query, owner_rank = filter_by_search_text(
+        sql_session,
+        select(BookcaseItem.uid.label("item_uid")),
+        BookcaseItem,
+        "owner",
+        text,
+    )
+    candidates.append(
+        owner_query.add_columns(
+            literal(3).label("source"),
+            owner_rank.label("rank"),
+        ),
+    )
+
+    candidates.append(
+        select(
+            BookcaseItem.uid.label("item_uid"),
+            literal(4).label("source"),
+            func.length(BookcaseShelf.description).label("rank"),
+        )
+        .join(BookcaseShelf, BookcaseShelf.uid == BookcaseItem.fk_bookcase_shelf_uid)
+        .where(BookcaseShelf.description.ilike(f"%{text}%")),
+    )
+
+    all_candidates = union_all(*candidates).subquery()
+    positions = select(
+        all_candidates.c.item_uid,
+        all_candidates.c.source,
+        func.row_number()
+        .over(
+            partition_by=all_candidates.c.source,
+            order_by=all_candidates.c.rank,
+        )
+        .label("position"),
+    ).subquery()
+    # The best position of every item, along with the source of that same match
+    ranked_positions = select(
+        positions.c.item_uid,
+        positions.c.position,
+        positions.c.source,
+        func.row_number()
+        .over(
+            partition_by=positions.c.item_uid,
+            order_by=(positions.c.position, positions.c.source),
+        )
+        .label("item_rank"),
+    ).subquery()
+    best_positions = select(ranked_positions).where(ranked_positions.c.item_rank == 1).subquery()
+
+    query = (
+        select(BookcaseItem)
+        .join(best_positions, best_positions.c.item_uid == BookcaseItem.uid)
+        .order_by(best_positions.c.position, best_positions.c.source, BookcaseItem.name)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def search_bookcase_items(
+    sql_session: Session,
+    text: str,
+    limit: int | None = 50,
+) -> list[BookcaseItem]:
+    """
+    Searches for items by ISBN prefix, title, author, owner and shelf description at once.
+
+    The matches from each kind of search are ranked separately, and then merged so that the best
+    match of every kind comes first, then the second best, and so on. Ties are broken in the order
+    listed above. Items matching several ways are only listed once, at their best position.
+    """
+    return list(sql_session.scalars(_search_bookcase_items_query(sql_session, text, limit)).all())
+
+
+def search_bookcase_items_with_details(
+    sql_session: Session,
+    text: str,
+    limit: int | None = 50,
+) -> list[BookcaseItem]:
+    """
+    Like `search_bookcase_items`, but loads the relationships in `bookcase_item_details`.
+    """
+    query = _search_bookcase_items_query(sql_session, text, limit)
+    return list(sql_session.scalars(query.options(*bookcase_item_details())).all())
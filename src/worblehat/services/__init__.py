@@ -1,21 +1,95 @@
-from .argument_parser import (
-    arg_parser,
-    devscripts_arg_parser,
-)
-from .bookcase_item import (
-    create_bookcase_item_from_isbn,
-    is_valid_isbn,
-)
-from .config import Config
-from .email import send_email
-from .seed_test_data import seed_data
+"""
+The services are imported on first use, so that importing a light service like the configuration
+does not also import the book data fetchers, the mail sending and everything else in here.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .archive import (
+        ArchiveReport,
+        archive_history,
+        archive_history_from_config,
+    )
+    from .argument_parser import (
+        arg_parser,
+        devscripts_arg_parser,
+    )
+    from .bookcase_item import (
+        create_bookcase_item_from_isbn,
+        is_valid_isbn,
+    )
+    from .bulk_import import import_bookcase_items
+    from .config import Config
+    from .config_snapshot import (
+        ConfigError,
+        ConfigSnapshot,
+    )
+    from .email import (
+        enqueue_email,
+        send_email,
+        send_outbox_emails,
+    )
+    from .response_cache import (
+        ResponseCache,
+        get_response_cache,
+    )
+    from .seed_test_data import seed_data
+    from .sql_profiler import (
+        SqlProfiler,
+        sql_profiler,
+    )
+
+_SUBMODULES = {
+    "archive_history": ".archive",
+    "archive_history_from_config": ".archive",
+    "ArchiveReport": ".archive",
+    "arg_parser": ".argument_parser",
+    "devscripts_arg_parser": ".argument_parser",
+    "Config": ".config",
+    "ConfigError": ".config_snapshot",
+    "ConfigSnapshot": ".config_snapshot",
+    "create_bookcase_item_from_isbn": ".bookcase_item",
+    "enqueue_email": ".email",
+    "get_response_cache": ".response_cache",
+    "import_bookcase_items": ".bulk_import",
+    "is_valid_isbn": ".bookcase_item",
+    "ResponseCache": ".response_cache",
+    "send_email": ".email",
+    "send_outbox_emails": ".email",
+    "seed_data": ".seed_test_data",
+    "sql_profiler": ".sql_profiler",
+    "SqlProfiler": ".sql_profiler",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_SUBMODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
+    "archive_history",
+    "archive_history_from_config",
+    "ArchiveReport",
     "arg_parser",
     "devscripts_arg_parser",
     "Config",
+    "ConfigError",
+    "ConfigSnapshot",
     "create_bookcase_item_from_isbn",
+    "enqueue_email",
+    "get_response_cache",
+    "import_bookcase_items",
     "is_valid_isbn",
+    "ResponseCache",
     "send_email",
+    "send_outbox_emails",
     "seed_data",
+    "sql_profiler",
+    "SqlProfiler",
 ]
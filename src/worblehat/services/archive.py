@@ -0,0 +1,176 @@
+"""
+Moves closed borrowings and expired queue positions out of the tables used by the daily queries.
+
+Delivered borrowings and expired queue positions are never changed again, but every query over
+the borrowing and queue tables would otherwise have to skip past them for as long as the library
+exists. Once they are older than the configured age, they are moved into history tables, in
+batches of one transaction each. On PostgreSQL, the history tables are partitioned by year.
+
+Neither kind of row counts towards the availability counters of the items, so moving them
+does not change those. Queries which need the full history are in `worblehat.queries.history`.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (
+    ColumnElement,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from worblehat.models import (
+    Base,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingHistory,
+    BookcaseItemBorrowingQueue,
+    BookcaseItemBorrowingQueueHistory,
+)
+from worblehat.models.history_partitions import (
+    HISTORY_PARTITION_COLUMNS,
+    postgresql_yearly_partition_ddl,
+)
+
+from .config import Config
+
+
+@dataclass
+class ArchiveReport:
+    borrowings: int = 0
+    queue_positions: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Archived {self.borrowings} borrowings and {self.queue_positions} queue positions."
+        )
+
+
+def _create_yearly_partitions(
+    sql_session: Session,
+    source_model: type[Base],
+    history_model: type[Base],
+    uids: list[int],
+) -> None:
+    """Creates the partitions for the years of the rows about to be archived, if missing."""
+    table_name = history_model.__tablename__
+    column = getattr(source_model, HISTORY_PARTITION_COLUMNS[table_name])
+    first, last = sql_session.execute(
+        select(func.min(column), func.max(column)).where(source_model.uid.in_(uids)),
+    ).one()
+    for year in range(first.year, last.year + 1):
+        sql_session.execute(text(postgresql_yearly_partition_ddl(table_name, year)))
+
+
+def _archive_rows(
+    sql_session: Session,
+    source_model: type[Base],
+    history_model: type[Base],
+    columns: list[InstrumentedAttribute],
+    condition: ColumnElement[bool],
+    archived_time: datetime,
+    batch_size: int,
+) -> int:
+    """
+    Moves the rows of `source_model` matching `condition` into `history_model`, in batches
+    of `batch_size` rows which are each committed. Returns the amount of rows moved.
+    """
+    is_postgresql = sql_session.get_bind().dialect.name == "postgresql"
+    archived = 0
+    while True:
+        uids = list(
+            sql_session.scalars(
+                select(source_model.uid)
+                .where(condition)
+                .order_by(source_model.uid)
+                .limit(batch_size),
+            ).all(),
+        )
+        if len(uids) == 0:
+            return archived
+
+        if is_postgresql:
+            _create_yearly_partitions(sql_session, source_model, history_model, uids)
+
+        sql_session.execute(
+            insert(history_model).from_select(
+                [column.key for column in columns] + ["archived_time"],
+                select(*columns, literal(archived_time)).where(source_model.uid.in_(uids)),
+            ),
+        )
+        sql_session.execute(
+            delete(source_model)
+            .where(source_model.uid.in_(uids))
+            .execution_options(synchronize_session=False),
+        )
+        sql_session.commit()
+
+        archived += len(uids)
+        logging.info(f"Archived {archived} rows from {source_model.__tablename__}")
+
+
+def archive_history(
+    sql_session: Session,
+    borrowing_cutoff: datetime,
+    queue_position_cutoff: datetime,
+    batch_size: int = 1000,
+) -> ArchiveReport:
+    """
+    Moves borrowings delivered before `borrowing_cutoff`, and expired queue positions whose
+    item became available before `queue_position_cutoff`, into the history tables.
+    """
+    archived_time = datetime.now()
+    report = ArchiveReport()
+
+    report.borrowings = _archive_rows(
+        sql_session,
+        BookcaseItemBorrowing,
+        BookcaseItemBorrowingHistory,
+        [
+            BookcaseItemBorrowing.uid,
+            BookcaseItemBorrowing.username,
+            BookcaseItemBorrowing.start_time,
+            BookcaseItemBorrowing.end_time,
+            BookcaseItemBorrowing.delivered,
+            BookcaseItemBorrowing.fk_bookcase_item_uid,
+        ],
+        BookcaseItemBorrowing.delivered < borrowing_cutoff,
+        archived_time,
+        batch_size,
+    )
+    report.queue_positions = _archive_rows(
+        sql_session,
+        BookcaseItemBorrowingQueue,
+        BookcaseItemBorrowingQueueHistory,
+        [
+            BookcaseItemBorrowingQueue.uid,
+            BookcaseItemBorrowingQueue.username,
+            BookcaseItemBorrowingQueue.entered_queue_time,
+            BookcaseItemBorrowingQueue.item_became_available_time,
+            BookcaseItemBorrowingQueue.expired,
+            BookcaseItemBorrowingQueue.fk_bookcase_item_uid,
+        ],
+        # NOTE: Expired queue positions always have an item_became_available_time
+        BookcaseItemBorrowingQueue.expired.is_(True)
+        & (BookcaseItemBorrowingQueue.item_became_available_time < queue_position_cutoff),
+        archived_time,
+        batch_size,
+    )
+    return report
+
+
+def archive_history_from_config(sql_session: Session) -> ArchiveReport:
+    """Runs `archive_history` with the ages and batch size from the configuration."""
+    config = Config.snapshot().archive
+    now = datetime.now()
+    return archive_history(
+        sql_session,
+        borrowing_cutoff=now - config.borrowing_age,
+        queue_position_cutoff=now - config.queue_position_age,
+        batch_size=config.batch_size,
+    )
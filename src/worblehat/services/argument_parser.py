@@ -15,14 +15,31 @@ arg_parser = ArgumentParser(
 )
 
 subparsers = arg_parser.add_subparsers(dest="command")
-subparsers.add_parser(
+deadline_daemon_arg_parser = subparsers.add_parser(
     "deadline-daemon",
-    help="Initialize a single pass of the daemon which sends deadline emails",
+    help="Initialize a single pass of the daemon which sends deadline emails, and send them",
+)
+deadline_daemon_arg_parser.add_argument(
+    "--resident",
+    action="store_true",
+    help="Keep running, and start a new pass at the interval given in the configuration",
+)
+subparsers.add_parser(
+    "send-mail",
+    help="Send the mails waiting in the outbox, retrying the ones that previously failed",
 )
 subparsers.add_parser(
     "create-db",
     help="Create the database schema in the database specified in the configuration",
 )
+subparsers.add_parser(
+    "rebuild-availability",
+    help="Recompute the availability counters of every item from its borrowings and queue",
+)
+subparsers.add_parser(
+    "archive",
+    help="Move old delivered borrowings and expired queue positions into the history tables",
+)
 subparsers.add_parser(
     "cli",
     help="Start the command line interface",
@@ -36,6 +53,46 @@ subparsers.add_parser(
     help="Start the web interface in production mode",
 )
 
+import_arg_parser = subparsers.add_parser(
+    "import",
+    help="Import bookcase items from .csv or .jsonl inventory files",
+)
+import_arg_parser.add_argument(
+    "files",
+    nargs="+",
+    type=lambda x: _is_valid_file(import_arg_parser, x),
+    help="Inventory files to import",
+    metavar="FILE",
+)
+import_arg_parser.add_argument(
+    "--media-type",
+    default="book",
+    help="Media type of the imported items (default: %(default)s)",
+)
+import_arg_parser.add_argument(
+    "--owner",
+    default="PVV",
+    help="Owner of the imported items (default: %(default)s)",
+)
+import_arg_parser.add_argument(
+    "--workers",
+    type=int,
+    default=8,
+    help="Max amount of concurrent metadata lookups (default: %(default)s)",
+)
+import_arg_parser.add_argument(
+    "--batch-size",
+    type=int,
+    default=100,
+    help="Amount of rows to insert per transaction (default: %(default)s)",
+)
+import_arg_parser.add_argument(
+    "--no-fetch",
+    action="store_false",
+    dest="fetch_metadata",
+    help="Do not look up missing metadata online",
+)
+
 devscripts_arg_parser = subparsers.add_parser(
     "devscripts",
     help="Run development scripts",
@@ -52,6 +109,127 @@ devscripts_subparsers.add_parser(
     help="Seed data tailorded for testing the deadline daemon, into the database",
 )
 
+simulate_deadline_daemon_arg_parser = devscripts_subparsers.add_parser(
+    "simulate-deadline-daemon",
+    help="Simulate months of library activity, and measure the deadline daemon runs",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--database",
+    dest="database_url",
+    help="Empty database to run the simulation in (default: a temporary SQLite database)",
+    metavar="URL",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--days",
+    type=float,
+    default=90,
+    help="Amount of days to simulate (default: %(default)s)",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--interval-hours",
+    type=float,
+    default=1,
+    help="Simulated time between the deadline daemon runs (default: %(default)s)",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--items",
+    type=int,
+    default=5_000,
+    help="Amount of items in the library (default: %(default)s)",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--users",
+    type=int,
+    default=500,
+    help="Amount of users borrowing items (default: %(default)s)",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--borrowings-per-day",
+    type=float,
+    default=50,
+    help="Average amount of borrowing attempts per day (default: %(default)s)",
+)
+simulate_deadline_daemon_arg_parser.add_argument(
+    "--output",
+    type=Path,
+    help="File to write the results to, as JSON",
+    metavar="FILE",
+)
+
+devscripts_subparsers.add_parser(
+    "seed-large-library",
+    help="Seed a large, synthetic library into an empty database, for benchmarking",
+)
+
+benchmark_queries_arg_parser = devscripts_subparsers.add_parser(
+    "benchmark-queries",
+    help="Time the database queries against a large, synthetic library",
+)
+benchmark_queries_arg_parser.add_argument(
+    "--database",
+    action="append",
+    dest="database_urls",
+    help=(
+        "Database url to benchmark, which should be empty or contain a library from an earlier "
+        "run. Can be given several times (default: a temporary SQLite database)"
+    ),
+    metavar="URL",
+)
+benchmark_queries_arg_parser.add_argument(
+    "--scale",
+    type=float,
+    default=1.0,
+    help="Size of the library, relative to 100k items and 1M borrowings (default: %(default)s)",
+)
+benchmark_queries_arg_parser.add_argument(
+    "--repeat",
+    type=int,
+    default=5,
+    help="Amount of timed calls per query (default: %(default)s)",
+)
+benchmark_queries_arg_parser.add_argument(
+    "--output",
+    type=Path,
+    default=Path("query-benchmark.json"),
+    help="File to write the results to (default: %(default)s)",
+    metavar="FILE",
+)
+benchmark_queries_arg_parser.add_argument(
+    "--baseline",
+    type=lambda x: _is_valid_file(benchmark_queries_arg_parser, x),
+    help="Results from an earlier run, to compare against",
+    metavar="FILE",
+)
+benchmark_queries_arg_parser.add_argument(
+    "--tolerance",
+    type=float,
+    default=1.5,
+    help="How many times slower than the baseline a query may be (default: %(default)s)",
+)
+
+benchmark_startup_arg_parser = devscripts_subparsers.add_parser(
+    "benchmark-startup",
+    help="Time the imports of each subcommand against its budget",
+)
+benchmark_startup_arg_parser.add_argument(
+    "--repeat",
+    type=int,
+    default=5,
+    help="Amount of fresh interpreters to time per subcommand (default: %(default)s)",
+)
+benchmark_startup_arg_parser.add_argument(
+    "--output",
+    type=Path,
+    help="File to write the results to, as JSON",
+    metavar="FILE",
+)
+benchmark_startup_arg_parser.add_argument(
+    "--budget-scale",
+    type=float,
+    default=1.0,
+    help="Multiplier for the budgets, for slower machines (default: %(default)s)",
+)
+
 arg_parser.add_argument(
     "-V",
     "--version",
@@ -2,8 +2,6 @@ import isbnlib
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from worblehat.book_data_fetchers import fetch_book_data_from_multiple_sources
-
 from ..models import (
     Author,
     BookcaseItem,
@@ -42,7 +40,11 @@ def create_bookcase_item_from_isbn(
     Please not that the returned BookcaseItem will likely not be fully populated with the required
     data, such as the book's location in the library, and the owner of the book, etc.
     """
-    metadata = fetch_book_data_from_multiple_sources(isbn)
+    # NOTE: imported here, so that starting the CLI does not wait for the fetchers and their
+    #       HTTP and HTML parsing libraries until a book is actually looked up
+    from worblehat.book_data_fetchers import fetch_book_data_from_multiple_sources
+
+    metadata = fetch_book_data_from_multiple_sources(isbn, first_good=True)
     if len(metadata) == 0:
         return None
 
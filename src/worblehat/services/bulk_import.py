@@ -0,0 +1,326 @@
+"""
+Bulk import of bookcase items from inventory files, such as the ones found in `data/`.
+
+Two formats are supported:
+
+- `.csv` files with the header `isbn,note,bookcase,shelf`
+- `.jsonl` files where each line is an object with the keys `isbn`, `bookcase` and `shelf`,
+  and optionally `note`, `title`, `authors` and `languages`.
+
+The rows are streamed from the files and processed in batches. For each batch, the metadata
+of rows that do not provide a title is fetched concurrently, after which all items of the batch
+are inserted in a single transaction.
+
+Shelves are written either as `column-row`, or as a single number which is interpreted as
+the row of the first column, since most of our cases only have a single column.
+"""
+
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import batched
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from worblehat.book_data_fetchers import fetch_book_data_from_multiple_sources
+from worblehat.book_data_fetchers.BookData import BookData
+
+from ..models import (
+    Author,
+    BookcaseItem,
+    BookcaseShelf,
+    Language,
+    MediaType,
+)
+from ..queries import (
+    find_bookcase_by_name,
+    find_bookcase_shelf,
+    find_media_type_by_name,
+    list_authors_by_names,
+    list_bookcase_items_by_isbns,
+)
+from .bookcase_item import is_valid_isbn
+
+
+@dataclass
+class ImportRow:
+    """
+    A single line of an inventory file. Each row represents one copy of an item.
+    """
+
+    source: str
+    isbn: str
+    bookcase: str
+    shelf: str
+    note: str | None = None
+    title: str | None = None
+    authors: set[str] = field(default_factory=set)
+    language: str | None = None
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    extra_copies: int = 0
+    already_existing: list[str] = field(default_factory=list)
+    without_metadata: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [
+            f"Created {self.created} items, and added {self.extra_copies} extra copies.",
+        ]
+        if len(self.already_existing) > 0:
+            lines.append(
+                f"Skipped {len(self.already_existing)} items that already exist in the database: "
+                + ", ".join(self.already_existing),
+            )
+        if len(self.without_metadata) > 0:
+            lines.append(
+                f"Could not find metadata for {len(self.without_metadata)} items, "
+                "their notes were used as names: " + ", ".join(self.without_metadata),
+            )
+        if len(self.errors) > 0:
+            lines.append(f"{len(self.errors)} rows could not be imported:")
+            lines.extend(f"  {error}" for error in self.errors)
+        return "\n".join(lines)
+
+
+def _normalize_isbn(isbn: str) -> str:
+    return isbn.replace("-", "").replace(" ", "").strip()
+
+
+def _read_csv_rows(path: Path) -> Iterator[ImportRow]:
+    with path.open(newline="") as csv_file:
+        for line_number, row in enumerate(csv.DictReader(csv_file), start=2):
+            yield ImportRow(
+                source=f"{path.name}:{line_number}",
+                isbn=_normalize_isbn(row["isbn"]),
+                bookcase=row["bookcase"],
+                shelf=row["shelf"],
+                note=row.get("note") or None,
+            )
+
+
+def _read_jsonl_rows(path: Path) -> Iterator[ImportRow]:
+    with path.open() as jsonl_file:
+        for line_number, line in enumerate(jsonl_file, start=1):
+            if line.strip() == "":
+                continue
+            row = json.loads(line)
+            languages = row.get("languages") or []
+            yield ImportRow(
+                source=f"{path.name}:{line_number}",
+                isbn=_normalize_isbn(str(row["isbn"])),
+                bookcase=row["bookcase"],
+                shelf=str(row["shelf"]),
+                note=row.get("note") or None,
+                title=row.get("title") or None,
+                authors={a.strip() for a in row.get("authors") or [] if a.strip() != ""},
+                language=languages[0] if len(languages) > 0 else None,
+            )
+
+
+def read_import_rows(paths: Iterable[Path]) -> Iterator[ImportRow]:
+    """
+    Lazily reads the rows of all the given inventory files, in order.
+    """
+    for path in paths:
+        if path.suffix == ".csv":
+            yield from _read_csv_rows(path)
+        elif path.suffix == ".jsonl":
+            yield from _read_jsonl_rows(path)
+        else:
+            raise ValueError(f"Unsupported file type: {path}")
+
+
+def _parse_shelf_position(shelf: str) -> tuple[int, int]:
+    """
+    Returns the (column, row) of a shelf written as either `column-row` or `row`.
+    """
+    if "-" in shelf:
+        column, row = shelf.split("-", 1)
+        return int(column), int(row)
+    return 0, int(shelf)
+
+
+class BulkImporter:
+    def __init__(
+        self,
+        sql_session: Session,
+        media_type: MediaType,
+        owner: str = "PVV",
+        workers: int = 8,
+        batch_size: int = 100,
+        fetch_metadata: bool = True,
+    ) -> None:
+        self.sql_session = sql_session
+        self.media_type = media_type
+        self.owner = owner
+        self.workers = workers
+        self.batch_size = batch_size
+        self.fetch_metadata = fetch_metadata
+
+        self.report = ImportReport()
+
+        self._shelfs: dict[tuple[str, str], BookcaseShelf | None] = {}
+        self._languages: dict[str, Language] = {}
+        for language in sql_session.scalars(select(Language)):
+            self._languages[language.iso639_1_code.lower()] = language
+            self._languages[language.name.lower()] = language
+
+        # ISBNs of items created by this import, used to tell extra copies
+        # apart from items which were already in the database.
+        self._imported_isbns: set[str] = set()
+
+    def _resolve_shelf(self, row: ImportRow) -> BookcaseShelf | None:
+        key = (row.bookcase, row.shelf)
+        if key not in self._shelfs:
+            bookcase = find_bookcase_by_name(self.sql_session, row.bookcase)
+            shelf = None
+            if bookcase is not None:
+                column, shelf_row = _parse_shelf_position(row.shelf)
+                shelf = find_bookcase_shelf(self.sql_session, bookcase, column, shelf_row)
+            self._shelfs[key] = shelf
+        return self._shelfs[key]
+
+    def _fetch_missing_metadata(self, rows: list[ImportRow]) -> None:
+        """
+        Fills in the metadata of the rows that did not provide any,
+        by querying the online sources concurrently.
+        """
+        isbns = list({row.isbn for row in rows if row.title is None})
+        if not self.fetch_metadata or len(isbns) == 0:
+            return
+
+        def fetch(isbn: str) -> tuple[str, list[BookData]]:
+            try:
+                return isbn, fetch_book_data_from_multiple_sources(isbn, first_good=True)
+            except ValueError:
+                return isbn, []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            metadata = {isbn: data for isbn, data in executor.map(fetch, isbns) if len(data) > 0}
+
+        for row in rows:
+            if row.title is not None or row.isbn not in metadata:
+                continue
+            book_data = metadata[row.isbn][0]
+            row.title = book_data.title
+            row.authors = set(book_data.authors)
+            row.language = book_data.language
+
+    def _resolve_authors(self, rows: list[ImportRow]) -> dict[str, Author]:
+        names = list({name for row in rows for name in row.authors})
+        authors = {author.name: author for author in list_authors_by_names(self.sql_session, names)}
+        for name in names:
+            if name not in authors:
+                authors[name] = Author(name)
+        return authors
+
+    def _import_batch(self, rows: list[ImportRow]) -> None:
+        valid_rows = []
+        for row in rows:
+            if not is_valid_isbn(row.isbn):
+                self.report.errors.append(f"{row.source}: invalid ISBN '{row.isbn}'")
+                continue
+            try:
+                shelf = self._resolve_shelf(row)
+            except ValueError:
+                self.report.errors.append(f"{row.source}: invalid shelf '{row.shelf}'")
+                continue
+            if shelf is None:
+                self.report.errors.append(
+                    f"{row.source}: no shelf '{row.shelf}' in bookcase '{row.bookcase}'",
+                )
+                continue
+            valid_rows.append((row, shelf))
+
+        existing_items = {
+            item.isbn: item
+            for item in list_bookcase_items_by_isbns(
+                self.sql_session,
+                [row.isbn for row, _ in valid_rows],
+            )
+        }
+
+        new_rows = [
+            (row, shelf)
+            for row, shelf in valid_rows
+            if row.isbn not in existing_items or row.isbn in self._imported_isbns
+        ]
+        self._fetch_missing_metadata([row for row, _ in new_rows])
+        authors = self._resolve_authors([row for row, _ in new_rows])
+
+        for row, shelf in valid_rows:
+            if row.isbn in existing_items:
+                if row.isbn in self._imported_isbns:
+                    existing_items[row.isbn].amount += 1
+                    self.report.extra_copies += 1
+                elif row.isbn not in self.report.already_existing:
+                    self.report.already_existing.append(row.isbn)
+                continue
+
+            name = row.title
+            if name is None:
+                if row.note is None:
+                    self.report.errors.append(
+                        f"{row.source}: could not find metadata for ISBN '{row.isbn}'",
+                    )
+                    continue
+                name = row.note
+                self.report.without_metadata.append(row.isbn)
+
+            item = BookcaseItem(name=name, isbn=row.isbn, owner=self.owner)
+            item.amount = 1
+            item.media_type = self.media_type
+            item.shelf = shelf
+            item.authors = {authors[author] for author in row.authors}
+            if row.language is not None:
+                item.language = self._languages.get(row.language.lower())
+
+            self.sql_session.add(item)
+            existing_items[row.isbn] = item
+            self._imported_isbns.add(row.isbn)
+            self.report.created += 1
+
+        self.sql_session.commit()
+
+    def run(self, rows: Iterable[ImportRow]) -> ImportReport:
+        for batch in batched(rows, self.batch_size):
+            self._import_batch(list(batch))
+            print(
+                f"Imported {self.report.created + self.report.extra_copies} copies so far...",
+            )
+        return self.report
+
+
+def import_bookcase_items(
+    sql_session: Session,
+    paths: list[Path],
+    media_type_name: str = "book",
+    owner: str = "PVV",
+    workers: int = 8,
+    batch_size: int = 100,
+    fetch_metadata: bool = True,
+) -> ImportReport:
+    """
+    Imports all items listed in the given inventory files.
+
+    The bookcases and shelves referred to by the files must already exist.
+    Items which already exist in the database are left untouched, while repeated
+    ISBNs within the imported files are counted as extra copies of the same item.
+    """
+    importer = BulkImporter(
+        sql_session,
+        media_type=find_media_type_by_name(sql_session, media_type_name),
+        owner=owner,
+        workers=workers,
+        batch_size=batch_size,
+        fetch_metadata=fetch_metadata,
+    )
+    return importer.run(read_import_rows(paths))
@@ -3,6 +3,8 @@ from pathlib import Path
 from pprint import pformat
 from typing import Any
 
+from .config_snapshot import ConfigError, ConfigSnapshot, read_secret
+
 
 class Config:
     """
@@ -12,11 +14,13 @@ class Config:
     of calling `vars(arg_parser.parse_args())` where `arg_parser` is the
     argument parser from `worblehat/services/argument_parser.py`.
 
-    The class also provides some utility functions for accessing several
-    kinds of values that depend on the configuration.
+    The configuration is validated when it is loaded, and is available as a typed and
+    immutable `ConfigSnapshot` through `Config.snapshot()`. Prefer the snapshot over
+    looking up raw values by their dotted names, e.g. `Config["smtp.host"]`.
     """
 
     _config = None
+    _snapshot: ConfigSnapshot | None = None
     _expected_config_file_locations = [
         Path("./config.toml"),
         Path("~/.config/worblehat/config.toml"),
@@ -36,13 +40,17 @@ class Config:
                 raise AttributeError(f"No such attribute: {name}")
         return __config
 
+    @classmethod
+    def snapshot(cls) -> ConfigSnapshot:
+        if cls._snapshot is None:
+            raise RuntimeError(
+                "Configuration not loaded, call Config.load_configuration() first.",
+            )
+        return cls._snapshot
+
     @staticmethod
     def read_password(password_field: str) -> str:
-        if Path(password_field).is_file():
-            with Path(password_field).open() as f:
-                return f.read().strip()
-        else:
-            return password_field
+        return read_secret(password_field)
 
     @classmethod
     def _locate_configuration_file(cls) -> Path | None:
@@ -68,49 +76,24 @@ class Config:
 
     @classmethod
     def db_string(cls) -> str:
-        db_type = cls._config.get("database").get("type")
-
-        if db_type == "sqlite":
-            path = Path(cls._config.get("database").get("sqlite").get("path"))
-            return f"sqlite:///{path.absolute()}"
-
-        if db_type == "postgresql":
-            db_config = cls._config.get("database").get("postgresql")
-            host = db_config.get("host")
-            port = db_config.get("port")
-            username = db_config.get("username")
-            password = cls.read_password(db_config.get("password"))
-            database = db_config.get("database")
-            if host.startswith("/"):
-                return f"postgresql+psycopg2://{username}:{password}@/{database}?host={host}"
-            return f"postgresql+psycopg2://{username}:{password}@{host}:{port}/{database}"
-        print(f"Error: unknown database type '{db_config.get('type')}'")
-        exit(1)
+        return cls.snapshot().database.url
 
     @classmethod
     def db_string_no_password(cls) -> str:
-        db_type = cls._config.get("database").get("type")
-
-        if db_type == "sqlite":
-            path = Path(cls._config.get("database").get("sqlite").get("path"))
-            return f"sqlite:///{path.absolute()}"
-
-        if db_type == "postgresql":
-            db_config = cls._config.get("database").get("postgresql")
-            host = db_config.get("host")
-            port = db_config.get("port")
-            username = db_config.get("username")
-            database = db_config.get("database")
-            if host.startswith("/"):
-                return f"postgresql+psycopg2://{username}:<password>@/{database}?host={host}"
-            return f"postgresql+psycopg2://{username}:<password>@{host}:{port}/{database}"
-        print(f"Error: unknown database type '{db_config.get('type')}'")
-        exit(1)
+        return cls.snapshot().database.url_no_password
 
     @classmethod
     def debug(cls) -> str:
         return pformat(cls._config)
 
     @classmethod
-    def load_configuration(cls, args: dict[str, any]) -> dict[str, any]:
-        cls._config = cls._load_configuration_from_file(args.get("config_file"))
+    def load_configuration(cls, args: dict[str, any]) -> ConfigSnapshot:
+        """
+        Loads and validates the configuration file. Raises a `ConfigError` if it is invalid,
+        in which case the previously loaded configuration, if any, is kept.
+        """
+        config = cls._load_configuration_from_file(args.get("config_file"))
+        snapshot = ConfigSnapshot.from_dict(config)
+        cls._config, cls._snapshot = config, snapshot
+        return snapshot
+
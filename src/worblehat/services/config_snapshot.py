@@ -0,0 +1,445 @@
+"""
+A typed and validated copy of the configuration file, which is built once when it is loaded.
+
+Every value is checked and converted up front, and secrets given as file paths are read,
+so that a broken configuration fails at startup rather than in the middle of a run,
+and so that reading the configuration later on is just an attribute lookup.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Self
+
+
+class ConfigError(Exception):
+    """
+    Raised when the configuration is missing values, or has values which are invalid.
+    The message lists every problem found.
+    """
+
+
+def read_secret(value: str) -> str:
+    """
+    Returns the contents of the file at `value` if there is one, or else `value` itself.
+    """
+    path = Path(value).expanduser()
+    if path.is_file():
+        return path.read_text().strip()
+    return value
+
+
+class _ConfigReader:
+    """
+    Reads typed values from the raw configuration by their dotted names,
+    collecting every problem instead of stopping at the first one.
+
+    Values which have a `default` may be left out, so that configuration files written
+    before they were introduced keep working. All other values are required.
+    """
+
+    def __init__(self, raw: Mapping[str, Any]) -> None:
+        self.raw = raw
+        self.errors: list[str] = []
+
+    def _get(self, name: str, default: object = None) -> object:
+        value = self.raw
+        for attr in name.split("."):
+            if not isinstance(value, Mapping) or attr not in value:
+                if default is None:
+                    self.errors.append(f"'{name}' is missing")
+                return default
+            value = value[attr]
+        return value
+
+    def _check_minimum(self, name: str, value: float, minimum: float | None) -> None:
+        if minimum is not None and value < minimum:
+            self.errors.append(f"'{name}' must be at least {minimum}, not {value}")
+
+    def boolean(self, name: str, default: bool | None = None) -> bool:
+        value = self._get(name, default)
+        if value is not None and not isinstance(value, bool):
+            self.errors.append(f"'{name}' must be true or false, not {value!r}")
+            return False
+        return bool(value)
+
+    def integer(
+        self,
+        name: str,
+        minimum: int | None = None,
+        default: int | None = None,
+    ) -> int:
+        value = self._get(name, default)
+        if value is None:
+            return 0
+        if isinstance(value, bool) or not isinstance(value, int):
+            self.errors.append(f"'{name}' must be an integer, not {value!r}")
+            return 0
+        self._check_minimum(name, value, minimum)
+        return value
+
+    def number(
+        self,
+        name: str,
+        minimum: float | None = None,
+        default: float | None = None,
+    ) -> float:
+        value = self._get(name, default)
+        if value is None:
+            return 0.0
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            self.errors.append(f"'{name}' must be a number, not {value!r}")
+            return 0.0
+        self._check_minimum(name, value, minimum)
+        return float(value)
+
+    def integers(self, name: str, minimum: int | None = None) -> tuple[int, ...]:
+        value = self._get(name)
+        if value is None:
+            return ()
+        if not isinstance(value, list) or any(
+            isinstance(v, bool) or not isinstance(v, int) for v in value
+        ):
+            self.errors.append(f"'{name}' must be a list of integers, not {value!r}")
+            return ()
+        for v in value:
+            self._check_minimum(name, v, minimum)
+        return tuple(value)
+
+    def string(
+        self,
+        name: str,
+        choices: tuple[str, ...] | None = None,
+        default: str | None = None,
+    ) -> str:
+        value = self._get(name, default)
+        if value is None:
+            return ""
+        if not isinstance(value, str):
+            self.errors.append(f"'{name}' must be a string, not {value!r}")
+            return ""
+        if choices is not None and value not in choices:
+            self.errors.append(f"'{name}' must be one of {', '.join(choices)}, not '{value}'")
+        return value
+
+    def path(self, name: str, default: str | None = None) -> Path | None:
+        """Reads a path, where an empty string means no path."""
+        value = self.string(name, default=default)
+        return Path(value).expanduser() if value else None
+
+    def secret(self, name: str) -> str:
+        """Reads a secret, which is either given as plain text or as a path to a file holding it."""
+        value = self.string(name)
+        try:
+            return read_secret(value)
+        except OSError as err:
+            self.errors.append(f"Could not read '{name}' from '{value}': {err}")
+            return ""
+
+    def table(self, name: str) -> Mapping[str, Any]:
+        value = self._get(name)
+        if value is not None and not isinstance(value, Mapping):
+            self.errors.append(f"'{name}' must be a table, not {value!r}")
+            return {}
+        return value or {}
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingConfig:
+    debug: bool
+    debug_sql: bool
+    profile_sql: bool
+    profile_sql_file: Path | None
+
+
+@dataclass(frozen=True, slots=True)
+class DatabasePoolConfig:
+    size: int
+    max_overflow: int
+    pre_ping: bool
+    recycle_seconds: int
+
+    def engine_options(self) -> dict[str, Any]:
+        """The pool settings, as keyword arguments for `create_engine`."""
+        return {
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_pre_ping": self.pre_ping,
+            "pool_recycle": self.recycle_seconds,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class DatabaseConfig:
+    type: str
+    url: str
+    url_no_password: str
+    pool: DatabasePoolConfig
+
+
+@dataclass(frozen=True, slots=True)
+class WebServerConfig:
+    bind: str
+    workers: int
+    threads: int
+    timeout_seconds: int
+    graceful_timeout_seconds: int
+    max_requests: int
+
+
+@dataclass(frozen=True, slots=True)
+class SmtpConfig:
+    enabled: bool
+    host: str
+    port: int
+    username: str
+    # Only resolved if sending mail is enabled
+    password: str
+    sender: str
+    subject_prefix: str
+    max_attempts: int
+    retry_backoff: timedelta
+
+
+@dataclass(frozen=True, slots=True)
+class DeadlineDaemonConfig:
+    enabled: bool
+    dryrun: bool
+    warn_days_before_borrowing_deadline: tuple[int, ...]
+    days_before_queue_position_expires: int
+    warn_days_before_expiring_queue_position_deadline: tuple[int, ...]
+    commit_batch_size: int
+    interval_seconds: float
+    jitter_seconds: float
+    lock_file: Path
+
+
+@dataclass(frozen=True, slots=True)
+class BookDataCacheConfig:
+    enabled: bool
+    path: Path
+    ttl: timedelta
+    negative_ttl: timedelta
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseCacheConfig:
+    enabled: bool
+    max_entries: int
+    path: Path | None
+    ttl_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveConfig:
+    enabled: bool
+    borrowing_age: timedelta
+    queue_position_age: timedelta
+    batch_size: int
+
+
+@dataclass(frozen=True, slots=True)
+class GeneralConfig:
+    quit_allowed: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    logging: LoggingConfig
+    database: DatabaseConfig
+    # Passed on to Flask as is, except for SECRET_KEY which has been resolved
+    flask: Mapping[str, Any]
+    web_server: WebServerConfig
+    smtp: SmtpConfig
+    deadline_daemon: DeadlineDaemonConfig
+    book_data_cache: BookDataCacheConfig
+    response_cache: ResponseCacheConfig
+    archive: ArchiveConfig
+    general: GeneralConfig
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> Self:
+        """
+        Validates the raw configuration, as read from the configuration file.
+        Raises a `ConfigError` listing every problem if it is invalid.
+        """
+        reader = _ConfigReader(raw)
+
+        snapshot = cls(
+            logging=LoggingConfig(
+                debug=reader.boolean("logging.debug"),
+                debug_sql=reader.boolean("logging.debug_sql"),
+                profile_sql=reader.boolean("logging.profile_sql", default=False),
+                profile_sql_file=reader.path("logging.profile_sql_file", default=""),
+            ),
+            database=_read_database_config(reader),
+            flask=MappingProxyType(
+                {
+                    **reader.table("flask"),
+                    "SECRET_KEY": reader.secret("flask.SECRET_KEY"),
+                },
+            ),
+            web_server=WebServerConfig(
+                bind=reader.string("web_server.bind", default="127.0.0.1:5000"),
+                workers=reader.integer("web_server.workers", minimum=0, default=0),
+                threads=reader.integer("web_server.threads", minimum=1, default=4),
+                timeout_seconds=reader.integer(
+                    "web_server.timeout_seconds",
+                    minimum=1,
+                    default=60,
+                ),
+                graceful_timeout_seconds=reader.integer(
+                    "web_server.graceful_timeout_seconds",
+                    minimum=0,
+                    default=30,
+                ),
+                max_requests=reader.integer("web_server.max_requests", minimum=0, default=1000),
+            ),
+            smtp=_read_smtp_config(reader),
+            deadline_daemon=DeadlineDaemonConfig(
+                enabled=reader.boolean("deadline_daemon.enabled"),
+                dryrun=reader.boolean("deadline_daemon.dryrun"),
+                warn_days_before_borrowing_deadline=reader.integers(
+                    "deadline_daemon.warn_days_before_borrowing_deadline",
+                    minimum=0,
+                ),
+                days_before_queue_position_expires=reader.integer(
+                    "deadline_daemon.days_before_queue_position_expires",
+                    minimum=1,
+                ),
+                warn_days_before_expiring_queue_position_deadline=reader.integers(
+                    "deadline_daemon.warn_days_before_expiring_queue_position_deadline",
+                    minimum=0,
+                ),
+                commit_batch_size=reader.integer(
+                    "deadline_daemon.commit_batch_size",
+                    minimum=0,
+                    default=500,
+                ),
+                interval_seconds=reader.number(
+                    "deadline_daemon.interval_seconds",
+                    minimum=1,
+                    default=300,
+                ),
+                jitter_seconds=reader.number(
+                    "deadline_daemon.jitter_seconds",
+                    minimum=0,
+                    default=30,
+                ),
+                lock_file=reader.path(
+                    "deadline_daemon.lock_file",
+                    default="./deadline-daemon.lock",
+                )
+                or Path(),
+            ),
+            book_data_cache=BookDataCacheConfig(
+                enabled=reader.boolean("book_data_cache.enabled", default=True),
+                path=reader.path(
+                    "book_data_cache.path",
+                    default="~/.cache/worblehat/book_data_cache.sqlite",
+                )
+                or Path(),
+                ttl=timedelta(
+                    days=reader.integer("book_data_cache.ttl_days", minimum=0, default=30),
+                ),
+                negative_ttl=timedelta(
+                    hours=reader.integer(
+                        "book_data_cache.negative_ttl_hours",
+                        minimum=0,
+                        default=12,
+                    ),
+                ),
+            ),
+            response_cache=ResponseCacheConfig(
+                enabled=reader.boolean("response_cache.enabled", default=True),
+                max_entries=reader.integer(
+                    "response_cache.max_entries",
+                    minimum=1,
+                    default=1000,
+                ),
+                path=reader.path(
+                    "response_cache.path",
+                    default="~/.cache/worblehat/response_cache.sqlite",
+                ),
+                ttl_seconds=reader.number("response_cache.ttl_seconds", minimum=0, default=300),
+            ),
+            archive=ArchiveConfig(
+                enabled=reader.boolean("archive.enabled", default=False),
+                borrowing_age=timedelta(
+                    days=reader.integer("archive.borrowing_age_days", minimum=0, default=365),
+                ),
+                queue_position_age=timedelta(
+                    days=reader.integer("archive.queue_position_age_days", minimum=0, default=90),
+                ),
+                batch_size=reader.integer("archive.batch_size", minimum=1, default=1000),
+            ),
+            general=GeneralConfig(
+                quit_allowed=reader.boolean("general.quit_allowed"),
+            ),
+        )
+
+        if len(reader.errors) > 0:
+            raise ConfigError(
+                "Invalid configuration:\n" + "\n".join(f"  - {error}" for error in reader.errors),
+            )
+        return snapshot
+
+
+def _read_database_config(reader: _ConfigReader) -> DatabaseConfig:
+    db_type = reader.string("database.type", choices=("sqlite", "postgresql"))
+
+    url = url_no_password = ""
+    if db_type == "sqlite":
+        path = Path(reader.string("database.sqlite.path"))
+        url = url_no_password = f"sqlite:///{path.absolute()}"
+    elif db_type == "postgresql":
+        host = reader.string("database.postgresql.host")
+        port = reader.integer("database.postgresql.port", minimum=1)
+        username = reader.string("database.postgresql.username")
+        password = reader.secret("database.postgresql.password")
+        database = reader.string("database.postgresql.database")
+        if host.startswith("/"):
+            url = f"postgresql+psycopg2://{username}:{password}@/{database}?host={host}"
+            url_no_password = (
+                f"postgresql+psycopg2://{username}:<password>@/{database}?host={host}"
+            )
+        else:
+            url = f"postgresql+psycopg2://{username}:{password}@{host}:{port}/{database}"
+            url_no_password = (
+                f"postgresql+psycopg2://{username}:<password>@{host}:{port}/{database}"
+            )
+
+    return DatabaseConfig(
+        type=db_type,
+        url=url,
+        url_no_password=url_no_password,
+        pool=DatabasePoolConfig(
+            size=reader.integer("database.pool.size", minimum=1, default=5),
+            max_overflow=reader.integer("database.pool.max_overflow", minimum=0, default=5),
+            pre_ping=reader.boolean("database.pool.pre_ping", default=True),
+            recycle_seconds=reader.integer(
+                "database.pool.recycle_seconds",
+                minimum=-1,
+                default=1800,
+            ),
+        ),
+    )
+
+
+def _read_smtp_config(reader: _ConfigReader) -> SmtpConfig:
+    enabled = reader.boolean("smtp.enabled")
+    return SmtpConfig(
+        enabled=enabled,
+        host=reader.string("smtp.host"),
+        port=reader.integer("smtp.port", minimum=1),
+        username=reader.string("smtp.username"),
+        password=reader.secret("smtp.password") if enabled else "",
+        sender=reader.string("smtp.from"),
+        subject_prefix=reader.string("smtp.subject_prefix"),
+        max_attempts=reader.integer("smtp.max_attempts", minimum=1, default=6),
+        retry_backoff=timedelta(
+            seconds=reader.number("smtp.retry_backoff_seconds", minimum=0, default=60),
+        ),
+    )
@@ -1,33 +1,267 @@
+import contextlib
+import logging
 import smtplib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from textwrap import indent
+from types import TracebackType
+from typing import Self
 
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..models import OutboxEmail
+from ..queries import list_pending_outbox_emails
 from .config import Config
 
+# Errors which are caused by the message itself, and which would not be fixed by reconnecting
+_MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+class SmtpTransport:
+    """
+    Sends mails over a single authenticated SMTP connection.
+
+    The connection is opened when the first mail is sent, and kept open until `close()` is called,
+    so that sending many mails only costs a single STARTTLS handshake and login. If the connection
+    is lost along the way, it is reopened and the mail is retried.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        sender: str,
+        timeout_seconds: float = 30,
+        max_attempts: int = 2,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+
+        self._server: smtplib.SMTP | None = None
+
+    @classmethod
+    def from_config(cls) -> Self:
+        smtp = Config.snapshot().smtp
+        return cls(
+            host=smtp.host,
+            port=smtp.port,
+            username=smtp.username,
+            password=smtp.password,
+            sender=smtp.sender,
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        logging.info(f"Connecting to SMTP server {self.host}:{self.port}")
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _disconnect(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def close(self) -> None:
+        if self._server is not None:
+            with contextlib.suppress(smtplib.SMTPException, OSError):
+                self._server.quit()
+            self._disconnect()
+
+    def send(self, msg: MIMEMultipart) -> bool:
+        """
+        Sends a single mail, and returns whether it was accepted by the server.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if self._server is None:
+                    self._server = self._connect()
+                self._server.sendmail(self.sender, msg["To"], msg.as_string())
+                return True
+            except _MESSAGE_ERRORS as err:
+                logging.error(f"SMTP server refused mail to {msg['To']}: {err}")
+                return False
+            except (smtplib.SMTPException, OSError) as err:
+                logging.warning(
+                    f"Could not send mail to {msg['To']} (attempt {attempt}/{self.max_attempts}): "
+                    f"{err}",
+                )
+                self._disconnect()
+        return False
 
-def send_email(to: str, subject: str, body: str) -> None:
+
+def build_email(to: str, subject: str, body: str) -> MIMEMultipart:
+    smtp = Config.snapshot().smtp
     msg = MIMEMultipart()
-    msg["From"] = Config["smtp.from"]
+    msg["From"] = smtp.sender
     msg["To"] = to
-    if Config["smtp.subject_prefix"]:
-        msg["Subject"] = f"{Config['smtp.subject_prefix']} {subject}"
+    if smtp.subject_prefix:
+        msg["Subject"] = f"{smtp.subject_prefix} {subject}"
     else:
         msg["Subject"] = subject
     msg.attach(MIMEText(body, "plain"))
+    return msg
 
-    if Config["smtp.enabled"] and not Config["deadline_daemon.dryrun"]:
-        try:
-            with smtplib.SMTP(Config["smtp.host"], Config["smtp.port"]) as server:
-                server.starttls()
-                server.login(
-                    Config["smtp.username"],
-                    Config.read_password(Config["smtp.password"]),
-                )
-                server.sendmail(Config["smtp.from"], to, msg.as_string())
-        except Exception as err:
-            print("Error: could not send email.")
-            print(err)
-    else:
+
+def send_email(
+    to: str,
+    subject: str,
+    body: str,
+    transport: SmtpTransport | None = None,
+) -> bool:
+    """
+    Sends a mail, through `transport` if given, or else through a connection of its own.
+
+    Returns whether the mail was delivered to the SMTP server. When sending is disabled and no
+    transport is given, the mail is printed instead, which counts as delivered.
+    """
+    msg = build_email(to, subject, body)
+
+    config = Config.snapshot()
+    if transport is None and (not config.smtp.enabled or config.deadline_daemon.dryrun):
         print("Debug: Email sending is disabled, so the following email was not sent:")
         print(indent(msg.as_string(), "  "))
+        return True
+
+    if transport is not None:
+        sent = transport.send(msg)
+    else:
+        with SmtpTransport.from_config() as own_transport:
+            sent = own_transport.send(msg)
+    if not sent:
+        print(f"Error: could not send email to {to}.")
+    return sent
+
+
+def enqueue_email(sql_session: Session, to: str, subject: str, body: str) -> OutboxEmail:
+    """
+    Adds a mail to the outbox. It will be sent by `send_outbox_emails`,
+    once the surrounding transaction has been committed.
+    """
+    email = OutboxEmail(to, subject, body)
+    sql_session.add(email)
+    return email
+
+
+@dataclass
+class OutboxReport:
+    sent: list[str] = field(default_factory=list)
+    will_retry: list[str] = field(default_factory=list)
+    given_up: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [f"Sent {len(self.sent)} mails."]
+        if len(self.will_retry) > 0:
+            lines.append(
+                f"Could not send {len(self.will_retry)} mails, which will be retried later, to: "
+                + ", ".join(self.will_retry),
+            )
+        if len(self.given_up) > 0:
+            lines.append(
+                f"Gave up on sending {len(self.given_up)} mails, to: " + ", ".join(self.given_up),
+            )
+        return "\n".join(lines)
+
+
+def _claim_outbox_email(sql_session: Session, email: OutboxEmail, lease: timedelta) -> bool:
+    """
+    Claims a due mail for this process, by counting the attempt and postponing the next attempt
+    by `lease`, and commits the claim. Returns False if another process claimed the mail first.
+
+    If the process dies while sending, the mail is retried once the lease has run out.
+    """
+    now = datetime.now()
+    result = sql_session.execute(
+        update(OutboxEmail)
+        .where(
+            OutboxEmail.uid == email.uid,
+            OutboxEmail.attempts == email.attempts,
+            OutboxEmail.sent_time.is_(None),
+            OutboxEmail.next_attempt_time <= now,
+        )
+        .values(attempts=OutboxEmail.attempts + 1, next_attempt_time=now + lease)
+        .execution_options(synchronize_session=False),
+    )
+    sql_session.commit()
+    return result.rowcount == 1
+
+
+def send_outbox_emails(
+    sql_session: Session,
+    transport: SmtpTransport | None = None,
+    limit: int | None = None,
+) -> OutboxReport:
+    """
+    Sends the mails in the outbox which are due, over a single SMTP connection.
+
+    Every mail is claimed and committed before it is sent, so that runs which overlap, such as
+    `worblehat send-mail` and the deadline daemon, do not send the same mail twice. The outbox
+    is updated and committed after every mail as well, so that mails which have been sent are
+    not sent again if the process crashes. Mails that could not be sent are retried with an
+    exponential backoff, until they have been attempted `smtp.max_attempts` times.
+    """
+    config = Config.snapshot()
+    max_attempts = config.smtp.max_attempts
+    retry_backoff = config.smtp.retry_backoff
+
+    report = OutboxReport()
+    pending = list_pending_outbox_emails(sql_session, datetime.now(), max_attempts, limit)
+    if len(pending) == 0:
+        return report
+
+    owns_transport = (
+        transport is None and config.smtp.enabled and not config.deadline_daemon.dryrun
+    )
+    if owns_transport:
+        transport = SmtpTransport.from_config()
+
+    try:
+        for email in pending:
+            # NOTE: Read before claiming, so that no transaction is left open while sending
+            recipient, subject, body = email.recipient, email.subject, email.body
+            if not _claim_outbox_email(sql_session, email, retry_backoff):
+                continue
+
+            if send_email(recipient, subject, body, transport=transport):
+                email.sent_time = datetime.now()
+                report.sent.append(recipient)
+            elif email.attempts >= max_attempts:
+                report.given_up.append(recipient)
+            else:
+                email.next_attempt_time = datetime.now() + retry_backoff * 2 ** (email.attempts - 1)
+                report.will_retry.append(recipient)
+            sql_session.commit()
+    finally:
+        if owns_transport:
+            transport.close()
+
+    return report
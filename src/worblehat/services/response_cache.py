@@ -0,0 +1,308 @@
+"""
+A cache for rendered web responses, invalidated when the tables they were built from change.
+
+Each table has a generation counter, which is bumped whenever a session commits changes to it.
+A cached response remembers the generations of its tables at the time it was rendered,
+and is only served as long as none of them have been bumped since.
+
+Responses are kept in an in-process LRU, and optionally in a SQLite file as well.
+The file also holds the table generations, so that it is shared between the web workers,
+the CLI and the deadline daemon, as long as they all invalidate it on commit.
+"""
+
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Self
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    mimetype: str
+    tables: tuple[str, ...]
+    generations: tuple[int, ...]
+    stored_at: float
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        path: Path | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+
+        self._lock = Lock()
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._pending_tables_key = f"response_cache_tables_{id(self)}"
+
+        self._connection = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    mimetype TEXT NOT NULL,
+                    tables TEXT NOT NULL,
+                    generations TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """,
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS table_generation (
+                    name TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL
+                )
+                """,
+            )
+            self._connection.commit()
+
+    @classmethod
+    def from_config(cls) -> Self | None:
+        """
+        Creates a cache from the `response_cache` section of the configuration,
+        or returns None if the cache is disabled.
+        """
+        # NOTE: imported here to avoid a circular import through worblehat.services
+        from worblehat.services.config import Config
+
+        config = Config.snapshot().response_cache
+        if not config.enabled:
+            return None
+
+        return cls(
+            max_entries=config.max_entries,
+            ttl_seconds=config.ttl_seconds,
+            path=config.path,
+        )
+
+    def generations(self, tables: Iterable[str]) -> tuple[int, ...]:
+        """
+        Returns the current generation of each of the given tables.
+        Take these before rendering a response, and pass them on to `store`.
+        """
+        tables = tuple(tables)
+        with self._lock:
+            if self._connection is None:
+                return tuple(self._generations.get(table, 0) for table in tables)
+
+            rows = self._connection.execute(
+                f"""
+                SELECT name, generation FROM table_generation
+                WHERE name IN ({", ".join("?" for _ in tables)})
+                """,  # noqa: S608 - only the placeholders are formatted into the query
+                tables,
+            ).fetchall()
+        generations = dict(rows)
+        return tuple(generations.get(table, 0) for table in tables)
+
+    def _is_fresh(self, entry: CachedResponse, tables: tuple[str, ...]) -> bool:
+        return (
+            entry.tables == tables
+            and entry.stored_at + self.ttl_seconds >= time.time()
+            and entry.generations == self.generations(tables)
+        )
+
+    def lookup(self, key: str, tables: Iterable[str]) -> CachedResponse | None:
+        """
+        Returns the cached response for `key`, or None if there is none,
+        or if any of its tables have changed since it was stored.
+        """
+        tables = tuple(tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self._connection is not None:
+            entry = self._lookup_file(key)
+            if entry is not None:
+                self._store_memory(key, entry)
+
+        if entry is None:
+            return None
+
+        if not self._is_fresh(entry, tables):
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+        return entry
+
+    def _lookup_file(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT body, mimetype, tables, generations, stored_at
+                FROM response WHERE key = ?
+                """,
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        body, mimetype, tables, generations, stored_at = row
+        return CachedResponse(
+            body=body,
+            mimetype=mimetype,
+            tables=tuple(tables.split(",")),
+            generations=tuple(int(generation) for generation in generations.split(",")),
+            stored_at=stored_at,
+        )
+
+    def _store_memory(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def store(
+        self,
+        key: str,
+        tables: Iterable[str],
+        generations: tuple[int, ...],
+        body: bytes,
+        mimetype: str,
+    ) -> None:
+        """
+        Stores a rendered response, together with the generations of its tables
+        from before it was rendered.
+        """
+        entry = CachedResponse(
+            body=body,
+            mimetype=mimetype,
+            tables=tuple(tables),
+            generations=generations,
+            stored_at=time.time(),
+        )
+        self._store_memory(key, entry)
+
+        if self._connection is None:
+            return
+
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM response WHERE stored_at < ?",
+                (entry.stored_at - self.ttl_seconds,),
+            )
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO response
+                    (key, body, mimetype, tables, generations, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    entry.body,
+                    entry.mimetype,
+                    ",".join(entry.tables),
+                    ",".join(str(generation) for generation in entry.generations),
+                    entry.stored_at,
+                ),
+            )
+            self._connection.commit()
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Bumps the generation of the given tables, invalidating every response using them."""
+        tables = sorted(set(tables))
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+            if self._connection is None:
+                return
+
+            self._connection.executemany(
+                """
+                INSERT INTO table_generation (name, generation) VALUES (?, 1)
+                ON CONFLICT (name) DO UPDATE SET generation = generation + 1
+                """,
+                [(table,) for table in tables],
+            )
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM response")
+                self._connection.commit()
+
+    def attach(self, session_target: type[Session] | Session | object) -> None:
+        """
+        Invalidates the tables changed by a session whenever it commits.
+
+        `session_target` is anything SQLAlchemy accepts for session events, such as a session,
+        a `sessionmaker`, a `scoped_session` or the `Session` class itself.
+        Both flushed ORM objects and bulk INSERT, UPDATE and DELETE statements are tracked.
+        """
+        event.listen(session_target, "after_flush", self._after_flush)
+        event.listen(session_target, "do_orm_execute", self._do_orm_execute)
+        event.listen(session_target, "after_commit", self._after_commit)
+        event.listen(session_target, "after_rollback", self._after_rollback)
+
+    def detach(self, session_target: type[Session] | Session | object) -> None:
+        event.remove(session_target, "after_flush", self._after_flush)
+        event.remove(session_target, "do_orm_execute", self._do_orm_execute)
+        event.remove(session_target, "after_commit", self._after_commit)
+        event.remove(session_target, "after_rollback", self._after_rollback)
+
+    def _pending_tables(self, session: Session) -> set[str]:
+        return session.info.setdefault(self._pending_tables_key, set())
+
+    def _after_flush(self, session: Session, _flush_context) -> None:
+        pending_tables = self._pending_tables(session)
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            pending_tables.update(table.name for table in inspect(obj).mapper.tables)
+
+    def _do_orm_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        state = orm_execute_state
+        if state.is_insert or state.is_update or state.is_delete:
+            table = getattr(state.statement, "table", None)
+            if table is not None and hasattr(table, "name"):
+                self._pending_tables(state.session).add(table.name)
+
+    def _after_commit(self, session: Session) -> None:
+        tables = session.info.pop(self._pending_tables_key, None)
+        if tables:
+            self.invalidate(tables)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self._pending_tables_key, None)
+
+
+_response_cache: ResponseCache | None = None
+_response_cache_loaded = False
+_response_cache_lock = Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """
+    Returns the process wide response cache, or None if caching is disabled.
+    """
+    global _response_cache, _response_cache_loaded
+    with _response_cache_lock:
+        if not _response_cache_loaded:
+            _response_cache = ResponseCache.from_config()
+            _response_cache_loaded = True
+        return _response_cache
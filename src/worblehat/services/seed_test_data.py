@@ -4,8 +4,6 @@ from pathlib import Path
 
 from sqlalchemy.orm import Session
 
-from worblehat.flaskapp.database import db
-
 from ..models import (
     Author,
     Bookcase,
@@ -18,7 +16,7 @@ from ..models import (
 )
 
 
-def seed_data(sql_session: Session = db.session) -> None:
+def seed_data(sql_session: Session) -> None:
     media_types = [
         MediaType(name="Book", description="A physical book"),
         MediaType(name="Comic", description="A comic book"),
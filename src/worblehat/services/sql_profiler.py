@@ -0,0 +1,166 @@
+import heapq
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+from sqlalchemy import Connection, Engine, ExceptionContext, event
+
+_START_TIMES_KEY = "sql_profiler_start_times"
+
+
+@dataclass
+class SqlScopeProfile:
+    """
+    The SQL statements executed within all runs of a single scope,
+    like a CLI command, a deadline daemon routine or a Flask endpoint.
+    """
+
+    name: str
+    runs: int = 0
+    statements: int = 0
+    seconds: float = 0.0
+    # Min heap of (seconds, statement), holding the slowest statements
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+
+    def record(self, seconds: float, statement: str, keep_slowest: int) -> None:
+        self.statements += 1
+        self.seconds += seconds
+
+        if keep_slowest <= 0:
+            return
+        entry = (seconds, " ".join(statement.split()))
+        if len(self.slowest) < keep_slowest:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def slowest_statements(self) -> list[tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "statements": self.statements,
+            "total_ms": self.seconds * 1000,
+            "slowest": [
+                {"ms": seconds * 1000, "statement": statement}
+                for seconds, statement in self.slowest_statements()
+            ],
+        }
+
+
+class SqlProfiler:
+    """
+    Measures the SQL statements executed through the engines it is attached to,
+    grouped by the innermost scope that was active when each statement was executed.
+
+    Scopes are tracked per thread and per asyncio task, so that concurrent Flask requests
+    are recorded separately. Statements executed outside of any scope are not recorded.
+    """
+
+    def __init__(self, keep_slowest: int = 5) -> None:
+        self.keep_slowest = keep_slowest
+        self.profiles: dict[str, SqlScopeProfile] = {}
+
+        self._lock = Lock()
+        self._current_scope: ContextVar[str | None] = ContextVar(
+            f"sql_profiler_scope_{id(self)}",
+            default=None,
+        )
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def detach(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(
+        self,
+        conn: Connection,
+        _cursor,
+        _statement,
+        _params,
+        _context,
+        _many,
+    ) -> None:
+        conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self,
+        conn: Connection,
+        _cursor,
+        statement: str,
+        _params,
+        _context,
+        _many,
+    ) -> None:
+        seconds = time.perf_counter() - conn.info[_START_TIMES_KEY].pop()
+
+        scope = self._current_scope.get()
+        if scope is None:
+            return
+        with self._lock:
+            self.profiles[scope].record(seconds, statement, self.keep_slowest)
+
+    def _handle_error(self, exception_context: ExceptionContext) -> None:
+        conn = exception_context.connection
+        if conn is not None and len(conn.info.get(_START_TIMES_KEY, [])) > 0:
+            conn.info[_START_TIMES_KEY].pop()
+
+    def enter_scope(self, name: str) -> Token:
+        """
+        Starts recording statements under `name`, until `exit_scope` is called with the
+        returned token. Prefer `scope()`, unless the start and end happen in separate callbacks.
+        """
+        with self._lock:
+            self.profiles.setdefault(name, SqlScopeProfile(name)).runs += 1
+        return self._current_scope.set(name)
+
+    def exit_scope(self, token: Token) -> None:
+        self._current_scope.reset(token)
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        token = self.enter_scope(name)
+        try:
+            yield
+        finally:
+            self.exit_scope(token)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.profiles.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {name: profile.to_dict() for name, profile in self.profiles.items()}
+
+    def summary(self) -> str:
+        with self._lock:
+            profiles = sorted(self.profiles.values(), key=lambda p: p.seconds, reverse=True)
+
+        lines = [
+            "SQL profile:",
+            f"  {'scope':<50} {'runs':>6} {'statements':>11} {'total ms':>10} {'per run':>8}",
+        ]
+        for profile in profiles:
+            lines.append(
+                f"  {profile.name:<50} {profile.runs:>6} {profile.statements:>11} "
+                f"{profile.seconds * 1000:>10.1f} {profile.statements / max(profile.runs, 1):>8.1f}",
+            )
+            for seconds, statement in profile.slowest_statements():
+                lines.append(f"      {seconds * 1000:>8.1f} ms  {statement[:120]}")
+        return "\n".join(lines)
+
+
+# Shared by the CLI, the deadline daemon and the web interface.
+# It only records anything once it has been attached to an engine.
+sql_profiler = SqlProfiler()
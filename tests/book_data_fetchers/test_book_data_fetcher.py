@@ -0,0 +1,185 @@
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from worblehat.book_data_fetchers import book_data_fetcher
+from worblehat.book_data_fetchers.BookData import BookData
+from worblehat.book_data_fetchers.BookDataCache import BookDataCache
+from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetcher, BookDataFetchError
+
+ISBN = "9780000000001"
+
+
+class FoundFetcher(BookDataFetcher):
+    @classmethod
+    def fetcher_id(_cls) -> str:
+        return "found"
+
+    @classmethod
+    def try_fetch_data(cls, isbn: str) -> BookData | None:
+        return BookData(
+            isbn=isbn,
+            title="Some Book",
+            source=cls.fetcher_id(),
+            authors={"Some Author"},
+            language="en",
+            publish_date="2020",
+            num_pages=100,
+            subjects=set(),
+        )
+
+
+class NotFoundFetcher(BookDataFetcher):
+    @classmethod
+    def fetcher_id(_cls) -> str:
+        return "not_found"
+
+    @classmethod
+    def try_fetch_data(cls, isbn: str) -> BookData | None:
+        return None
+
+
+class FailingFetcher(BookDataFetcher):
+    @classmethod
+    def fetcher_id(_cls) -> str:
+        return "failing"
+
+    @classmethod
+    def try_fetch_data(cls, isbn: str) -> BookData | None:
+        raise BookDataFetchError("503 Service Unavailable")
+
+
+class SlowFetcher(BookDataFetcher):
+    timeout_seconds = 0.05
+
+    @classmethod
+    def fetcher_id(_cls) -> str:
+        return "slow"
+
+    @classmethod
+    def try_fetch_data(cls, isbn: str) -> BookData | None:
+        time.sleep(0.5)
+        return None
+
+
+class HangingFetcher(BookDataFetcher):
+    timeout_seconds = 10
+
+    @classmethod
+    def fetcher_id(_cls) -> str:
+        return "hanging"
+
+    @classmethod
+    def try_fetch_data(cls, isbn: str) -> BookData | None:
+        time.sleep(0.5)
+        return FoundFetcher.try_fetch_data(isbn)
+
+
+class SlowFoundFetcher(FoundFetcher):
+    timeout_seconds = 10
+
+    @classmethod
+    def fetcher_id(_cls) -> str:
+        return "slow_found"
+
+    @classmethod
+    def try_fetch_data(cls, isbn: str) -> BookData | None:
+        time.sleep(0.1)
+        return super().try_fetch_data(isbn)
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> BookDataCache:
+    cache = BookDataCache(
+        tmp_path / "book_data_cache.sqlite",
+        ttl=timedelta(days=1),
+        negative_ttl=timedelta(hours=1),
+    )
+    monkeypatch.setattr(book_data_fetcher, "get_book_data_cache", lambda: cache)
+    return cache
+
+
+def _use_fetchers(monkeypatch: pytest.MonkeyPatch, fetchers: list[type[BookDataFetcher]]) -> None:
+    monkeypatch.setattr(book_data_fetcher, "FETCHERS", fetchers)
+    monkeypatch.setattr(
+        book_data_fetcher,
+        "FETCHER_SOURCE_IDS",
+        [fetcher.fetcher_id() for fetcher in fetchers],
+    )
+
+
+def test_failed_lookups_are_not_cached(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_fetchers(monkeypatch, [FailingFetcher, NotFoundFetcher, FoundFetcher])
+
+    results = book_data_fetcher.fetch_book_data_from_multiple_sources(ISBN)
+
+    assert [result.source for result in results] == ["found"]
+    assert cache.lookup("failing", ISBN) is None
+    assert cache.lookup("not_found", ISBN).data is None
+    assert cache.lookup("found", ISBN).data == results[0]
+
+
+def test_timed_out_lookups_are_not_cached(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_fetchers(monkeypatch, [SlowFetcher, NotFoundFetcher])
+
+    assert book_data_fetcher.fetch_book_data_from_multiple_sources(ISBN) == []
+    assert cache.lookup("slow", ISBN) is None
+    assert cache.lookup("not_found", ISBN) is not None
+
+
+def test_first_good_returns_without_waiting_for_lower_priority_fetchers(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_fetchers(monkeypatch, [FailingFetcher, FoundFetcher, HangingFetcher])
+
+    start = time.monotonic()
+    results = book_data_fetcher.fetch_book_data_from_multiple_sources(ISBN, first_good=True)
+
+    assert time.monotonic() - start < 0.4
+    assert [result.source for result in results] == ["found"]
+    assert cache.lookup("hanging", ISBN) is None
+
+
+def test_first_good_waits_for_higher_priority_fetchers(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_fetchers(monkeypatch, [SlowFoundFetcher, FoundFetcher, HangingFetcher])
+
+    start = time.monotonic()
+    results = book_data_fetcher.fetch_book_data_from_multiple_sources(ISBN, first_good=True)
+
+    assert time.monotonic() - start < 0.4
+    assert [result.source for result in results] == ["slow_found", "found"]
+
+
+def test_deadline_cuts_off_hanging_fetchers(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_fetchers(monkeypatch, [HangingFetcher, FoundFetcher])
+
+    start = time.monotonic()
+    results = book_data_fetcher.fetch_book_data_from_multiple_sources(ISBN, deadline=0.1)
+
+    assert time.monotonic() - start < 0.4
+    assert [result.source for result in results] == ["found"]
+    assert cache.lookup("hanging", ISBN) is None
+
+
+def test_deadline_without_any_answers_returns_nothing(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _use_fetchers(monkeypatch, [HangingFetcher])
+
+    assert book_data_fetcher.fetch_book_data_from_multiple_sources(ISBN, deadline=0.1) == []
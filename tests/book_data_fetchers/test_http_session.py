@@ -0,0 +1,109 @@
+import pytest
+import requests
+
+from worblehat.book_data_fetchers import http_session
+from worblehat.book_data_fetchers.http_session import (
+    DEFAULT_HOST_LIMIT,
+    DEFAULT_TIMEOUT_SECONDS,
+    HOST_LIMITS,
+    RateLimitedSession,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    """Stands in for the `time` module, where sleeping only moves the clock forward."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(http_session, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def requested_urls(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, object]]:
+    """Records the requests which make it past the limits, instead of sending them."""
+    requested_urls = []
+
+    def request(
+        _self: requests.Session,
+        _method: str,
+        url: str,
+        **kwargs: object,
+    ) -> requests.Response:
+        requested_urls.append((url, kwargs.get("timeout")))
+        return requests.Response()
+
+    monkeypatch.setattr(requests.Session, "request", request)
+    return requested_urls
+
+
+def test_bursts_larger_than_the_bucket_are_delayed(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    for _ in range(2):
+        bucket.acquire()
+    assert clock.sleeps == pytest.approx([0.5, 0.5])
+
+
+def test_bucket_refills_up_to_its_capacity(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+
+    clock.now += 60
+    for _ in range(4):
+        bucket.acquire()
+
+    assert clock.sleeps == pytest.approx([0.5])
+
+
+def test_buckets_are_kept_per_host(
+    clock: FakeClock,
+    requested_urls: list[tuple[str, object]],
+) -> None:
+    session = RateLimitedSession()
+    burst = HOST_LIMITS["openlibrary.org"].burst
+
+    for _ in range(burst):
+        session.get("https://openlibrary.org/isbn/9780000000001.json")
+    session.get("https://outland.no/9780000000001")
+    assert clock.sleeps == []
+
+    session.get("https://openlibrary.org/isbn/9780000000001.json")
+    assert clock.sleeps == pytest.approx([1 / HOST_LIMITS["openlibrary.org"].requests_per_second])
+    assert len(requested_urls) == burst + 2
+
+
+def test_unknown_hosts_use_the_default_limit(
+    clock: FakeClock,
+    requested_urls: list[tuple[str, object]],
+) -> None:
+    session = RateLimitedSession()
+
+    for _ in range(DEFAULT_HOST_LIMIT.burst + 1):
+        session.get("https://books.example.org/9780000000001")
+
+    assert "books.example.org" not in HOST_LIMITS
+    assert clock.sleeps == pytest.approx([1 / DEFAULT_HOST_LIMIT.requests_per_second])
+    assert requested_urls[0] == (
+        "https://books.example.org/9780000000001",
+        DEFAULT_TIMEOUT_SECONDS,
+    )
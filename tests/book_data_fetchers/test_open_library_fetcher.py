@@ -0,0 +1,133 @@
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from worblehat.book_data_fetchers.BookDataCache import BookDataCache
+from worblehat.book_data_fetchers.BookDataFetcher import BookDataFetchError
+from worblehat.book_data_fetchers.fetchers import OpenLibraryFetcher as open_library
+from worblehat.book_data_fetchers.fetchers.OpenLibraryFetcher import OpenLibraryFetcher
+
+ISBN = "9780000000001"
+AUTHOR_KEY = "authors/OL1A"
+
+
+class FakeResponse:
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+    def json(self) -> dict:
+        return self.data
+
+
+class FakeSource:
+    """Stands in for `get_from_source`, answering from `responses` and recording the URLs."""
+
+    def __init__(self, responses: dict[str, dict | Exception | None]) -> None:
+        self.responses = responses
+        self.requested_urls: list[str] = []
+
+    def __call__(self, url: str) -> FakeResponse | None:
+        self.requested_urls.append(url)
+        response = self.responses[url]
+        if isinstance(response, Exception):
+            raise response
+        return FakeResponse(response) if response is not None else None
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> BookDataCache:
+    cache = BookDataCache(
+        tmp_path / "book_data_cache.sqlite",
+        ttl=timedelta(days=1),
+        negative_ttl=timedelta(hours=1),
+    )
+    monkeypatch.setattr(open_library, "get_book_data_cache", lambda: cache)
+    monkeypatch.setattr(open_library, "_resolved_keys", {})
+    return cache
+
+
+def _use_source(monkeypatch: pytest.MonkeyPatch, responses: dict) -> FakeSource:
+    source = FakeSource(responses)
+    monkeypatch.setattr(open_library, "get_from_source", source)
+    return source
+
+
+def _resolve_author(key: str = AUTHOR_KEY) -> str | None:
+    return OpenLibraryFetcher._resolve_key(key, lambda author: author.get("name"))
+
+
+def test_resolved_keys_are_memoized_and_cached(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    source = _use_source(
+        monkeypatch,
+        {f"https://openlibrary.org/{AUTHOR_KEY}.json": {"name": "Some Author"}},
+    )
+
+    assert _resolve_author() == "Some Author"
+    assert _resolve_author() == "Some Author"
+    assert len(source.requested_urls) == 1
+    assert cache.lookup_key("open_library", AUTHOR_KEY) == "Some Author"
+
+    # E.g. a new process, which only has the book data cache to go on
+    monkeypatch.setattr(open_library, "_resolved_keys", {})
+    assert _resolve_author() == "Some Author"
+    assert len(source.requested_urls) == 1
+
+
+@pytest.mark.parametrize(
+    "response",
+    [BookDataFetchError("503 Service Unavailable"), None, {"personal_name": "Some Author"}],
+    ids=["failed", "not_found", "without_name"],
+)
+def test_failed_resolutions_are_not_cached(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+    response: dict | Exception | None,
+) -> None:
+    source = _use_source(monkeypatch, {f"https://openlibrary.org/{AUTHOR_KEY}.json": response})
+
+    for _ in range(2):
+        if isinstance(response, Exception):
+            with pytest.raises(BookDataFetchError):
+                _resolve_author()
+        else:
+            assert _resolve_author() is None
+
+    assert len(source.requested_urls) == 2
+    assert cache.lookup_key("open_library", AUTHOR_KEY) is None
+    assert AUTHOR_KEY not in open_library._resolved_keys
+
+
+def test_editions_are_fetched_with_their_authors_and_language(
+    cache: BookDataCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    source = _use_source(
+        monkeypatch,
+        {
+            f"https://openlibrary.org/isbn/{ISBN}.json": {
+                "title": "Some Book",
+                "authors": [{"key": AUTHOR_KEY}, {"key": "authors/OL2A"}],
+                "languages": [{"key": "languages/eng"}],
+                "number_of_pages": "100",
+            },
+            f"https://openlibrary.org/{AUTHOR_KEY}.json": {"name": "Some Author"},
+            "https://openlibrary.org/authors/OL2A.json": {"name": "Other Author"},
+            "https://openlibrary.org/languages/eng.json": {
+                "identifiers": {"iso_639_1": ["en"]},
+            },
+        },
+    )
+
+    data = OpenLibraryFetcher.try_fetch_data(ISBN)
+
+    assert data.authors == {"Some Author", "Other Author"}
+    assert data.language == "en"
+    assert data.num_pages == 100
+    assert len(source.requested_urls) == 4
+
+    OpenLibraryFetcher.try_fetch_data(ISBN)
+    assert len(source.requested_urls) == 5
@@ -1,4 +1,6 @@
 import logging
+import tomllib
+from pathlib import Path
 
 import pytest
 import sqlparse
@@ -8,6 +10,10 @@ from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
 
 from worblehat.models import Base
+from worblehat.services.config import Config
+from worblehat.services.config_snapshot import ConfigSnapshot
+
+CONFIG_TEMPLATE = Path(__file__).parents[1] / "config-template.toml"
 
 
 def pytest_addoption(parser):
@@ -16,6 +22,10 @@ def pytest_addoption(parser):
         action="store_true",
         help="Enable SQLAlchemy 'echo' mode for debugging",
     )
+    parser.addoption(
+        "--postgresql-url",
+        help="Also run the PostgreSQL specific tests, against the database at this URL",
+    )
 
 
 class SqlParseFormatter(logging.Formatter):
@@ -70,6 +80,54 @@ def sql_session(request):
     sql_session.close()
 
 
+@pytest.fixture(scope="function")
+def postgresql_session(request):
+    """
+    Create a new SQLAlchemy session for the PostgreSQL database given by --postgresql-url.
+    The tables are created within a transaction, which is rolled back afterwards.
+    """
+
+    url = request.config.getoption("--postgresql-url")
+    if url is None:
+        pytest.skip("requires --postgresql-url")
+
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        Base.metadata.create_all(connection)
+        with Session(bind=connection) as sql_session:
+            yield sql_session
+        transaction.rollback()
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def sql_statements(sql_session):
+    """Records the SQL statements executed by `sql_session`, for counting queries."""
+
+    statements: list[str] = []
+
+    def record_statement(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    engine = sql_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record_statement)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record_statement)
+
+
+@pytest.fixture(scope="function")
+def config(monkeypatch):
+    """Loads the configuration template as the configuration of the application."""
+
+    with CONFIG_TEMPLATE.open("rb") as config_file:
+        raw = tomllib.load(config_file)
+    snapshot = ConfigSnapshot.from_dict(raw)
+    monkeypatch.setattr(Config, "_config", raw)
+    monkeypatch.setattr(Config, "_snapshot", snapshot)
+    return snapshot
+
+
 # FIXME: Declaring this hook seems to have a side effect where the database does not
 #        get reset between tests.
 # @pytest.hookimpl(trylast=True)
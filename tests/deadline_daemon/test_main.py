@@ -0,0 +1,116 @@
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from worblehat.deadline_daemon import main as deadline_daemon_main
+from worblehat.deadline_daemon.main import DeadlineDaemon
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseShelf,
+    DeadlineDaemonLastRunDatetime,
+    MediaType,
+    OutboxEmail,
+)
+from worblehat.services.config import Config
+from worblehat.services.config_snapshot import ConfigSnapshot
+from worblehat.services.email import enqueue_email
+
+
+def _use_deadline_daemon_config(
+    monkeypatch: pytest.MonkeyPatch,
+    config: ConfigSnapshot,
+    warn_days_before_borrowing_deadline: tuple[int, ...],
+) -> None:
+    deadline_daemon = replace(
+        config.deadline_daemon,
+        warn_days_before_borrowing_deadline=warn_days_before_borrowing_deadline,
+        commit_batch_size=1,
+    )
+    monkeypatch.setattr(Config, "_snapshot", replace(config, deadline_daemon=deadline_daemon))
+
+
+def _add_borrowings(sql_session: Session, now: datetime) -> None:
+    media_type = MediaType(name="Book")
+    bookcase = Bookcase(name="Bookcase")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=bookcase)
+    item = BookcaseItem("Some Book", "1234567890")
+    item.amount = 10
+    item.media_type = media_type
+    item.shelf = shelf
+    sql_session.add_all([media_type, bookcase, shelf, item])
+
+    end_times = {
+        "five_a": now + timedelta(days=5, hours=-1),
+        "five_b": now + timedelta(days=5, hours=-2),
+        "one_a": now + timedelta(days=1, hours=-1),
+        "late_a": now - timedelta(days=2),
+        "late_b": now - timedelta(days=3),
+        "late_c": now - timedelta(days=4),
+    }
+    for username, end_time in end_times.items():
+        borrowing = BookcaseItemBorrowing(username, item)
+        borrowing.end_time = end_time
+        sql_session.add(borrowing)
+
+    sql_session.add(DeadlineDaemonLastRunDatetime(time=now - timedelta(days=1)))
+    sql_session.commit()
+
+
+def _interrupt_when_mailing(monkeypatch: pytest.MonkeyPatch, recipient: str) -> None:
+    def interrupting_enqueue_email(sql_session: Session, to: str, subject: str, body: str) -> None:
+        if to == recipient:
+            raise RuntimeError("Interrupted")
+        enqueue_email(sql_session, to, subject, body)
+
+    monkeypatch.setattr(deadline_daemon_main, "enqueue_email", interrupting_enqueue_email)
+
+
+def _queued_mails(sql_session: Session) -> Counter[str]:
+    return Counter(sql_session.scalars(select(OutboxEmail.recipient)).all())
+
+
+@pytest.mark.parametrize(
+    ("interrupted_at", "resumed_warn_days"),
+    [
+        ("five_b@pvv.ntnu.no", (5, 1)),
+        ("late_b@pvv.ntnu.no", (5, 1)),
+        ("late_b@pvv.ntnu.no", (1, 3, 5)),
+    ],
+)
+def test_interrupted_run_is_resumed_without_queuing_mails_twice(
+    sql_session: Session,
+    config: ConfigSnapshot,
+    monkeypatch: pytest.MonkeyPatch,
+    interrupted_at: str,
+    resumed_warn_days: tuple[int, ...],
+) -> None:
+    now = datetime.now()
+    _add_borrowings(sql_session, now)
+
+    _use_deadline_daemon_config(monkeypatch, config, (5, 1))
+    _interrupt_when_mailing(monkeypatch, interrupted_at)
+    with pytest.raises(RuntimeError):
+        DeadlineDaemon(sql_session, now).run()
+
+    assert interrupted_at not in _queued_mails(sql_session)
+
+    monkeypatch.setattr(deadline_daemon_main, "enqueue_email", enqueue_email)
+    _use_deadline_daemon_config(monkeypatch, config, resumed_warn_days)
+    DeadlineDaemon(sql_session, now + timedelta(hours=1)).run()
+
+    assert _queued_mails(sql_session) == Counter(
+        f"{username}@pvv.ntnu.no"
+        for username in ["five_a", "five_b", "one_a", "late_a", "late_b", "late_c"]
+    )
+
+    last_run = sql_session.scalars(select(DeadlineDaemonLastRunDatetime)).one()
+    assert last_run.time == now
+    assert last_run.current_run_time is None
+    assert last_run.completed_run_steps is None
+    assert last_run.current_run_cursors is None
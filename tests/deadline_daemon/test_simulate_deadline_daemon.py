@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from worblehat.devscripts.seed_large_library import seed_large_library
+from worblehat.devscripts.simulate_deadline_daemon import DAEMON_ROUTINES, simulate
+from worblehat.services.config_snapshot import ConfigSnapshot
+
+
+def test_simulation_runs_the_deadline_daemon(
+    sql_session: Session,
+    config: ConfigSnapshot,
+) -> None:
+    seed_large_library(sql_session, items=20, borrowings=0, queue_entries=0)
+
+    report = simulate(
+        sql_session,
+        days=20,
+        interval=timedelta(days=2),
+        borrowings_per_day=5,
+        users=10,
+    )
+
+    assert report.daemon_runs == 10
+    assert report.borrowings > 0
+    assert report.deliveries > 0
+    for name in [*DAEMON_ROUTINES, "outbox"]:
+        assert report.routines[name].runs == report.daemon_runs
+        assert report.routines[name].statements > 0
+    assert report.sent_mails.total() > 0
+    assert report.sent_mails.total() == report.routines["outbox"].queued_mails
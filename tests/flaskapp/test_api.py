@@ -0,0 +1,153 @@
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from worblehat.flaskapp.api import api
+from worblehat.flaskapp.database import db
+from worblehat.flaskapp.flaskapp import configure_response_cache
+from worblehat.models import (
+    Author,
+    Base,
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.services.response_cache import ResponseCache
+
+
+@pytest.fixture
+def client() -> FlaskClient:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    db.init_app(app)
+    app.register_blueprint(api)
+
+    with app.app_context():
+        Base.metadata.create_all(db.engine)
+
+        media_type = MediaType(name="Book")
+        bookcase = Bookcase(name="Bookcase")
+        shelf = BookcaseShelf(row=1, column=2, bookcase=bookcase)
+        db.session.add_all([media_type, bookcase, shelf])
+        for i in range(5):
+            item = BookcaseItem(f"Compilers, volume {i}", f"{i:010d}")
+            item.media_type = media_type
+            item.shelf = shelf
+            item.authors = {Author(f"Author {i}")}
+            db.session.add(item)
+            if i == 0:
+                db.session.add(BookcaseItemBorrowing("borrower", item))
+        db.session.commit()
+
+        yield app.test_client()
+
+
+def test_items_are_paged_by_cursor(client: FlaskClient) -> None:
+    first_page = client.get("/api/items?limit=3").get_json()
+    second_page = client.get(f"/api/items?limit=3&after={first_page['next']}").get_json()
+
+    assert [item["isbn"] for item in first_page["items"]] == [
+        "0000000000",
+        "0000000001",
+        "0000000002",
+    ]
+    assert [item["isbn"] for item in second_page["items"]] == ["0000000003", "0000000004"]
+    assert second_page["next"] is None
+    assert first_page["items"][0]["authors"] == ["Author 0"]
+    assert first_page["items"][0]["bookcase"] == "Bookcase"
+
+
+def test_item_includes_availability(client: FlaskClient) -> None:
+    item = client.get("/api/items/0000000000").get_json()
+
+    assert item["availability"]["borrowed"] == 1
+    assert item["availability"]["available"] == 0
+    assert client.get("/api/items/9999999999").status_code == 404
+
+
+def test_unchanged_responses_are_not_modified(client: FlaskClient) -> None:
+    response = client.get("/api/availability")
+    assert response.status_code == 200
+    assert b" " not in response.data
+
+    cached = client.get("/api/availability", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+
+def test_search_and_shelves(client: FlaskClient) -> None:
+    search = client.get("/api/search?q=volume 3").get_json()
+    assert [item["isbn"] for item in search["items"]] == ["0000000003"]
+
+    [shelf] = client.get("/api/bookcases/Bookcase/shelves").get_json()
+    assert (shelf["column"], shelf["row"]) == (2, 1)
+    assert len(shelf["items"]) == 5
+
+
+def test_invalid_arguments_are_rejected(client: FlaskClient) -> None:
+    response = client.get("/api/items?limit=100000")
+    assert response.status_code == 400
+    assert "limit" in response.get_json()["error"]
+    assert client.get("/api/items?after=abc").status_code == 400
+    assert client.get("/api/search").status_code == 400
+
+
+def test_cached_responses_are_invalidated_on_commit(client: FlaskClient) -> None:
+    app = client.application
+    with app.app_context():
+        configure_response_cache(app, ResponseCache(max_entries=100, ttl_seconds=60))
+
+        first = client.get("/api/items/0000000001")
+        assert first.get_json()["availability"]["borrowed"] == 0
+
+        # Changes which bypass the session are only seen once the cache is invalidated
+        db.session.execute(
+            text("UPDATE BookcaseItem SET name = 'Renamed' WHERE isbn = '0000000001'"),
+        )
+        assert client.get("/api/items/0000000001").data == first.data
+
+        item = db.session.scalars(
+            select(BookcaseItem).where(BookcaseItem.isbn == "0000000001"),
+        ).one()
+        db.session.add(BookcaseItemBorrowing("borrower", item))
+        db.session.commit()
+
+        item = client.get("/api/items/0000000001").get_json()
+        assert item["name"] == "Renamed"
+        assert item["availability"]["borrowed"] == 1
+
+        app.extensions["response_cache"].detach(db.session)
+
+
+def test_commits_from_other_processes_invalidate_cached_responses(
+    client: FlaskClient,
+    tmp_path: Path,
+) -> None:
+    app = client.application
+    with app.app_context():
+        path = tmp_path / "response_cache.sqlite"
+        configure_response_cache(app, ResponseCache(max_entries=100, ttl_seconds=60, path=path))
+
+        first = client.get("/api/availability").get_json()
+        assert first["items"][1]["borrowed"] == 0
+
+        # E.g. a borrowing made from the CLI, which has its own cache and session
+        cli_cache = ResponseCache(max_entries=100, ttl_seconds=60, path=path)
+        with Session(db.engine) as cli_session:
+            cli_cache.attach(cli_session)
+            item = cli_session.scalars(
+                select(BookcaseItem).where(BookcaseItem.isbn == "0000000001"),
+            ).one()
+            cli_session.add(BookcaseItemBorrowing("borrower", item))
+            cli_session.commit()
+
+        second = client.get("/api/availability").get_json()
+        assert second["items"][1]["borrowed"] == 1
+
+        app.extensions["response_cache"].detach(db.session)
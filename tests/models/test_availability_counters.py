@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+    BookcaseShelf,
+    MediaType,
+    refresh_availability_counters,
+)
+
+
+def _make_bookcase_item(sql_session: Session, amount: int = 1) -> BookcaseItem:
+    media_type = MediaType(name="Book")
+    bookcase = Bookcase(name="Bookcase")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=bookcase)
+    item = BookcaseItem("Some Book", "1234567890")
+    item.amount = amount
+    item.media_type = media_type
+    item.shelf = shelf
+    sql_session.add_all([media_type, bookcase, shelf, item])
+    sql_session.flush()
+    return item
+
+
+def test_counters_follow_borrowing_and_delivery(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session, amount=2)
+    now = datetime.now()
+
+    first = BookcaseItemBorrowing("first", item)
+    first.end_time = now + timedelta(days=3)
+    second = BookcaseItemBorrowing("second", item)
+    second.end_time = now + timedelta(days=10)
+    sql_session.add_all([first, second])
+    sql_session.flush()
+
+    assert item.active_borrowing_count == 2
+    assert item.available_amount == 0
+    assert item.next_due_time == first.end_time
+
+    first.delivered = now
+    sql_session.flush()
+
+    assert item.active_borrowing_count == 1
+    assert item.available_amount == 1
+    assert item.next_due_time == second.end_time
+
+    second.end_time = now + timedelta(days=20)
+    sql_session.flush()
+
+    assert item.next_due_time == second.end_time
+
+
+def test_counters_follow_queue_changes(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session)
+
+    first = BookcaseItemBorrowingQueue("first", item)
+    second = BookcaseItemBorrowingQueue("second", item)
+    sql_session.add_all([first, second])
+    sql_session.flush()
+
+    assert item.pending_queue_count == 2
+
+    first.item_became_available_time = datetime.now()
+    sql_session.flush()
+
+    assert item.pending_queue_count == 1
+
+    sql_session.delete(second)
+    sql_session.flush()
+
+    assert item.pending_queue_count == 0
+
+
+def test_refresh_rebuilds_counters_after_bulk_changes(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session)
+    borrowing = BookcaseItemBorrowing("user", item)
+    sql_session.add(borrowing)
+    sql_session.flush()
+
+    sql_session.execute(
+        update(BookcaseItemBorrowing)
+        .where(BookcaseItemBorrowing.uid == borrowing.uid)
+        .values(delivered=datetime.now()),
+    )
+    assert item.active_borrowing_count == 1
+
+    refresh_availability_counters(sql_session)
+
+    assert item.active_borrowing_count == 0
+    assert item.next_due_time is None
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from worblehat.models import MediaType, set_default_session
+
+
+def test_explicit_session_needs_no_default(sql_session: Session) -> None:
+    sql_session.add(MediaType(name="Book"))
+    sql_session.flush()
+
+    assert MediaType.get_by_name("Book", sql_session).name == "Book"
+
+    with pytest.raises(RuntimeError):
+        MediaType.get_by_name("Book")
+
+
+def test_registered_default_session_is_used(sql_session: Session) -> None:
+    sql_session.add(MediaType(name="Book"))
+    sql_session.flush()
+
+    set_default_session(lambda: sql_session)
+    try:
+        assert MediaType.get_by_name("Book").name == "Book"
+        assert MediaType.get_by_uid(9999) is None
+    finally:
+        set_default_session(None)
@@ -1,7 +1,17 @@
 from sqlalchemy.orm import Session
 
-from worblehat.models import Author
-from worblehat.queries.author import search_authors_by_name
+from worblehat.models import (
+    Author,
+    Bookcase,
+    BookcaseItem,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.queries.author import (
+    list_authors_by_names,
+    search_authors_by_name,
+    search_authors_by_name_with_items,
+)
 
 
 def test_search_authors_by_name_matches_substring_case_insensitively(sql_session: Session) -> None:
@@ -36,3 +46,39 @@ def test_search_authors_by_name_returns_all_matches(sql_session: Session) -> Non
     result = search_authors_by_name(sql_session, "e")
 
     assert set(result) == {tolkien, orwell, nesbo}
+
+
+def test_list_authors_by_names_returns_exact_matches_only(sql_session: Session) -> None:
+    tolkien = Author(name="J.R.R. Tolkien")
+    orwell = Author(name="George Orwell")
+    sql_session.add_all([tolkien, orwell, Author(name="Roald Dahl")])
+    sql_session.flush()
+
+    result = list_authors_by_names(sql_session, ["J.R.R. Tolkien", "George Orwell", "Tolkien"])
+
+    assert set(result) == {tolkien, orwell}
+
+
+def test_search_authors_by_name_with_items_loads_items_in_two_statements(
+    sql_session: Session,
+    sql_statements: list[str],
+) -> None:
+    media_type = MediaType(name="book")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=Bookcase(name="Bookcase A"))
+    for i in range(3):
+        author = Author(name=f"Author {i}")
+        for j in range(i + 1):
+            item = BookcaseItem(f"Book {i}-{j}", f"{i}{j}" * 5)
+            item.media_type = media_type
+            item.shelf = shelf
+            item.authors = {author}
+            sql_session.add(item)
+    sql_session.flush()
+    sql_session.expire_all()
+    sql_statements.clear()
+
+    result = search_authors_by_name_with_items(sql_session, "Author")
+    item_counts = {author.name: sum(item.amount for item in author.items) for author in result}
+
+    assert item_counts == {"Author 0": 1, "Author 1": 2, "Author 2": 3}
+    assert len(sql_statements) == 2
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.queries import list_bookcase_item_availability
+
+
+def _make_bookcase_items(sql_session: Session, amount: int) -> list[BookcaseItem]:
+    media_type = MediaType(name="Book")
+    bookcase = Bookcase(name="Bookcase")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=bookcase)
+    sql_session.add_all([media_type, bookcase, shelf])
+
+    items = []
+    for i in range(amount):
+        item = BookcaseItem(f"Book {i}", f"{i:010d}")
+        item.media_type = media_type
+        item.shelf = shelf
+        items.append(item)
+    sql_session.add_all(items)
+    sql_session.flush()
+    return items
+
+
+def test_list_bookcase_item_availability_counts_active_borrowings_and_waiting_queue(
+    sql_session: Session,
+) -> None:
+    [item, other_item] = _make_bookcase_items(sql_session, 2)
+    item.amount = 2
+    now = datetime.now()
+
+    active = BookcaseItemBorrowing("active", item)
+    active.end_time = now + timedelta(days=3)
+    later = BookcaseItemBorrowing("later", item)
+    later.end_time = now + timedelta(days=10)
+    delivered = BookcaseItemBorrowing("delivered", item)
+    delivered.end_time = now + timedelta(days=1)
+    delivered.delivered = now
+    waiting = BookcaseItemBorrowingQueue("waiting", item)
+    notified = BookcaseItemBorrowingQueue("notified", item)
+    notified.item_became_available_time = now
+    sql_session.add_all([active, later, delivered, waiting, notified])
+    sql_session.flush()
+
+    [availability, other_availability] = list_bookcase_item_availability(
+        sql_session,
+        item_uids=[item.uid, other_item.uid],
+    )
+
+    assert availability.item_uid == item.uid
+    assert availability.borrowed == 2
+    assert availability.available == 0
+    assert availability.queued == 1
+    assert availability.next_due == active.end_time
+
+    assert other_availability.item_uid == other_item.uid
+    assert other_availability.borrowed == 0
+    assert other_availability.available == 1
+    assert other_availability.queued == 0
+    assert other_availability.next_due is None
+
+
+def test_list_bookcase_item_availability_pages_by_uid(sql_session: Session) -> None:
+    items = _make_bookcase_items(sql_session, 5)
+
+    first_page = list_bookcase_item_availability(sql_session, limit=2)
+    second_page = list_bookcase_item_availability(
+        sql_session,
+        after_uid=first_page[-1].item_uid,
+        limit=2,
+    )
+
+    assert [a.item_uid for a in first_page + second_page] == [item.uid for item in items[:4]]
@@ -9,6 +9,7 @@ from worblehat.models import (
 from worblehat.queries.bookcase_item import (
     find_bookcase_item_by_isbn,
     find_bookcase_item_by_name,
+    list_bookcase_items_by_isbns,
     list_bookcase_items_by_owner,
     search_bookcase_item_owners,
     search_bookcase_items_by_title,
@@ -67,6 +68,16 @@ def test_find_bookcase_item_by_name_returns_none_when_missing(sql_session: Sessi
     assert result is None
 
 
+def test_list_bookcase_items_by_isbns_returns_only_matching_items(sql_session: Session) -> None:
+    item_a = _make_bookcase_item(sql_session, name="Book A", isbn="1111111111")
+    item_b = _make_bookcase_item(sql_session, name="Book B", isbn="2222222222")
+    _make_bookcase_item(sql_session, name="Book C", isbn="3333333333")
+
+    result = list_bookcase_items_by_isbns(sql_session, ["1111111111", "2222222222", "4444444444"])
+
+    assert set(result) == {item_a, item_b}
+
+
 def test_search_bookcase_items_by_title_matches_substring_case_insensitively(
     sql_session: Session,
 ) -> None:
@@ -86,6 +97,37 @@ def test_search_bookcase_items_by_title_returns_empty_when_no_match(sql_session:
     assert result == []
 
 
+def test_search_bookcase_items_by_title_ranks_closer_matches_first(sql_session: Session) -> None:
+    long_title = _make_bookcase_item(
+        sql_session,
+        name="A Very Long Book About Snakes, Lizards And Also Python",
+        isbn="1111111111",
+    )
+    exact_title = _make_bookcase_item(sql_session, name="Python", isbn="2222222222")
+
+    result = search_bookcase_items_by_title(sql_session, "python")
+
+    assert result == [exact_title, long_title]
+
+
+def test_search_bookcase_items_by_title_follows_renamed_items(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session, name="The Great Gatsby")
+    item.name = "Moby Dick"
+    sql_session.flush()
+
+    assert search_bookcase_items_by_title(sql_session, "gatsby") == []
+    assert search_bookcase_items_by_title(sql_session, "moby") == [item]
+
+
+def test_search_bookcase_items_by_title_matches_short_text(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session, name="C++ Primer", isbn="1111111111")
+    _make_bookcase_item(sql_session, name="Moby Dick", isbn="2222222222")
+
+    result = search_bookcase_items_by_title(sql_session, "c+")
+
+    assert result == [item]
+
+
 def test_search_bookcase_item_owners_matches_substring_case_insensitively(
     sql_session: Session,
 ) -> None:
@@ -1,10 +1,16 @@
 from sqlalchemy.orm import Session
 
-from worblehat.models import Bookcase, BookcaseShelf
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseShelf,
+    MediaType,
+)
 from worblehat.queries.bookcase_shelf import (
     find_bookcase_shelf,
     list_bookcase_shelf_positions,
     list_bookcase_shelfs_ordered,
+    list_bookcase_shelfs_with_items,
 )
 
 
@@ -90,3 +96,35 @@ def test_list_bookcase_shelf_positions_filters_by_row(sql_session: Session) -> N
     result = list_bookcase_shelf_positions(sql_session, bookcase, row=1)
 
     assert result == [(1, 1)]
+
+
+def test_list_bookcase_shelfs_with_items_loads_items_in_two_statements(
+    sql_session: Session,
+    sql_statements: list[str],
+) -> None:
+    media_type = MediaType(name="book")
+    bookcase = Bookcase(name="Bookcase A")
+    other_bookcase = Bookcase(name="Bookcase B")
+    sql_session.add_all(
+        [
+            media_type,
+            BookcaseShelf(row=0, column=0, bookcase=other_bookcase),
+        ],
+    )
+    for row in range(3):
+        shelf = BookcaseShelf(row=row, column=0, bookcase=bookcase)
+        for i in range(row + 1):
+            item = BookcaseItem(f"Book {row}-{i}", f"{row}{i}" * 5)
+            item.media_type = media_type
+            item.shelf = shelf
+            sql_session.add(item)
+    sql_session.flush()
+    sql_session.expire_all()
+    sql_session.refresh(bookcase)
+    sql_statements.clear()
+
+    result = list_bookcase_shelfs_with_items(sql_session, bookcase)
+    item_counts = [(shelf.row, len(shelf.items)) for shelf in result]
+
+    assert item_counts == [(0, 1), (1, 2), (2, 3)]
+    assert len(sql_statements) == 2
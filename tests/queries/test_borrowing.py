@@ -13,8 +13,10 @@ from worblehat.queries.borrowing import (
     has_active_borrowing,
     list_active_borrowings,
     list_active_borrowings_for_item,
+    list_active_borrowings_with_items,
     list_borrowings_for_isbn,
     list_overdue_borrowings,
+    list_overdue_borrowings_with_items,
 )
 
 
@@ -150,3 +152,41 @@ def test_list_overdue_borrowings_only_returns_undelivered_past_deadline(
     result = list_overdue_borrowings(sql_session)
 
     assert result == [overdue]
+
+
+def test_list_active_borrowings_with_items_loads_items_in_one_statement(
+    sql_session: Session,
+    sql_statements: list[str],
+) -> None:
+    for i in range(3):
+        item = _make_bookcase_item(sql_session, name=f"Book {i}", isbn=f"{i}" * 10)
+        sql_session.add(BookcaseItemBorrowing(f"user{i}", item))
+    sql_session.flush()
+    sql_session.expire_all()
+    sql_statements.clear()
+
+    result = list_active_borrowings_with_items(sql_session)
+    names = {borrowing.item.name for borrowing in result}
+
+    assert names == {"Book 0", "Book 1", "Book 2"}
+    assert len(sql_statements) == 1
+
+
+def test_list_overdue_borrowings_with_items_loads_items_in_one_statement(
+    sql_session: Session,
+    sql_statements: list[str],
+) -> None:
+    for i in range(3):
+        item = _make_bookcase_item(sql_session, name=f"Book {i}", isbn=f"{i}" * 10)
+        borrowing = BookcaseItemBorrowing(f"user{i}", item)
+        borrowing.end_time = datetime.now() - timedelta(days=i + 1)
+        sql_session.add(borrowing)
+    sql_session.flush()
+    sql_session.expire_all()
+    sql_statements.clear()
+
+    result = list_overdue_borrowings_with_items(sql_session)
+    names = [borrowing.item.name for borrowing in result]
+
+    assert names == ["Book 2", "Book 1", "Book 0"]
+    assert len(sql_statements) == 1
@@ -12,6 +12,7 @@ from worblehat.models import (
 from worblehat.queries.borrowing_queue import (
     is_in_borrowing_queue,
     list_all_queue_items,
+    list_all_queue_items_with_items,
     list_pending_queue_items_for_item,
 )
 
@@ -98,3 +99,21 @@ def test_list_pending_queue_items_for_item_scopes_to_item(sql_session: Session)
     result = list_pending_queue_items_for_item(sql_session, item_a)
 
     assert result == [queue_item_a]
+
+
+def test_list_all_queue_items_with_items_loads_items_in_one_statement(
+    sql_session: Session,
+    sql_statements: list[str],
+) -> None:
+    for i in range(3):
+        item = _make_bookcase_item(sql_session, name=f"Book {i}", isbn=f"{i}" * 10)
+        sql_session.add(BookcaseItemBorrowingQueue(f"user{i}", item))
+    sql_session.flush()
+    sql_session.expire_all()
+    sql_statements.clear()
+
+    result = list_all_queue_items_with_items(sql_session)
+    names = {queue_item.item.name for queue_item in result}
+
+    assert names == {"Book 0", "Book 1", "Book 2"}
+    assert len(sql_statements) == 1
@@ -12,6 +12,7 @@ from worblehat.models import (
     MediaType,
 )
 from worblehat.queries.deadline_daemon import (
+    expire_overdue_queue_positions,
     find_last_run,
     find_next_queue_position,
     list_close_deadline_borrowings,
@@ -342,3 +343,77 @@ def test_find_next_queue_position_returns_none_when_empty(sql_session: Session)
     result = find_next_queue_position(sql_session, item.uid)
 
     assert result is None
+
+
+def _make_queue(
+    sql_session: Session,
+    item: BookcaseItem,
+    now: datetime,
+) -> tuple[BookcaseItemBorrowingQueue, BookcaseItemBorrowingQueue, BookcaseItemBorrowingQueue]:
+    """Creates a queue with one overdue position, followed by two waiting users."""
+    overdue = BookcaseItemBorrowingQueue(f"overdue-{item.uid}", item)
+    overdue.entered_queue_time = now - timedelta(days=10)
+    overdue.item_became_available_time = now - timedelta(days=5)
+
+    first_waiting = BookcaseItemBorrowingQueue(f"first-{item.uid}", item)
+    first_waiting.entered_queue_time = now - timedelta(days=9)
+
+    second_waiting = BookcaseItemBorrowingQueue(f"second-{item.uid}", item)
+    second_waiting.entered_queue_time = now - timedelta(days=8)
+
+    sql_session.add_all([overdue, first_waiting, second_waiting])
+    sql_session.flush()
+    return overdue, first_waiting, second_waiting
+
+
+def test_expire_overdue_queue_positions_promotes_next_waiter_per_item(
+    sql_session: Session,
+) -> None:
+    now = datetime.now()
+    item_a = _make_bookcase_item(sql_session, name="Book A", isbn="1111111111")
+    item_b = _make_bookcase_item(sql_session, name="Book B", isbn="2222222222")
+    overdue_a, first_a, second_a = _make_queue(sql_session, item_a, now)
+    overdue_b, first_b, second_b = _make_queue(sql_session, item_b, now)
+    overdue_b.item_became_available_time = now
+
+    expired, promoted = expire_overdue_queue_positions(
+        sql_session,
+        queue_position_expiry_days=1,
+        current_run_datetime=now,
+    )
+
+    assert expired == [overdue_a]
+    assert promoted == [first_a]
+    assert overdue_a.expired
+    assert first_a.item_became_available_time == now
+    assert second_a.item_became_available_time is None
+    assert not overdue_b.expired
+    assert first_b.item_became_available_time is None
+    assert item_a.pending_queue_count == 1
+    assert item_b.pending_queue_count == 2
+
+
+def test_expire_overdue_queue_positions_uses_constant_amount_of_statements(
+    sql_session: Session,
+    sql_statements: list[str],
+) -> None:
+    now = datetime.now()
+    for i in range(5):
+        item = _make_bookcase_item(sql_session, name=f"Book {i}", isbn=f"{i}" * 10)
+        _make_queue(sql_session, item, now)
+    sql_session.expire_all()
+    sql_statements.clear()
+
+    expired, promoted = expire_overdue_queue_positions(
+        sql_session,
+        queue_position_expiry_days=1,
+        current_run_datetime=now,
+    )
+    for queue_position in [*expired, *promoted]:
+        _ = queue_position.item.name, queue_position.item.pending_queue_count
+
+    assert len(expired) == 5
+    assert {queue_position.username for queue_position in promoted} == {
+        f"first-{queue_position.fk_bookcase_item_uid}" for queue_position in expired
+    }
+    assert len(sql_statements) == 5
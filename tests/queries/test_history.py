@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.queries import list_borrowing_history, list_queue_position_history
+from worblehat.services.archive import archive_history
+
+NOW = datetime.now()
+
+
+def _make_bookcase_item(sql_session: Session) -> BookcaseItem:
+    media_type = MediaType(name="Book")
+    bookcase = Bookcase(name="Bookcase")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=bookcase)
+    item = BookcaseItem("Some Book", "1234567890")
+    item.media_type = media_type
+    item.shelf = shelf
+    sql_session.add_all([media_type, bookcase, shelf, item])
+    sql_session.flush()
+    return item
+
+
+def _archive_old_rows(sql_session: Session) -> None:
+    sql_session.commit()
+    archive_history(
+        sql_session,
+        borrowing_cutoff=NOW - timedelta(days=365),
+        queue_position_cutoff=NOW - timedelta(days=90),
+    )
+
+
+def test_list_borrowing_history_spans_current_and_archived(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session)
+    for username, days_ago, delivered_days_ago in [
+        ("archived", 800, 790),
+        ("delivered", 100, 90),
+        ("active", 5, None),
+    ]:
+        borrowing = BookcaseItemBorrowing(username, item)
+        borrowing.start_time = NOW - timedelta(days=days_ago)
+        if delivered_days_ago is not None:
+            borrowing.delivered = NOW - timedelta(days=delivered_days_ago)
+        sql_session.add(borrowing)
+    _archive_old_rows(sql_session)
+
+    history = list_borrowing_history(sql_session, item_uid=item.uid)
+
+    assert [(b.username, b.archived) for b in history] == [
+        ("active", False),
+        ("delivered", False),
+        ("archived", True),
+    ]
+
+    recent = list_borrowing_history(
+        sql_session,
+        username="archived",
+        since=NOW - timedelta(days=365),
+    )
+    assert recent == []
+
+
+def test_list_queue_position_history_spans_current_and_archived(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session)
+    expired = BookcaseItemBorrowingQueue("expired", item)
+    expired.entered_queue_time = NOW - timedelta(days=200)
+    expired.item_became_available_time = NOW - timedelta(days=190)
+    expired.expired = True
+    waiting = BookcaseItemBorrowingQueue("waiting", item)
+    sql_session.add_all([expired, waiting])
+    _archive_old_rows(sql_session)
+
+    history = list_queue_position_history(sql_session, item_uid=item.uid)
+
+    assert [(q.username, q.expired, q.archived) for q in history] == [
+        ("waiting", False, False),
+        ("expired", True, True),
+    ]
+    assert [
+        q.username
+        for q in list_queue_position_history(
+            sql_session,
+            item_uid=item.uid,
+            since=NOW - timedelta(days=30),
+        )
+    ] == ["waiting"]
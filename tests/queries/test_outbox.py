@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from worblehat.models import OutboxEmail
+from worblehat.queries.outbox import list_pending_outbox_emails
+
+
+def test_list_pending_outbox_emails_skips_sent_future_and_exhausted(sql_session: Session) -> None:
+    now = datetime.now()
+
+    due = OutboxEmail("alice@pvv.ntnu.no", "Subject", "Body")
+    due.next_attempt_time = now - timedelta(minutes=1)
+
+    sent = OutboxEmail("bob@pvv.ntnu.no", "Subject", "Body")
+    sent.next_attempt_time = now - timedelta(minutes=1)
+    sent.sent_time = now
+
+    backing_off = OutboxEmail("carol@pvv.ntnu.no", "Subject", "Body")
+    backing_off.next_attempt_time = now + timedelta(minutes=1)
+
+    exhausted = OutboxEmail("dave@pvv.ntnu.no", "Subject", "Body")
+    exhausted.next_attempt_time = now - timedelta(minutes=1)
+    exhausted.attempts = 3
+
+    sql_session.add_all([due, sent, backing_off, exhausted])
+    sql_session.flush()
+
+    result = list_pending_outbox_emails(sql_session, now, max_attempts=3)
+
+    assert result == [due]
+
+
+def test_list_pending_outbox_emails_orders_by_next_attempt_time(sql_session: Session) -> None:
+    now = datetime.now()
+
+    later = OutboxEmail("alice@pvv.ntnu.no", "Subject", "Body")
+    later.next_attempt_time = now - timedelta(minutes=1)
+
+    sooner = OutboxEmail("bob@pvv.ntnu.no", "Subject", "Body")
+    sooner.next_attempt_time = now - timedelta(minutes=2)
+
+    sql_session.add_all([later, sooner])
+    sql_session.flush()
+
+    result = list_pending_outbox_emails(sql_session, now, max_attempts=3, limit=1)
+
+    assert result == [sooner]
@@ -0,0 +1,39 @@
+from sqlalchemy.orm import Session
+
+from worblehat.devscripts.benchmark_queries import (
+    benchmark_queries,
+    compare_with_baseline,
+    query_function_names,
+)
+from worblehat.devscripts.seed_large_library import seed_large_library
+
+
+def test_benchmark_covers_every_query(sql_session: Session) -> None:
+    seed_large_library(sql_session, items=200, borrowings=2_000, queue_entries=100)
+
+    timings = benchmark_queries(sql_session, repeat=1)
+
+    assert list(timings.keys()) == query_function_names()
+    assert timings["list_active_borrowings"].rows > 0
+    assert timings["search_bookcase_items"].rows > 0
+
+
+def test_compare_with_baseline_reports_slower_queries() -> None:
+    def results(median_ms: float) -> dict:
+        return {
+            "databases": {
+                "sqlite": {
+                    "library": {"BookcaseItem": 10},
+                    "queries": {
+                        "list_active_borrowings": {"median_ms": median_ms, "min_ms": 0, "rows": 0},
+                        "find_last_run": {"median_ms": 0.1, "min_ms": 0, "rows": 0},
+                    },
+                },
+            },
+        }
+
+    regressions = compare_with_baseline(results(50.0), results(10.0), tolerance=1.5)
+    assert len(regressions) == 1
+    assert "list_active_borrowings" in regressions[0]
+
+    assert compare_with_baseline(results(12.0), results(10.0), tolerance=1.5) == []
@@ -0,0 +1,144 @@
+import re
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingQueue,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.queries.borrowing import (
+    has_active_borrowing,
+    list_active_borrowings,
+    list_active_borrowings_for_item,
+    list_overdue_borrowings,
+)
+from worblehat.queries.borrowing_queue import list_pending_queue_items_for_item
+from worblehat.queries.deadline_daemon import (
+    find_next_queue_position,
+    list_close_deadline_borrowings,
+    list_expiring_queue_positions,
+    list_newly_available_queue_items,
+    list_overdue_queue_positions,
+    list_undelivered_overdue_borrowings,
+)
+
+NOW = datetime.now()
+
+# A full table scan of one of these tables, as reported by EXPLAIN QUERY PLAN
+FULL_SCAN = re.compile(r"^SCAN (BookcaseItemBorrowing|BookcaseItemBorrowingQueue)$")
+
+# The same, as reported by PostgreSQL's EXPLAIN
+POSTGRESQL_FULL_SCAN = re.compile(
+    r'Seq Scan on "(BookcaseItemBorrowing|BookcaseItemBorrowingQueue)"',
+)
+
+QUERIES: dict[str, Callable[[Session, BookcaseItem], Any]] = {
+    "has_active_borrowing": lambda s, item: has_active_borrowing(s, "alice", item),
+    "list_active_borrowings": lambda s, _item: list_active_borrowings(s),
+    "list_active_borrowings_for_item": lambda s, item: list_active_borrowings_for_item(s, item),
+    "list_overdue_borrowings": lambda s, _item: list_overdue_borrowings(s),
+    "list_pending_queue_items_for_item": lambda s, item: list_pending_queue_items_for_item(
+        s,
+        item,
+    ),
+    "find_next_queue_position": lambda s, item: find_next_queue_position(s, item.uid),
+    "list_close_deadline_borrowings": lambda s, _item: list_close_deadline_borrowings(
+        s,
+        1,
+        NOW - timedelta(days=1),
+        NOW,
+    ),
+    "list_expiring_queue_positions": lambda s, _item: list_expiring_queue_positions(
+        s,
+        NOW - timedelta(days=1),
+        NOW,
+    ),
+    "list_newly_available_queue_items": lambda s, _item: list_newly_available_queue_items(
+        s,
+        NOW - timedelta(days=1),
+        NOW,
+    ),
+    "list_overdue_queue_positions": lambda s, _item: list_overdue_queue_positions(s, 14, NOW),
+    "list_undelivered_overdue_borrowings": lambda s, _item: list_undelivered_overdue_borrowings(
+        s,
+        NOW,
+    ),
+}
+
+
+def _make_library(sql_session: Session) -> BookcaseItem:
+    media_type = MediaType(name="book")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=Bookcase(name="Bookcase A"))
+    items = []
+    for i in range(10):
+        item = BookcaseItem(f"Book {i}", f"{i}" * 10)
+        item.media_type = media_type
+        item.shelf = shelf
+        items.append(item)
+
+        borrowing = BookcaseItemBorrowing(f"user{i}", item)
+        borrowing.end_time = NOW + timedelta(days=i - 5)
+        if i % 2 == 0:
+            borrowing.delivered = NOW - timedelta(hours=i)
+
+        queue_position = BookcaseItemBorrowingQueue(f"user{i}", item)
+        if i % 3 == 0:
+            queue_position.item_became_available_time = NOW - timedelta(days=i)
+
+        sql_session.add_all([item, borrowing, queue_position])
+    sql_session.flush()
+    return items[0]
+
+
+def _record_select_statements(sql_session: Session, query_name: str) -> list[tuple[str, Any]]:
+    item = _make_library(sql_session)
+
+    statements: list[tuple[str, Any]] = []
+
+    def record_statement(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = sql_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        QUERIES[query_name](sql_session, item)
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    assert len(statements) > 0
+    return statements
+
+
+@pytest.mark.parametrize("query_name", QUERIES.keys())
+def test_query_uses_indices(sql_session: Session, query_name: str) -> None:
+    statements = _record_select_statements(sql_session, query_name)
+
+    connection = sql_session.connection()
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        full_scans = [row.detail for row in plan if FULL_SCAN.match(row.detail)]
+        assert full_scans == [], f"{statement}\n{[row.detail for row in plan]}"
+
+
+@pytest.mark.parametrize("query_name", QUERIES.keys())
+def test_query_uses_postgresql_indices(postgresql_session: Session, query_name: str) -> None:
+    statements = _record_select_statements(postgresql_session, query_name)
+
+    connection = postgresql_session.connection()
+    # NOTE: The tables are far too small for an index to beat a sequential scan,
+    #       so sequential scans are only planned when there is no usable index.
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).scalars().all()
+        full_scans = [line for line in plan if POSTGRESQL_FULL_SCAN.search(line)]
+        assert full_scans == [], f"{statement}\n" + "\n".join(plan)
@@ -0,0 +1,124 @@
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Author,
+    Bookcase,
+    BookcaseItem,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.queries.search import search_bookcase_items
+
+
+def _make_bookcase_item(
+    sql_session: Session,
+    name: str = "Some Book",
+    isbn: str = "1234567890",
+    owner: str = "PVV",
+    shelf_description: str | None = None,
+) -> BookcaseItem:
+    media_type = MediaType(name=f"Media type for {name}")
+    bookcase = Bookcase(name=f"Bookcase for {name}")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=bookcase, description=shelf_description)
+    sql_session.add_all([media_type, bookcase, shelf])
+    sql_session.flush()
+
+    item = BookcaseItem(name, isbn, owner)
+    item.media_type = media_type
+    item.shelf = shelf
+    sql_session.add(item)
+    sql_session.flush()
+    return item
+
+
+def test_search_bookcase_items_matches_every_kind_of_field(sql_session: Session) -> None:
+    by_title = _make_bookcase_item(sql_session, name="Compiler Construction", isbn="1111111111")
+    by_author = _make_bookcase_item(sql_session, name="Some Book", isbn="2222222222")
+    by_author.authors = {Author("Niklaus Compilerson")}
+    by_owner = _make_bookcase_item(
+        sql_session,
+        name="Another Book",
+        isbn="3333333333",
+        owner="compilerfan",
+    )
+    by_shelf = _make_bookcase_item(
+        sql_session,
+        name="Yet Another Book",
+        isbn="4444444444",
+        shelf_description="Compilers and interpreters",
+    )
+    _make_bookcase_item(sql_session, name="Unrelated", isbn="5555555555")
+    sql_session.flush()
+
+    result = search_bookcase_items(sql_session, "compiler")
+
+    assert set(result) == {by_title, by_author, by_owner, by_shelf}
+    assert result[0] is by_title
+
+
+def test_search_bookcase_items_matches_isbn_prefix(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session, isbn="9780131103627")
+    _make_bookcase_item(sql_session, name="Other Book", isbn="9781234567897")
+
+    result = search_bookcase_items(sql_session, "978-013")
+
+    assert result == [item]
+
+
+def test_search_bookcase_items_lists_each_item_once(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session, name="Python Tricks", owner="pythonista")
+    item.authors = {Author("Monty Python")}
+    sql_session.flush()
+
+    result = search_bookcase_items(sql_session, "python")
+
+    assert result == [item]
+
+
+def test_search_bookcase_items_interleaves_best_matches(sql_session: Session) -> None:
+    short_title = _make_bookcase_item(sql_session, name="Rust", isbn="1111111111")
+    long_title = _make_bookcase_item(
+        sql_session,
+        name="The Rust Programming Language, Second Edition",
+        isbn="2222222222",
+    )
+    by_owner = _make_bookcase_item(
+        sql_session,
+        name="Some Book",
+        isbn="3333333333",
+        owner="rustacean",
+    )
+
+    result = search_bookcase_items(sql_session, "rust")
+
+    assert result == [short_title, by_owner, long_title]
+
+
+def test_search_bookcase_items_follows_updates_of_indexed_columns(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session, name="Compiler Construction")
+    item.amount = 2
+    sql_session.flush()
+
+    assert search_bookcase_items(sql_session, "compiler") == [item]
+
+    item.name = "Structure and Interpretation"
+    sql_session.flush()
+
+    assert search_bookcase_items(sql_session, "compiler") == []
+    assert search_bookcase_items(sql_session, "interpretation") == [item]
+
+
+def test_search_bookcase_items_breaks_ties_by_the_source_of_the_best_match(
+    sql_session: Session,
+) -> None:
+    by_title = _make_bookcase_item(sql_session, name="Rust", isbn="1111111111")
+    by_owner_and_title = _make_bookcase_item(
+        sql_session,
+        name="A Book on Rust Programming",
+        isbn="2222222222",
+        owner="rustacean",
+    )
+
+    result = search_bookcase_items(sql_session, "rust")
+
+    assert result == [by_title, by_owner_and_title]
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseItemBorrowing,
+    BookcaseItemBorrowingHistory,
+    BookcaseItemBorrowingQueue,
+    BookcaseItemBorrowingQueueHistory,
+    BookcaseShelf,
+    MediaType,
+)
+from worblehat.services.archive import archive_history
+
+NOW = datetime.now()
+
+
+def _make_bookcase_item(sql_session: Session) -> BookcaseItem:
+    media_type = MediaType(name="Book")
+    bookcase = Bookcase(name="Bookcase")
+    shelf = BookcaseShelf(row=0, column=0, bookcase=bookcase)
+    item = BookcaseItem("Some Book", "1234567890")
+    item.media_type = media_type
+    item.shelf = shelf
+    sql_session.add_all([media_type, bookcase, shelf, item])
+    sql_session.flush()
+    return item
+
+
+def _make_borrowing(
+    sql_session: Session,
+    item: BookcaseItem,
+    username: str,
+    delivered: datetime | None,
+) -> BookcaseItemBorrowing:
+    borrowing = BookcaseItemBorrowing(username, item)
+    borrowing.delivered = delivered
+    sql_session.add(borrowing)
+    sql_session.flush()
+    return borrowing
+
+
+def test_archive_moves_only_old_closed_rows(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session)
+    old = _make_borrowing(sql_session, item, "old", NOW - timedelta(days=400))
+    _make_borrowing(sql_session, item, "recent", NOW - timedelta(days=10))
+    _make_borrowing(sql_session, item, "active", None)
+
+    expired = BookcaseItemBorrowingQueue("expired", item)
+    expired.item_became_available_time = NOW - timedelta(days=100)
+    expired.expired = True
+    offered = BookcaseItemBorrowingQueue("offered", item)
+    offered.item_became_available_time = NOW - timedelta(days=100)
+    waiting = BookcaseItemBorrowingQueue("waiting", item)
+    sql_session.add_all([expired, offered, waiting])
+    sql_session.commit()
+    old_uid, expired_uid = old.uid, expired.uid
+
+    report = archive_history(
+        sql_session,
+        borrowing_cutoff=NOW - timedelta(days=365),
+        queue_position_cutoff=NOW - timedelta(days=90),
+    )
+
+    assert (report.borrowings, report.queue_positions) == (1, 1)
+    assert set(sql_session.scalars(select(BookcaseItemBorrowing.username)).all()) == {
+        "recent",
+        "active",
+    }
+    assert set(sql_session.scalars(select(BookcaseItemBorrowingQueue.username)).all()) == {
+        "offered",
+        "waiting",
+    }
+
+    [archived_borrowing] = sql_session.scalars(select(BookcaseItemBorrowingHistory)).all()
+    assert archived_borrowing.uid == old_uid
+    assert archived_borrowing.username == "old"
+    [archived_position] = sql_session.scalars(select(BookcaseItemBorrowingQueueHistory)).all()
+    assert archived_position.uid == expired_uid
+    assert archived_position.expired
+
+
+def test_archive_works_in_batches(sql_session: Session) -> None:
+    item = _make_bookcase_item(sql_session)
+    for i in range(5):
+        _make_borrowing(sql_session, item, f"user{i}", NOW - timedelta(days=400))
+    sql_session.commit()
+
+    report = archive_history(
+        sql_session,
+        borrowing_cutoff=NOW - timedelta(days=365),
+        queue_position_cutoff=NOW - timedelta(days=90),
+        batch_size=2,
+    )
+
+    assert report.borrowings == 5
+    assert sql_session.scalar(select(func.count()).select_from(BookcaseItemBorrowing)) == 0
+    assert sql_session.scalar(select(func.count()).select_from(BookcaseItemBorrowingHistory)) == 5
@@ -0,0 +1,232 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from worblehat.book_data_fetchers.BookData import BookData
+from worblehat.models import (
+    Bookcase,
+    BookcaseItem,
+    BookcaseShelf,
+    Language,
+    MediaType,
+)
+from worblehat.services import bulk_import
+from worblehat.services.bulk_import import (
+    BulkImporter,
+    ImportRow,
+    _parse_shelf_position,
+    read_import_rows,
+)
+
+DATA_DIR = Path(__file__).parents[2] / "data"
+
+
+@pytest.fixture
+def media_type(sql_session: Session) -> MediaType:
+    media_type = MediaType(name="book")
+    bookcase = Bookcase(name="arbeidsrom_smal")
+    sql_session.add_all(
+        [
+            media_type,
+            bookcase,
+            BookcaseShelf(row=5, column=0, bookcase=bookcase),
+            BookcaseShelf(row=2, column=1, bookcase=bookcase),
+            Language("English", "en"),
+        ],
+    )
+    sql_session.commit()
+    return media_type
+
+
+def _row(
+    isbn: str,
+    shelf: str = "5",
+    bookcase: str = "arbeidsrom_smal",
+    **kwargs: object,
+) -> ImportRow:
+    return ImportRow(source=f"test:{isbn}", isbn=isbn, bookcase=bookcase, shelf=shelf, **kwargs)
+
+
+def _items(sql_session: Session) -> dict[str, BookcaseItem]:
+    return {item.isbn: item for item in sql_session.scalars(select(BookcaseItem))}
+
+
+def test_csv_rows_are_read() -> None:
+    rows = list(read_import_rows([DATA_DIR / "arbeidsrom_smal_hylle_5.csv"]))
+
+    assert rows[0] == ImportRow(
+        source="arbeidsrom_smal_hylle_5.csv:2",
+        isbn="9780486809038",
+        bookcase="arbeidsrom_smal",
+        shelf="5",
+        note="emily riehl",
+    )
+
+
+def test_csv_isbns_are_normalized(tmp_path: Path) -> None:
+    path = tmp_path / "inventory.csv"
+    path.write_text("isbn,note,bookcase,shelf\n978-0-486-80903-8 ,,arbeidsrom_smal,1-2\n")
+
+    [row] = read_import_rows([path])
+
+    assert row.isbn == "9780486809038"
+    assert row.shelf == "1-2"
+    assert row.note is None
+
+
+def test_jsonl_rows_are_read() -> None:
+    rows = list(read_import_rows([DATA_DIR / "arbeidsrom_smal_hylle_5.jsonl"]))
+
+    assert rows[0].source == "arbeidsrom_smal_hylle_5.jsonl:1"
+    assert rows[0].title == "Category Theory in Context"
+    assert rows[0].authors == {"Emily Riehl"}
+    assert rows[0].language == "English"
+    assert rows[1].authors == {"Elwyn R. Berlekamp", "John H. Conway", "Richard K. Guy"}
+    assert rows[1].language == "en"
+
+
+def test_unsupported_files_are_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        list(read_import_rows([tmp_path / "inventory.xlsx"]))
+
+
+@pytest.mark.parametrize(
+    ("shelf", "position"),
+    [("5", (0, 5)), ("1-2", (1, 2)), ("0-10", (0, 10))],
+)
+def test_shelf_positions_are_parsed(shelf: str, position: tuple[int, int]) -> None:
+    assert _parse_shelf_position(shelf) == position
+
+
+@pytest.mark.parametrize("shelf", ["top", "1-", "-"])
+def test_invalid_shelf_positions_are_rejected(shelf: str) -> None:
+    with pytest.raises(ValueError):
+        _parse_shelf_position(shelf)
+
+
+def test_items_are_imported(sql_session: Session, media_type: MediaType) -> None:
+    importer = BulkImporter(sql_session, media_type, fetch_metadata=False)
+    report = importer.run(read_import_rows([DATA_DIR / "arbeidsrom_smal_hylle_5.jsonl"]))
+
+    items = _items(sql_session)
+    assert report.created == len(items) > 0
+    assert report.errors == []
+    item = items["9780486809038"]
+    assert item.name == "Category Theory in Context"
+    assert {author.name for author in item.authors} == {"Emily Riehl"}
+    assert item.language.iso639_1_code == "en"
+    assert (item.shelf.column, item.shelf.row) == (0, 5)
+    assert item.media_type == media_type
+
+
+def test_repeated_isbns_are_extra_copies_of_new_items_only(
+    sql_session: Session,
+    media_type: MediaType,
+) -> None:
+    shelf = sql_session.scalars(select(BookcaseShelf)).first()
+    existing = BookcaseItem("Winning Ways", "9781568811307")
+    existing.media_type = media_type
+    existing.shelf = shelf
+    sql_session.add(existing)
+    sql_session.commit()
+
+    importer = BulkImporter(sql_session, media_type, fetch_metadata=False, batch_size=2)
+    report = importer.run(
+        [
+            _row("9780486809038", title="Category Theory in Context"),
+            _row("9781568811307", title="Winning Ways"),
+            _row("9780486809038", title="Category Theory in Context"),
+            _row("9781568811307", title="Winning Ways"),
+            _row("9780486809038", shelf="1-2", title="Category Theory in Context"),
+        ],
+    )
+
+    items = _items(sql_session)
+    assert report.created == 1
+    assert report.extra_copies == 2
+    assert report.already_existing == ["9781568811307"]
+    assert items["9780486809038"].amount == 3
+    assert items["9781568811307"].amount == 1
+
+
+def test_invalid_rows_are_reported_without_aborting(
+    sql_session: Session,
+    media_type: MediaType,
+) -> None:
+    importer = BulkImporter(sql_session, media_type, fetch_metadata=False)
+    report = importer.run(
+        [
+            _row("1234", note="not an isbn"),
+            _row("9780486809038", bookcase="missing", note="unknown bookcase"),
+            _row("9780486809038", shelf="3", note="unknown shelf"),
+            _row("9780486809038", shelf="top", note="invalid shelf"),
+            _row("9780486458731"),
+            _row("9781568811307", note="winning ways"),
+        ],
+    )
+
+    assert report.errors == [
+        "test:1234: invalid ISBN '1234'",
+        "test:9780486809038: no shelf '5' in bookcase 'missing'",
+        "test:9780486809038: no shelf '3' in bookcase 'arbeidsrom_smal'",
+        "test:9780486809038: invalid shelf 'top'",
+        "test:9780486458731: could not find metadata for ISBN '9780486458731'",
+    ]
+    # Rows without metadata are named after their note
+    assert report.without_metadata == ["9781568811307"]
+    assert list(_items(sql_session)) == ["9781568811307"]
+    assert _items(sql_session)["9781568811307"].name == "winning ways"
+
+
+def test_missing_metadata_is_fetched(
+    sql_session: Session,
+    media_type: MediaType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fetched_isbns = []
+
+    def fetch(isbn: str, first_good: bool = False) -> list[BookData]:
+        fetched_isbns.append(isbn)
+        return [
+            BookData(
+                isbn=isbn,
+                title="Winning Ways",
+                source="fake",
+                authors={"John H. Conway"},
+                language="en",
+                publish_date=None,
+                num_pages=None,
+                subjects=set(),
+            ),
+        ]
+
+    monkeypatch.setattr(bulk_import, "fetch_book_data_from_multiple_sources", fetch)
+
+    importer = BulkImporter(sql_session, media_type)
+    importer.run([_row("9781568811307", note="winning ways"), _row("9781568811307")])
+
+    item = _items(sql_session)["9781568811307"]
+    assert fetched_isbns == ["9781568811307"]
+    assert item.name == "Winning Ways"
+    assert {author.name for author in item.authors} == {"John H. Conway"}
+    assert item.amount == 2
+
+
+def test_each_batch_is_committed(sql_session: Session, media_type: MediaType) -> None:
+    commits = []
+
+    def record_commit(session: Session) -> None:
+        commits.append(session)
+
+    event.listen(sql_session, "after_commit", record_commit)
+
+    importer = BulkImporter(sql_session, media_type, fetch_metadata=False, batch_size=2)
+    report = importer.run(
+        [_row("9780486809038", title=f"Copy {i}") for i in range(5)],
+    )
+
+    event.remove(sql_session, "after_commit", record_commit)
+    assert len(commits) == 3
+    assert report.created + report.extra_copies == 5
@@ -0,0 +1,76 @@
+import tomllib
+from pathlib import Path
+
+import pytest
+
+from worblehat.services.config_snapshot import ConfigError, ConfigSnapshot
+
+CONFIG_TEMPLATE = Path(__file__).parents[2] / "config-template.toml"
+
+
+def _load_template() -> dict:
+    with CONFIG_TEMPLATE.open("rb") as config_file:
+        return tomllib.load(config_file)
+
+
+def test_config_template_is_valid() -> None:
+    config = ConfigSnapshot.from_dict(_load_template())
+
+    assert config.deadline_daemon.warn_days_before_borrowing_deadline == (5, 1)
+    assert config.database.url.startswith("sqlite:///")
+    assert config.database.pool.engine_options()["pool_pre_ping"] is True
+    assert config.response_cache.path == Path.home() / ".cache/worblehat/response_cache.sqlite"
+
+
+def test_options_added_since_the_first_release_have_defaults() -> None:
+    raw = _load_template()
+    for section in ["web_server", "book_data_cache", "response_cache", "archive"]:
+        del raw[section]
+    del raw["database"]["pool"]
+    for section, option in [
+        ("logging", "profile_sql"),
+        ("logging", "profile_sql_file"),
+        ("smtp", "max_attempts"),
+        ("smtp", "retry_backoff_seconds"),
+        ("deadline_daemon", "commit_batch_size"),
+        ("deadline_daemon", "interval_seconds"),
+        ("deadline_daemon", "jitter_seconds"),
+        ("deadline_daemon", "lock_file"),
+    ]:
+        del raw[section][option]
+
+    assert ConfigSnapshot.from_dict(raw) == ConfigSnapshot.from_dict(_load_template())
+
+
+def test_invalid_values_are_all_reported() -> None:
+    raw = _load_template()
+    raw["deadline_daemon"]["warn_days_before_borrowing_deadline"] = [5, "1"]
+    raw["deadline_daemon"]["commit_batch_size"] = -1
+    raw["smtp"]["port"] = "587"
+    del raw["logging"]["debug"]
+
+    with pytest.raises(ConfigError) as err:
+        ConfigSnapshot.from_dict(raw)
+
+    message = str(err.value)
+    assert "deadline_daemon.warn_days_before_borrowing_deadline" in message
+    assert "deadline_daemon.commit_batch_size" in message
+    assert "smtp.port" in message
+    assert "'logging.debug' is missing" in message
+
+
+def test_secrets_are_read_from_files_once(tmp_path: Path) -> None:
+    password_file = tmp_path / "smtp-password"
+    password_file.write_text("hunter2\n")
+
+    raw = _load_template()
+    raw["smtp"]["enabled"] = True
+    raw["smtp"]["password"] = str(password_file)
+    raw["database"]["type"] = "postgresql"
+    raw["database"]["postgresql"]["password"] = "plain text"  # noqa: S105
+    config = ConfigSnapshot.from_dict(raw)
+    password_file.unlink()
+
+    assert config.smtp.password == "hunter2"  # noqa: S105
+    assert ":plain text@" in config.database.url
+    assert "<password>" in config.database.url_no_password
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from worblehat.models import Base, OutboxEmail
+from worblehat.services.config_snapshot import ConfigSnapshot
+from worblehat.services.email import send_outbox_emails
+
+
+class RecordingTransport:
+    def __init__(self) -> None:
+        self.recipients: list[str] = []
+        self.on_send = None
+
+    def send(self, msg: MIMEMultipart) -> bool:
+        self.recipients.append(msg["To"])
+        if self.on_send is not None:
+            on_send, self.on_send = self.on_send, None
+            on_send()
+        return True
+
+
+def test_overlapping_runs_send_every_mail_once(tmp_path: Path, config: ConfigSnapshot) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.sqlite'}")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as sql_session:
+        for recipient in ["alice@pvv.ntnu.no", "bob@pvv.ntnu.no", "carol@pvv.ntnu.no"]:
+            email = OutboxEmail(recipient, "Subject", "Body")
+            email.next_attempt_time = datetime.now() - timedelta(minutes=1)
+            sql_session.add(email)
+        sql_session.commit()
+
+    transport = RecordingTransport()
+    overlapping_reports = []
+
+    def run_overlapping_send_mail() -> None:
+        with Session(engine) as other_session:
+            overlapping_reports.append(send_outbox_emails(other_session, transport=transport))
+
+    # The second run starts while the first one is sending its first mail
+    transport.on_send = run_overlapping_send_mail
+    with Session(engine) as sql_session:
+        report = send_outbox_emails(sql_session, transport=transport)
+
+        assert sorted(transport.recipients) == [
+            "alice@pvv.ntnu.no",
+            "bob@pvv.ntnu.no",
+            "carol@pvv.ntnu.no",
+        ]
+        assert len(report.sent) + len(overlapping_reports[0].sent) == 3
+        assert all(
+            email.sent_time is not None and email.attempts == 1
+            for email in sql_session.scalars(select(OutboxEmail))
+        )
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from worblehat.models import Bookcase, BookcaseShelf
+from worblehat.services.response_cache import ResponseCache
+
+
+def _store(cache: ResponseCache, key: str, tables: tuple[str, ...], body: bytes) -> None:
+    cache.store(key, tables, cache.generations(tables), body, "application/json")
+
+
+def test_least_recently_used_responses_are_evicted() -> None:
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    for key in ["a", "b"]:
+        _store(cache, key, ("Bookcase",), key.encode())
+
+    assert cache.lookup("a", ("Bookcase",)).body == b"a"
+    _store(cache, "c", ("Bookcase",), b"c")
+
+    assert cache.lookup("b", ("Bookcase",)) is None
+    assert cache.lookup("a", ("Bookcase",)) is not None
+    assert cache.lookup("c", ("Bookcase",)) is not None
+
+
+def test_commits_invalidate_responses_using_the_changed_tables(sql_session: Session) -> None:
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    cache.attach(sql_session)
+    _store(cache, "bookcases", ("Bookcase",), b"[]")
+    _store(cache, "shelves", ("BookcaseShelf",), b"[]")
+
+    sql_session.add(Bookcase(name="Bookcase"))
+    sql_session.flush()
+    assert cache.lookup("bookcases", ("Bookcase",)) is not None
+    sql_session.rollback()
+    assert cache.lookup("bookcases", ("Bookcase",)) is not None
+
+    sql_session.add(Bookcase(name="Bookcase"))
+    sql_session.commit()
+    assert cache.lookup("bookcases", ("Bookcase",)) is None
+    assert cache.lookup("shelves", ("BookcaseShelf",)) is not None
+
+    # Bulk statements bypass the flush
+    sql_session.execute(update(BookcaseShelf).values(description="Moved"))
+    sql_session.commit()
+    assert cache.lookup("shelves", ("BookcaseShelf",)) is None
+
+    cache.detach(sql_session)
+
+
+def test_file_tier_is_shared_between_processes(tmp_path: Path) -> None:
+    web_worker = ResponseCache(max_entries=10, ttl_seconds=60, path=tmp_path / "responses.sqlite")
+    other_worker = ResponseCache(max_entries=10, ttl_seconds=60, path=tmp_path / "responses.sqlite")
+    _store(web_worker, "bookcases", ("Bookcase",), b"[]")
+
+    assert other_worker.lookup("bookcases", ("Bookcase",)).body == b"[]"
+
+    # E.g. a commit from the CLI
+    other_worker.invalidate(["Bookcase"])
+    assert web_worker.lookup("bookcases", ("Bookcase",)) is None
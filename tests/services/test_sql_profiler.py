@@ -0,0 +1,61 @@
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from worblehat.models import Bookcase
+from worblehat.services.sql_profiler import SqlProfiler
+
+
+def test_statements_are_recorded_in_the_innermost_scope(sql_session: Session) -> None:
+    profiler = SqlProfiler()
+    profiler.attach(sql_session.get_bind())
+
+    with profiler.scope("outer"):
+        sql_session.execute(select(Bookcase))
+        with profiler.scope("inner"):
+            sql_session.execute(select(Bookcase))
+            sql_session.execute(select(Bookcase))
+        sql_session.execute(select(Bookcase))
+    with profiler.scope("inner"):
+        sql_session.execute(select(Bookcase))
+
+    # Outside of any scope
+    sql_session.execute(select(Bookcase))
+
+    profiles = profiler.to_dict()
+    assert profiles.keys() == {"outer", "inner"}
+    assert profiles["outer"]["runs"] == 1
+    assert profiles["outer"]["statements"] == 2
+    assert profiles["inner"]["runs"] == 2
+    assert profiles["inner"]["statements"] == 3
+
+
+def test_only_the_slowest_statements_are_kept(sql_session: Session) -> None:
+    profiler = SqlProfiler(keep_slowest=2)
+    profiler.attach(sql_session.get_bind())
+
+    with profiler.scope("scope"):
+        for _ in range(5):
+            sql_session.execute(select(Bookcase))
+
+    slowest = profiler.profiles["scope"].slowest_statements()
+    assert len(slowest) == 2
+    assert slowest[0][0] >= slowest[1][0]
+    assert "SQL profile:" in profiler.summary()
+
+
+def test_failing_statements_do_not_leak_timings(sql_session: Session) -> None:
+    profiler = SqlProfiler()
+    profiler.attach(sql_session.get_bind())
+
+    with profiler.scope("scope"):
+        try:
+            sql_session.execute(text("SELECT * FROM no_such_table"))
+        except OperationalError:
+            sql_session.rollback()
+        sql_session.execute(select(Bookcase))
+
+    assert profiler.profiles["scope"].statements == 1
+    assert sql_session.connection().info["sql_profiler_start_times"] == []
+
+    profiler.detach(sql_session.get_bind())
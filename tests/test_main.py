@@ -0,0 +1,19 @@
+import pytest
+
+from worblehat.devscripts.benchmark_startup import (
+    STARTUP_COMMANDS,
+    StartupCommand,
+    forbidden_imports,
+    measure_startup,
+)
+
+
+@pytest.mark.parametrize("command", STARTUP_COMMANDS, ids=lambda command: command.name)
+def test_subcommands_only_import_what_they_need(command: StartupCommand) -> None:
+    if not command.is_available():
+        pytest.skip(f"requires {', '.join(command.requires)}")
+
+    measurement = measure_startup(command)
+
+    assert forbidden_imports(command, measurement) == []
+    assert all(module in measurement.modules for module in command.modules)